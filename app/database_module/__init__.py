@@ -1,5 +1,23 @@
 """后端数据库包"""
 
 from .database_main import *
+from .fts_search import build_fts_tables, search_fts
+from .database_query import DatabaseQueryPool, lookup, multi_get, query_cache_stats
+from .relation_tables import build_relation_tables, drugs_for_disease, diseases_with_symptom
+from .drug_recommendation import build_disease_top_drugs, top_drugs_for_disease
 
-__all__ = ["build_base_database", "run_build_database"]
+__all__ = [
+    "build_base_database",
+    "run_build_database",
+    "build_fts_tables",
+    "search_fts",
+    "DatabaseQueryPool",
+    "lookup",
+    "multi_get",
+    "query_cache_stats",
+    "build_relation_tables",
+    "drugs_for_disease",
+    "diseases_with_symptom",
+    "build_disease_top_drugs",
+    "top_drugs_for_disease",
+]
@@ -0,0 +1,153 @@
+"""
+数据库构建清单模块
+
+记录每个数据源文件的大小、修改时间、内容哈希与入库后的表结构，
+供增量构建判断哪些数据表需要重建；
+同时维护每个数据表的版本号，供查询结果缓存判断缓存是否过期。
+"""
+
+import os
+import json
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from static_module import SourceFingerprint
+from utility_module import hash_file
+
+MANIFEST_TABLE: str = "build_manifest"
+"""构建清单表名称"""
+
+TABLE_VERSION_TABLE: str = "table_versions"
+"""数据表版本号表名称"""
+
+
+def ensure_manifest_table(conn: sqlite3.Connection) -> None:
+    """创建构建清单表（若不存在）"""
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS "{MANIFEST_TABLE}" ('
+        '"source_path" TEXT PRIMARY KEY, '
+        '"table_name" TEXT NOT NULL, '
+        '"size" INTEGER NOT NULL, '
+        '"mtime_ns" INTEGER NOT NULL, '
+        '"content_hash" TEXT NOT NULL, '
+        '"schema" TEXT, '
+        '"row_count" INTEGER, '
+        '"builder_version" INTEGER NOT NULL, '
+        '"built_at" TEXT DEFAULT CURRENT_TIMESTAMP);'
+    )
+    _ensure_version_table(conn.cursor())
+
+
+def _ensure_version_table(cursor: sqlite3.Cursor) -> None:
+    """创建数据表版本号表（若不存在）"""
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS "{TABLE_VERSION_TABLE}" ('
+        '"table_name" TEXT PRIMARY KEY, "version" INTEGER NOT NULL);'
+    )
+
+
+def bump_table_version(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """数据表内容变化后递增其版本号（不提交事务）"""
+    _ensure_version_table(cursor)
+    cursor.execute(
+        f'INSERT INTO "{TABLE_VERSION_TABLE}" ("table_name", "version") VALUES (?, 1) '
+        'ON CONFLICT ("table_name") DO UPDATE SET "version" = "version" + 1;',
+        (table_name,),
+    )
+
+
+def fingerprint_file(
+    file_path: os.PathLike,
+    source_path: str,
+    previous: Optional[SourceFingerprint] = None,
+) -> SourceFingerprint:
+    """
+    计算数据源文件指纹
+
+    大小与修改时间均未变化时直接复用上次记录的哈希，避免重新读取文件。
+
+    Args:
+        file_path (os.PathLike): 文件路径
+        source_path (str): 清单中使用的文件标识（相对路径）
+        previous (Optional[SourceFingerprint]): 清单中记录的上次指纹
+
+    Returns:
+        SourceFingerprint: 文件指纹
+    """
+    stat = Path(file_path).stat()
+    if (
+        previous is not None
+        and previous.size == stat.st_size
+        and previous.mtime_ns == stat.st_mtime_ns
+    ):
+        content_hash = previous.content_hash
+    else:
+        content_hash = hash_file(file_path)
+    return SourceFingerprint(
+        source_path=source_path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        content_hash=content_hash,
+    )
+
+
+def load_manifest(
+    conn: sqlite3.Connection,
+) -> dict[str, tuple[SourceFingerprint, str, int]]:
+    """
+    读取构建清单
+
+    Returns:
+        dict[str, tuple[SourceFingerprint, str, int]]: 文件标识 → (指纹, 数据表名称, 构建器版本)
+    """
+    rows = conn.execute(
+        f'SELECT "source_path", "size", "mtime_ns", "content_hash", '
+        f'"table_name", "builder_version" FROM "{MANIFEST_TABLE}";'
+    ).fetchall()
+    return {
+        row[0]: (SourceFingerprint(*row[:4]), row[4], row[5])
+        for row in rows
+    }
+
+
+def record_manifest(
+    cursor: sqlite3.Cursor,
+    fingerprint: SourceFingerprint,
+    table_name: str,
+    builder_version: int,
+    *,
+    schema: Optional[dict[str, str]] = None,
+    row_count: Optional[int] = None,
+) -> None:
+    """写入或更新一条构建清单记录（不提交事务）"""
+    cursor.execute(
+        f'INSERT OR REPLACE INTO "{MANIFEST_TABLE}" ('
+        '"source_path", "table_name", "size", "mtime_ns", "content_hash", '
+        '"schema", "row_count", "builder_version") VALUES (?, ?, ?, ?, ?, ?, ?, ?);',
+        (
+            fingerprint.source_path,
+            table_name,
+            fingerprint.size,
+            fingerprint.mtime_ns,
+            fingerprint.content_hash,
+            json.dumps(schema, ensure_ascii=False) if schema is not None else None,
+            row_count,
+            builder_version,
+        ),
+    )
+
+
+def touch_manifest(cursor: sqlite3.Cursor, fingerprint: SourceFingerprint) -> None:
+    """内容未变但修改时间变化时，仅刷新清单中的修改时间"""
+    cursor.execute(
+        f'UPDATE "{MANIFEST_TABLE}" SET "mtime_ns" = ? WHERE "source_path" = ?;',
+        (fingerprint.mtime_ns, fingerprint.source_path),
+    )
+
+
+def remove_manifest_entry(cursor: sqlite3.Cursor, source_path: str) -> None:
+    """删除一条构建清单记录（不提交事务）"""
+    cursor.execute(
+        f'DELETE FROM "{MANIFEST_TABLE}" WHERE "source_path" = ?;', (source_path,)
+    )
@@ -1,60 +1,676 @@
 import os
+import re
 import sys
+import time
+import tempfile
+import itertools
 import pandas as pd
 import sqlite3
 from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, Optional
 
-from static_module import DATABASE_FILE
-from dataset_module import load_dataset
+from static_module import (
+    DATABASE_FILE,
+    ENHANCED_DRUG_TABLE_FILE,
+    DISEASE_KEYS_FILE,
+    TableBuildStats,
+    SourceFingerprint,
+)
+from dataset_module import load_dataset, discover_dataset_files
 from utility_module import logger
+from .fts_search import build_fts_tables, discover_qa_files
+from .relation_tables import RELATION_TABLES, build_relation_tables
+from .drug_recommendation import TOP_DRUGS_TABLE, build_disease_top_drugs
+from .build_manifest import (
+    bump_table_version,
+    ensure_manifest_table,
+    fingerprint_file,
+    load_manifest,
+    record_manifest,
+    remove_manifest_entry,
+    touch_manifest,
+)
 
+DATABASE_BUILDER_VERSION: int = 1
+"""构建逻辑版本号，修改入库方式后递增以使已有清单失效"""
 
-def build_base_database(table_name: str, data_frame: pd.DataFrame):
+STAGING_SUFFIX: str = "__staging"
+"""增量构建时临时表的名称后缀"""
+
+DERIVED_SOURCE_TABLES: frozenset[str] = frozenset({"qa_fts", TOP_DRUGS_TABLE})
+"""由派生表构建流程消费的数据源对应的表名（源文件变化时只触发派生表重建）"""
+
+PART_DATABASE_PRAGMAS: dict[str, str] = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+}
+"""并行构建时临时分片数据库使用的 PRAGMA（分片文件构建失败即丢弃）"""
+
+DEFAULT_CHUNK_SIZE: int = 5000
+"""批量写入时每次 executemany 的行数"""
+
+BULK_LOAD_PRAGMAS: dict[str, str | int] = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -262144,  # 负数单位为 KiB，即 256 MiB
+    "temp_store": "MEMORY",
+}
+"""批量导入期间使用的 PRAGMA 设置"""
+
+PERSISTENT_PRAGMAS: frozenset[str] = frozenset({"journal_mode"})
+"""导入结束后保留的 PRAGMA（只读查询连接依赖 WAL 模式与重建并发读取）"""
+
+NULL_MARKERS: tuple[str, ...] = ("NaN", "nan", "")
+"""加载阶段填充的缺失值占位符，入库时写为 NULL"""
+
+SQLITE_INTEGER_RANGE: tuple[int, int] = (-(2**63), 2**63 - 1)
+"""SQLite INTEGER 可表示的取值范围"""
+
+_INTEGER_TEXT_PATTERN: re.Pattern = re.compile(r"^[+-]?(?:0|[1-9]\d*)$")
+_LEADING_ZERO_PATTERN: re.Pattern = re.compile(r"^[+-]?0\d")
+"""整数文本与带前导零文本（编号类取值）的匹配模式"""
+
+INDEXED_COLUMNS: tuple[str, ...] = (
+    "drug_name",
+    "drug",
+    "drugName",
+    "generic_name",
+    "disease",
+    "Disease",
+    "Symptom",
+    "label",
+    "condition",
+    "medical_condition",
+)
+"""出现在任意数据表中时自动建立二级索引的键列"""
+
+TABLE_INDEXES: dict[str, tuple[str, ...]] = {
+    "drugs_side_effects_drugs_com": ("rating", "no_of_reviews"),
+    "drugs_side_effects_drugs_com_cleaned": ("rating", "no_of_reviews"),
+    "Symptom-severity": ("weight",),
+    "Symptom-severity_cleaned": ("weight",),
+}
+"""各数据表额外声明的二级索引列（用于数值范围过滤）"""
+
+
+def get_database_path() -> Path:
+    """获取数据库文件路径"""
+    return Path.cwd() / DATABASE_FILE
+
+
+@contextmanager
+def bulk_load_pragmas(conn: sqlite3.Connection) -> Iterator[dict[str, str | int]]:
     """
-    构建基础数据库
+    在批量导入期间临时调整 PRAGMA，退出时恢复原始设置（`PERSISTENT_PRAGMAS` 除外）
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+
+    Yields:
+        dict[str, str | int]: 调整前的 PRAGMA 设置
+    """
+    original: dict[str, str | int] = {}
+    for pragma, value in BULK_LOAD_PRAGMAS.items():
+        original[pragma] = conn.execute(f"PRAGMA {pragma};").fetchone()[0]
+        conn.execute(f"PRAGMA {pragma} = {value};")
+    logger.debug(f"已应用批量导入 PRAGMA: {BULK_LOAD_PRAGMAS}，原始设置: {original}")
+    try:
+        yield original
+    finally:
+        # journal_mode 需要在事务之外恢复
+        if conn.in_transaction:
+            conn.commit()
+        for pragma, value in original.items():
+            if pragma not in PERSISTENT_PRAGMAS:
+                conn.execute(f"PRAGMA {pragma} = {value};")
+        logger.debug(f"已恢复 PRAGMA 设置: {original}")
+
+
+def _iter_chunks(
+    data_frame: pd.DataFrame, chunk_size: int
+) -> Iterator[list[tuple]]:
+    """按固定行数切分数据框架的行元组"""
+    rows = data_frame.itertuples(index=False, name=None)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def infer_column_affinities(
+    data_frame: pd.DataFrame,
+) -> tuple[pd.DataFrame, dict[str, str]]:
+    """
+    推断每列的 SQLite 类型亲和性（INTEGER/REAL/TEXT），并将缺失值统一为 None
+
+    Args:
+        data_frame (pd.DataFrame): 原始数据框架（缺失值可能为 NaN 或 "NaN" 占位符）
+
+    Returns:
+        tuple[pd.DataFrame, dict[str, str]]: 可直接绑定参数的 object 数据框架，以及列名到类型的映射
+    """
+    typed_columns: dict[str, pd.Series] = {}
+    affinities: dict[str, str] = {}
+    for col in data_frame.columns:
+        series = data_frame[col]
+        is_text = series.dtype == object or pd.api.types.is_string_dtype(series)
+        if is_text:
+            series = series.mask(series.isin(NULL_MARKERS))
+        affinity, typed = _numeric_affinity(series, is_text)
+        if affinity is None:
+            affinities[col] = "TEXT"
+            series = series.astype(object)
+            series = series.where(series.isna(), series.astype(str))
+        else:
+            affinities[col] = affinity
+            series = typed.astype(object)
+        typed_columns[col] = series.where(series.notna(), None)
+    return pd.DataFrame(typed_columns, index=data_frame.index), affinities
+
+
+def _numeric_affinity(
+    series: pd.Series, is_text: bool
+) -> tuple[Optional[str], Optional[pd.Series]]:
+    """
+    判断列能否以数值类型存储，返回 (INTEGER / REAL, 转换后的列)，不能时返回 (None, None)
+
+    文本列中只要有带前导零的取值（如 "00123"，多为编号），整列保留为 TEXT；
+    整数文本按 Python int 精确转换，超出 SQLite INTEGER 范围时保留为 TEXT。
+    """
+    non_null = series.dropna()
+    if len(non_null) == 0 or pd.api.types.is_bool_dtype(non_null):
+        return None, None
+    if is_text:
+        stripped = non_null.astype(str).str.strip()
+        if stripped.str.match(_LEADING_ZERO_PATTERN).any():
+            return None, None
+        if stripped.str.match(_INTEGER_TEXT_PATTERN).all():
+            integers = stripped.map(int)
+            low, high = SQLITE_INTEGER_RANGE
+            if integers.min() < low or integers.max() > high:
+                return None, None
+            return "INTEGER", integers.reindex(series.index)
+    elif pd.api.types.is_integer_dtype(non_null):
+        return "INTEGER", series
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric[series.notna()].isna().any():
+        return None, None
+    if (numeric.dropna() % 1 == 0).all() and numeric.abs().max() < 2**53:
+        return "INTEGER", numeric.astype("Int64")
+    return "REAL", numeric
+
+
+def resolve_table_indexes(table_name: str, columns: list[str]) -> list[str]:
+    """
+    根据声明解析数据表需要建立的二级索引列
 
     Args:
         table_name (str): 数据表名称
-        data_frame (pd.DataFrame): 包含数据的数据框架
+        columns (list[str]): 数据表的列名
+
+    Returns:
+        list[str]: 需要建立索引的列名（按列顺序）
     """
+    declared = set(INDEXED_COLUMNS) | set(TABLE_INDEXES.get(table_name, ()))
+    return [col for col in columns if col in declared and col != "id"]
 
-    data_frame = data_frame.fillna("NaN").astype(str)
-    database_path = Path.cwd() / DATABASE_FILE
-    conn = sqlite3.connect(database_path)
-    cursor = conn.cursor()
-    # Create table
 
-    columns: list[str] = data_frame.columns.tolist()
+def _create_table_sql(
+    table_name: str, columns: list[str], affinities: dict[str, str]
+) -> str:
+    """生成带类型亲和性的建表语句"""
     column_defs = []
     for col in columns:
         if col == "id":
-            column_defs.append(f'"{col}" TEXT PRIMARY KEY')
+            column_defs.append(f'"{col}" {affinities[col]} PRIMARY KEY')
         else:
-            column_defs.append(f'"{col}" TEXT')
-    create_table_sql = (
-        f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(column_defs)});'
-    )
-    cursor.execute(create_table_sql)
+            column_defs.append(f'"{col}" {affinities[col]}')
+    return f'CREATE TABLE "{table_name}" ({", ".join(column_defs)});'
 
-    # Insert data
-    for index, row in data_frame.iterrows():
-        place_holders = ", ".join(["?"] * len(columns))
 
-        insert_sql = rf'INSERT OR REPLACE INTO "{table_name}" ({", ".join([f'\"{col}\"' for col in columns])}) VALUES ({place_holders});'
-        # logger.debug(f"正在插入数据 {row.to_dict()} 到表 [{table_name}]")
+def _swap_staging_table(
+    cursor: sqlite3.Cursor,
+    table_name: str,
+    affinities: dict[str, str],
+    row_count: int,
+    *,
+    indexes: Optional[list[str]] = None,
+    fingerprint: Optional[SourceFingerprint] = None,
+) -> None:
+    """在当前事务内用临时表替换正式表、建立二级索引、递增表版本号并写入构建清单"""
+    if indexes is None:
+        indexes = resolve_table_indexes(table_name, list(affinities))
+    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}";')
+    cursor.execute(
+        f'ALTER TABLE "{table_name + STAGING_SUFFIX}" RENAME TO "{table_name}";'
+    )
+    for col in indexes:
         cursor.execute(
-            insert_sql,
-            tuple(row),
+            f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_{col}" '
+            f'ON "{table_name}" ("{col}");'
+        )
+    bump_table_version(cursor, table_name)
+    if fingerprint is not None:
+        record_manifest(
+            cursor,
+            fingerprint,
+            table_name,
+            DATABASE_BUILDER_VERSION,
+            schema=affinities,
+            row_count=row_count,
+        )
+
+
+def build_base_database(
+    table_name: str,
+    data_frame: pd.DataFrame,
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+    bulk: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    indexes: Optional[list[str]] = None,
+    fingerprint: Optional[SourceFingerprint] = None,
+) -> int:
+    """
+    构建基础数据库
+
+    数据表按推断出的 INTEGER/REAL/TEXT 类型写入临时表，缺失值写为 NULL；
+    写入完成后在同一事务内替换正式表并为键列建立二级索引，
+    读取方在事务提交前始终看到旧表。
+
+    Args:
+        table_name (str): 数据表名称
+        data_frame (pd.DataFrame): 包含数据的数据框架
+        conn (Optional[sqlite3.Connection]): 复用的数据库连接，为空时自行打开并关闭
+        bulk (bool): 是否使用批量模式（单事务内分块 executemany）
+        chunk_size (int): 批量模式下每块的行数
+        indexes (Optional[list[str]]): 需要建立索引的列，为空时使用 `resolve_table_indexes` 的声明
+        fingerprint (Optional[SourceFingerprint]): 数据源指纹，提供时随替换一并写入构建清单
+
+    Returns:
+        int: 写入的行数
+    """
+
+    data_frame, affinities = infer_column_affinities(data_frame)
+    own_connection = conn is None
+    if conn is None:
+        conn = sqlite3.connect(get_database_path())
+    cursor = conn.cursor()
+    # Create table
+    staging_name = table_name + STAGING_SUFFIX
+    columns: list[str] = data_frame.columns.tolist()
+    create_table_sql = _create_table_sql(staging_name, columns, affinities)
+
+    place_holders = ", ".join(["?"] * len(columns))
+    column_names = ", ".join([f'"{col}"' for col in columns])
+    insert_sql = (
+        f'INSERT OR REPLACE INTO "{staging_name}" ({column_names}) VALUES ({place_holders});'
+    )
+
+    row_count = 0
+    try:
+        with conn:
+            cursor.execute(f'DROP TABLE IF EXISTS "{staging_name}";')
+            cursor.execute(create_table_sql)
+            # Insert data
+            if bulk:
+                for chunk in _iter_chunks(data_frame, chunk_size):
+                    cursor.executemany(insert_sql, chunk)
+                    row_count += len(chunk)
+            else:
+                for row in data_frame.itertuples(index=False, name=None):
+                    cursor.execute(insert_sql, row)
+                    row_count += 1
+            _swap_staging_table(
+                cursor,
+                table_name,
+                affinities,
+                row_count,
+                indexes=indexes,
+                fingerprint=fingerprint,
+            )
+    finally:
+        cursor.close()
+        if own_connection:
+            conn.close()
+    return row_count
+
+
+def build_table_file(
+    table_name: str,
+    source_file: str,
+    part_path: str,
+    *,
+    file_dir: os.PathLike,
+    bulk: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> tuple[int, float, float]:
+    """
+    在独立的 SQLite 分片文件中清洗并构建单个数据表（供进程池调用）
+
+    Args:
+        table_name (str): 数据表名称
+        source_file (str): 数据源文件路径
+        part_path (str): 分片数据库文件路径
+        file_dir (os.PathLike): 数据集文件所在目录
+        bulk (bool): 是否使用批量模式
+        chunk_size (int): 批量模式下每块的行数
+
+    Returns:
+        tuple[int, float, float]: (写入行数, 加载耗时, 写入耗时)
+    """
+    start = time.perf_counter()
+    datasets = load_dataset([source_file], file_dir=file_dir)
+    if table_name not in datasets:
+        raise RuntimeError(f"加载数据源 {source_file} 失败")
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(part_path)
+    try:
+        for pragma, value in PART_DATABASE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value};")
+        rows = build_base_database(
+            table_name,
+            datasets[table_name],
+            conn=conn,
+            bulk=bulk,
+            chunk_size=chunk_size,
+            indexes=[],
+        )
+    finally:
+        conn.close()
+    return rows, load_seconds, time.perf_counter() - start
+
+
+def merge_table_file(
+    conn: sqlite3.Connection,
+    table_name: str,
+    part_path: str,
+    *,
+    fingerprint: Optional[SourceFingerprint] = None,
+) -> int:
+    """
+    将分片数据库中的数据表 ATTACH 后以 INSERT ... SELECT 合并进主数据库
+
+    合并同样先写入临时表，再在同一事务内替换正式表。
+
+    Args:
+        conn (sqlite3.Connection): 主数据库连接
+        table_name (str): 数据表名称
+        part_path (str): 分片数据库文件路径
+        fingerprint (Optional[SourceFingerprint]): 数据源指纹，提供时一并写入构建清单
+
+    Returns:
+        int: 合并的行数
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("ATTACH DATABASE ? AS part;", (part_path,))
+    cursor = conn.cursor()
+    try:
+        affinities = {
+            row[1]: row[2]
+            for row in cursor.execute(f'PRAGMA part.table_info("{table_name}");')
+        }
+        staging_name = table_name + STAGING_SUFFIX
+        with conn:
+            cursor.execute(f'DROP TABLE IF EXISTS main."{staging_name}";')
+            cursor.execute(
+                _create_table_sql(staging_name, list(affinities), affinities).replace(
+                    "CREATE TABLE ", "CREATE TABLE main.", 1
+                )
+            )
+            cursor.execute(
+                f'INSERT INTO main."{staging_name}" SELECT * FROM part."{table_name}";'
+            )
+            row_count = cursor.rowcount
+            _swap_staging_table(
+                cursor, table_name, affinities, row_count, fingerprint=fingerprint
+            )
+    finally:
+        cursor.close()
+        conn.execute("DETACH DATABASE part;")
+    return row_count
+
+
+def _log_table_stats(stats: TableBuildStats) -> None:
+    """输出单个数据表的构建耗时明细"""
+    logger.info(
+        f"数据表 [{stats.table_name}] 写入 {stats.rows} 行，"
+        f"耗时 {stats.seconds:.3f}s（加载 {stats.load_seconds:.3f}s，"
+        f"写入 {stats.insert_seconds:.3f}s，合并 {stats.merge_seconds:.3f}s），"
+        f"{stats.rows_per_second:,.0f} 行/秒"
+    )
+
+
+def _build_tables_serial(
+    conn: sqlite3.Connection,
+    pending: dict[str, tuple[str, SourceFingerprint]],
+    *,
+    file_dir: os.PathLike,
+    bulk: bool,
+    chunk_size: int,
+) -> list[TableBuildStats]:
+    """在主进程中逐个加载并构建数据表"""
+    stats_list: list[TableBuildStats] = []
+    for table_name, (source_file, fingerprint) in pending.items():
+        start = time.perf_counter()
+        datasets = load_dataset([source_file], file_dir=file_dir)
+        if table_name not in datasets:
+            logger.error(f"加载数据源 {source_file} 失败，跳过数据表 [{table_name}]")
+            continue
+        load_seconds = time.perf_counter() - start
+        rows = build_base_database(
+            table_name,
+            datasets[table_name],
+            conn=conn,
+            bulk=bulk,
+            chunk_size=chunk_size,
+            fingerprint=fingerprint,
+        )
+        stats = TableBuildStats(
+            table_name=table_name,
+            rows=rows,
+            seconds=time.perf_counter() - start,
+            load_seconds=load_seconds,
+            insert_seconds=time.perf_counter() - start - load_seconds,
         )
-    conn.commit()
-    conn.close()
+        _log_table_stats(stats)
+        stats_list.append(stats)
+    return stats_list
+
 
+def _build_tables_parallel(
+    conn: sqlite3.Connection,
+    pending: dict[str, tuple[str, SourceFingerprint]],
+    *,
+    file_dir: os.PathLike,
+    bulk: bool,
+    chunk_size: int,
+    workers: int,
+) -> list[TableBuildStats]:
+    """在进程池中将每个数据表构建到独立的分片文件，完成后依次合并进主数据库"""
+    stats_list: list[TableBuildStats] = []
+    with tempfile.TemporaryDirectory(
+        prefix="build_", dir=get_database_path().parent
+    ) as part_dir, ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for table_name, (source_file, fingerprint) in pending.items():
+            part_path = str(Path(part_dir, f"{len(futures)}.db"))
+            future = executor.submit(
+                build_table_file,
+                table_name,
+                source_file,
+                part_path,
+                file_dir=file_dir,
+                bulk=bulk,
+                chunk_size=chunk_size,
+            )
+            futures[future] = (table_name, part_path, fingerprint, time.perf_counter())
+        for future in as_completed(futures):
+            table_name, part_path, fingerprint, submitted = futures[future]
+            try:
+                rows, load_seconds, insert_seconds = future.result()
+            except Exception as e:
+                logger.error(f"并行构建数据表 [{table_name}] 失败: {e}")
+                continue
+            start = time.perf_counter()
+            merge_table_file(conn, table_name, part_path, fingerprint=fingerprint)
+            Path(part_path).unlink(missing_ok=True)
+            stats = TableBuildStats(
+                table_name=table_name,
+                rows=rows,
+                seconds=time.perf_counter() - submitted,
+                load_seconds=load_seconds,
+                insert_seconds=insert_seconds,
+                merge_seconds=time.perf_counter() - start,
+            )
+            _log_table_stats(stats)
+            stats_list.append(stats)
+    return stats_list
 
-def run_build_database():
-    """构建数据库"""
-    datasets: dict[str, pd.DataFrame] = load_dataset(None)
-    for table_name, data_frame in datasets.items():
-        build_base_database(table_name, data_frame)
+
+def run_build_database(
+    *,
+    bulk: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    force: bool = False,
+    workers: Optional[int] = None,
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> list[TableBuildStats]:
+    """
+    构建数据库
+
+    根据构建清单中记录的文件指纹增量构建：内容未变化的数据源直接跳过，
+    变化的数据源重新加载并原子替换对应数据表，已删除的数据源对应的数据表被移除。
+    增强药物表（`ENHANCED_DRUG_TABLE_FILE`）存在时一并入库；
+    有数据表变化时重建全文检索表、整数键关系表与推荐药物表。
+
+    多个数据表需要重建时，各数据表在进程池中分别清洗并写入临时分片文件，
+    再由主进程 ATTACH 合并，总耗时接近最大单表的耗时。
+
+    Args:
+        bulk (bool): 是否使用批量模式
+        chunk_size (int): 批量模式下每块的行数
+        force (bool): 是否忽略构建清单强制全量重建
+        workers (Optional[int]): 并行构建的进程数，为空时取 CPU 核数，为 1 时在主进程中逐表构建
+        file_dir (os.PathLike): 数据集文件所在目录
+
+    Returns:
+        list[TableBuildStats]: 本次重建的每个数据表的构建统计
+    """
+    build_start = time.perf_counter()
+    stats_list: list[TableBuildStats] = []
+    conn = sqlite3.connect(get_database_path())
+    try:
+        with conn:
+            ensure_manifest_table(conn)
+        manifest = load_manifest(conn)
+        existing_tables: set[str] = {
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table';"
+            )
+        }
+
+        # 对比数据源指纹
+        pending: dict[str, tuple[str, SourceFingerprint]] = {}
+        derived_fingerprints: list[tuple[SourceFingerprint, str]] = []
+        touched: list[SourceFingerprint] = []
+        skipped_sources = 0
+        derived_outdated = force or not {*RELATION_TABLES, TOP_DRUGS_TABLE} <= existing_tables
+        sources = [(file, Path(file).stem) for file in discover_dataset_files(file_dir)]
+        enhanced_drug_table_file = Path.cwd() / ENHANCED_DRUG_TABLE_FILE
+        if enhanced_drug_table_file.exists():
+            sources.append((str(enhanced_drug_table_file), "enhanced_drug_table"))
+        sources += [(str(file), "qa_fts") for file in discover_qa_files(file_dir)]
+        disease_keys_file = Path.cwd() / DISEASE_KEYS_FILE
+        if disease_keys_file.exists():
+            sources.append((str(disease_keys_file), TOP_DRUGS_TABLE))
+        for file, table_name in sources:
+            source_path = Path(os.path.relpath(file, file_dir)).as_posix()
+            previous = manifest.pop(source_path, None)
+            fingerprint = fingerprint_file(
+                file, source_path, previous[0] if previous else None
+            )
+            unchanged = (
+                not force
+                and previous is not None
+                and fingerprint.same_content(previous[0])
+                and previous[2] == DATABASE_BUILDER_VERSION
+                and table_name in existing_tables
+            )
+            if unchanged and previous is not None:
+                skipped_sources += 1
+                if fingerprint.mtime_ns != previous[0].mtime_ns:
+                    touched.append(fingerprint)
+            elif table_name in DERIVED_SOURCE_TABLES:
+                derived_outdated = True
+            else:
+                pending[table_name] = (file, fingerprint)
+            if table_name in DERIVED_SOURCE_TABLES:
+                derived_fingerprints.append((fingerprint, table_name))
+
+        with conn:
+            for fingerprint in touched:
+                touch_manifest(conn.cursor(), fingerprint)
+            # 清单中剩余的条目对应已删除的数据源
+            for source_path, (_, table_name, _) in manifest.items():
+                if table_name not in DERIVED_SOURCE_TABLES and table_name not in pending:
+                    conn.execute(f'DROP TABLE IF EXISTS "{table_name}";')
+                    bump_table_version(conn.cursor(), table_name)
+                    logger.info(f"数据源 {source_path} 已删除，移除数据表 [{table_name}]")
+                derived_outdated = True
+                remove_manifest_entry(conn.cursor(), source_path)
+
+        if not pending and not derived_outdated:
+            logger.info(
+                f"数据源均未变化，跳过构建，耗时 {time.perf_counter() - build_start:.3f}s"
+            )
+            return stats_list
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending)))
+        with bulk_load_pragmas(conn):
+            if workers > 1:
+                stats_list = _build_tables_parallel(
+                    conn,
+                    pending,
+                    file_dir=file_dir,
+                    bulk=bulk,
+                    chunk_size=chunk_size,
+                    workers=workers,
+                )
+            else:
+                stats_list = _build_tables_serial(
+                    conn, pending, file_dir=file_dir, bulk=bulk, chunk_size=chunk_size
+                )
+            # 派生表：全文检索表、整数键关系表与推荐药物表
+            build_fts_tables(conn, dataset_dir=file_dir)
+            build_relation_tables(conn)
+            build_disease_top_drugs(conn, disease_keys_file=disease_keys_file)
+            with conn:
+                cursor = conn.cursor()
+                for fingerprint, table_name in derived_fingerprints:
+                    record_manifest(
+                        cursor, fingerprint, table_name, DATABASE_BUILDER_VERSION
+                    )
+        failed = len(pending) - len(stats_list)
+        logger.info(
+            f"数据库构建完成：使用 {workers} 个进程重建 {len(stats_list)} 个数据表"
+            + (f"（{failed} 个失败）" if failed else "")
+            + f"，跳过 {skipped_sources}/{len(sources)} 个未变化的数据源，"
+            f"单表耗时合计 {sum(stats.seconds for stats in stats_list):.3f}s，"
+            f"总耗时 {time.perf_counter() - build_start:.3f}s"
+        )
+    finally:
+        conn.close()
+    return stats_list
 
 
 if __name__ == "__main__":
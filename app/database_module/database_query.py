@@ -0,0 +1,377 @@
+"""
+数据库只读查询模块
+
+为每个线程维护一条只读的 SQLite 连接（数据库处于 WAL 模式，
+读取与重建写入互不阻塞），线程退出后其连接随线程局部数据一起释放，
+并提供参数化的单键查询与批量查询接口。
+查询结果经由版本化的 LRU 缓存，数据表重建后相关缓存自动失效。
+"""
+
+import json
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+from static_module import DATABASE_FILE, QueryCacheStats
+from singleton_module import SingletonMeta
+from utility_module import logger
+from .build_manifest import TABLE_VERSION_TABLE
+from .query_cache import QueryResultCache, extract_tables, make_cache_key
+
+READ_CONNECTION_PRAGMAS: dict[str, int] = {
+    "query_only": 1,
+    "cache_size": -65536,  # 负数单位为 KiB，即 64 MiB
+    "mmap_size": 268435456,
+}
+"""只读连接使用的 PRAGMA 设置"""
+
+READ_BUSY_TIMEOUT: float = 5.0
+"""只读连接等待锁的超时时间（秒）"""
+
+STATEMENT_CACHE_SIZE: int = 256
+"""每条连接缓存的预编译语句数量"""
+
+
+def quote_identifier(name: str) -> str:
+    """为 SQL 标识符加双引号并转义"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def find_table_with_columns(
+    conn: sqlite3.Connection,
+    columns: Sequence[str],
+    *,
+    exclude: Iterable[str] = (),
+) -> Optional[str]:
+    """
+    在数据库中找到首个包含全部指定列的普通数据表（按表名排序，跳过虚拟表）
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        columns (Sequence[str]): 必须包含的列
+        exclude (Iterable[str]): 需要跳过的表名
+
+    Returns:
+        Optional[str]: 数据表名称，未找到时为 None
+    """
+    excluded = set(exclude)
+    table_names = [
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND sql NOT LIKE 'CREATE VIRTUAL TABLE%' ORDER BY name;"
+        )
+    ]
+    for table_name in table_names:
+        if table_name in excluded:
+            continue
+        table_columns = {
+            row[1]
+            for row in conn.execute(f"PRAGMA table_info({quote_identifier(table_name)});")
+        }
+        if all(col in table_columns for col in columns):
+            return table_name
+    return None
+
+
+class _ThreadConnection:
+    """
+    线程私有连接的持有者
+
+    只由线程局部数据强引用：线程退出、其线程局部数据被释放时，持有者被回收并关闭连接，
+    连接池只保存弱引用，不会让已退出线程的连接一直保持打开。
+    """
+
+    __slots__ = ("conn", "close", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn: sqlite3.Connection = conn
+        self.close: weakref.finalize = weakref.finalize(self, conn.close)
+        """关闭连接（只执行一次）"""
+
+
+class DatabaseQueryPool(metaclass=SingletonMeta):
+    """只读数据库连接池（每个线程一条连接）"""
+
+    def __init__(self, database_path: Optional[Path] = None):
+        self.database_path: Path = database_path or Path.cwd() / DATABASE_FILE
+        """数据库文件路径"""
+        self._local = threading.local()
+        self._connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._pool_lock = threading.RLock()
+        self._table_columns: dict[tuple[str, Optional[int]], frozenset[str]] = {}
+        self.cache: QueryResultCache = QueryResultCache()
+        """查询结果缓存"""
+
+    def connection(self) -> sqlite3.Connection:
+        """获取当前线程的只读连接，不存在时创建"""
+        holder: Optional[_ThreadConnection] = getattr(self._local, "holder", None)
+        if holder is not None:
+            return holder.conn
+        if not self.database_path.exists():
+            raise FileNotFoundError(f"数据库文件 {self.database_path} 不存在")
+        conn = sqlite3.connect(
+            self.database_path.as_uri() + "?mode=ro",
+            uri=True,
+            timeout=READ_BUSY_TIMEOUT,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            # 连接只在所属线程中使用，但线程退出后可能由其他线程回收关闭
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma, value in READ_CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value};")
+        holder = _ThreadConnection(conn)
+        self._local.holder = holder
+        with self._pool_lock:
+            self._connections.add(holder)
+        logger.debug(f"线程 {threading.current_thread().name} 打开只读数据库连接")
+        return conn
+
+    def close_thread_connection(self) -> None:
+        """关闭当前线程的连接"""
+        holder: Optional[_ThreadConnection] = getattr(self._local, "holder", None)
+        if holder is None:
+            return
+        self._local.holder = None
+        self._local.data_version = None
+        with self._pool_lock:
+            self._connections.discard(holder)
+        holder.close()
+
+    def close_all(self) -> None:
+        """
+        关闭池中所有连接（应在没有查询进行时调用，如数据库整体替换后）
+
+        其他线程的连接在其下次访问时会重新创建。
+        """
+        with self._pool_lock:
+            holders = list(self._connections)
+            self._connections.clear()
+            self._table_columns.clear()
+        for holder in holders:
+            holder.close()
+        self._local = threading.local()
+        # 数据库文件可能被整体替换，版本号会从头计数，因此一并清空缓存
+        self.cache.clear()
+
+    def _table_versions(self) -> Optional[dict[str, int]]:
+        """
+        读取数据表版本号
+
+        仅当 `PRAGMA data_version` 表明有其他连接提交过写入时才重新读取版本表。
+
+        Returns:
+            Optional[dict[str, int]]: 数据表名称 → 版本号，数据库中没有版本表时为 None
+        """
+        conn = self.connection()
+        data_version = conn.execute("PRAGMA data_version;").fetchone()[0]
+        if getattr(self._local, "data_version", None) != data_version:
+            try:
+                versions = dict(
+                    conn.execute(
+                        f'SELECT "table_name", "version" FROM "{TABLE_VERSION_TABLE}";'
+                    ).fetchall()
+                )
+            except sqlite3.OperationalError:
+                versions = None
+            self._local.table_versions = versions
+            self._local.data_version = data_version
+        return self._local.table_versions
+
+    def query(
+        self,
+        sql: str,
+        params: Sequence[Any] = (),
+        *,
+        cache: bool = True,
+        tables: Optional[Sequence[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        执行参数化查询
+
+        Args:
+            sql (str): SQL 语句（使用 ? 占位符）
+            params (Sequence[Any]): 参数
+            cache (bool): 是否使用查询结果缓存
+            tables (Optional[Sequence[str]]): 查询依赖的数据表，为空时从 SQL 的 FROM / JOIN 中提取；
+                无法从 SQL 确定依赖的表、有依赖表不在版本表中或参数不可哈希时不使用缓存
+
+        Returns:
+            list[dict[str, Any]]: 查询结果
+        """
+        versions = self._table_versions() if cache else None
+        key = make_cache_key(sql, params) if versions is not None else None
+        if tables is None and key is not None:
+            tables = extract_tables(sql)
+        # 只有全部依赖表都有版本号时才能判断缓存是否过期；系统表、表值函数
+        # 以及不经构建流程写入的表没有版本号，直接查询
+        if (
+            key is None
+            or tables is None
+            or not all(table in versions for table in tables)
+        ):
+            rows = self.connection().execute(sql, params).fetchall()
+            return [dict(row) for row in rows]
+
+        snapshot = tuple((table, versions[table]) for table in sorted(set(tables)))
+        result = self.cache.get(key, snapshot)
+        if result is None:
+            rows = self.connection().execute(sql, params).fetchall()
+            result = [dict(row) for row in rows]
+            self.cache.put(key, snapshot, result)
+        return result
+
+    def _check_columns(self, table_name: str, columns: Iterable[str]) -> None:
+        """
+        校验表名与列名，避免拼接未知标识符
+
+        表结构按 (表名, 数据表版本号) 缓存，数据表重建后版本号递增，重新读取表结构；
+        不在版本表中的数据表无法判断表结构是否变化，每次都重新读取。
+        """
+        versions = self._table_versions()
+        cache_key = (
+            (table_name, versions[table_name])
+            if versions is not None and table_name in versions
+            else None
+        )
+        with self._pool_lock:
+            table_columns = self._table_columns.get(cache_key) if cache_key else None
+        if table_columns is None:
+            table_columns = frozenset(
+                row["name"]
+                for row in self.connection().execute(
+                    f"PRAGMA table_info({quote_identifier(table_name)});"
+                )
+            )
+            if not table_columns:
+                raise ValueError(f"数据表 {table_name} 不存在")
+            if cache_key is not None:
+                with self._pool_lock:
+                    # 丢弃该表旧版本的表结构
+                    for key in [key for key in self._table_columns if key[0] == table_name]:
+                        del self._table_columns[key]
+                    self._table_columns[cache_key] = table_columns
+        unknown = [col for col in columns if col not in table_columns]
+        if unknown:
+            raise ValueError(f"数据表 {table_name} 不存在列: {unknown}")
+
+    def _select_clause(self, table_name: str, columns: Optional[Sequence[str]]) -> str:
+        """生成 SELECT 列表"""
+        if not columns:
+            return "*"
+        self._check_columns(table_name, columns)
+        return ", ".join(quote_identifier(col) for col in columns)
+
+    def lookup(
+        self,
+        table_name: str,
+        key_column: str,
+        value: Any,
+        *,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        按键列查询匹配的记录
+
+        Args:
+            table_name (str): 数据表名称
+            key_column (str): 键列名称
+            value (Any): 键值
+            columns (Optional[Sequence[str]]): 返回的列，为空时返回全部列
+            limit (Optional[int]): 返回的最大条数
+
+        Returns:
+            list[dict[str, Any]]: 匹配的记录
+
+        Example:
+            >>> DatabaseQueryPool().lookup("symptom_Description", "Disease", "Malaria")
+            [{"Disease": "Malaria", "Description": "..."}]
+        """
+        self._check_columns(table_name, [key_column])
+        sql = (
+            f"SELECT {self._select_clause(table_name, columns)} "
+            f"FROM {quote_identifier(table_name)} "
+            f"WHERE {quote_identifier(key_column)} = ?"
+        )
+        params: list[Any] = [value]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.query(sql + ";", params)
+
+    def multi_get(
+        self,
+        table_name: str,
+        key_column: str,
+        values: Iterable[Any],
+        *,
+        columns: Optional[Sequence[str]] = None,
+    ) -> dict[Any, list[dict[str, Any]]]:
+        """
+        批量按键列查询
+
+        所有键值以一个 JSON 数组参数传入，无论键的数量多少都复用同一条预编译语句。
+
+        Args:
+            table_name (str): 数据表名称
+            key_column (str): 键列名称
+            values (Iterable[Any]): 键值
+            columns (Optional[Sequence[str]]): 返回的列，为空时返回全部列（结果始终包含键列）
+
+        Returns:
+            dict[Any, list[dict[str, Any]]]: 键值 → 匹配的记录，未命中的键对应空列表
+        """
+        keys = list(dict.fromkeys(values))
+        result: dict[Any, list[dict[str, Any]]] = {key: [] for key in keys}
+        if not keys:
+            return result
+        self._check_columns(table_name, [key_column])
+        if columns and key_column not in columns:
+            columns = [key_column, *columns]
+        sql = (
+            f"SELECT {self._select_clause(table_name, columns)} "
+            f"FROM {quote_identifier(table_name)} "
+            f"WHERE {quote_identifier(key_column)} IN (SELECT value FROM json_each(?));"
+        )
+        # json_each 只依赖参数，缓存有效性只取决于数据表本身
+        for row in self.query(
+            sql, [json.dumps(keys, ensure_ascii=False)], tables=[table_name]
+        ):
+            result.setdefault(row[key_column], []).append(row)
+        return result
+
+
+def query_cache_stats() -> QueryCacheStats:
+    """返回全局只读连接池的查询结果缓存统计"""
+    return DatabaseQueryPool().cache.stats()
+
+
+def lookup(
+    table_name: str,
+    key_column: str,
+    value: Any,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """使用全局只读连接池按键列查询，参数见 `DatabaseQueryPool.lookup`"""
+    return DatabaseQueryPool().lookup(
+        table_name, key_column, value, columns=columns, limit=limit
+    )
+
+
+def multi_get(
+    table_name: str,
+    key_column: str,
+    values: Iterable[Any],
+    *,
+    columns: Optional[Sequence[str]] = None,
+) -> dict[Any, list[dict[str, Any]]]:
+    """使用全局只读连接池批量查询，参数见 `DatabaseQueryPool.multi_get`"""
+    return DatabaseQueryPool().multi_get(
+        table_name, key_column, values, columns=columns
+    )
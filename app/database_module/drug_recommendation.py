@@ -0,0 +1,276 @@
+"""
+推荐药物物化表模块
+
+为 disease_keys.json 中的每个疾病预先计算评分最高的前 N 种药物，
+评分为按评论数加权的平均评分（贝叶斯平均），并按处方/非处方分桶、
+预先归类妊娠分级，使“偏头痛的非处方药”之类的问题成为一次主键范围读取。
+"""
+
+import os
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Optional
+
+from static_module import DISEASE_KEYS_FILE
+from utility_module import logger
+from .database_query import DatabaseQueryPool, find_table_with_columns
+from .build_manifest import bump_table_version
+from .relation_tables import ENHANCED_DRUG_COLUMNS, parse_json_list
+
+TOP_DRUGS_TABLE: str = "disease_top_drugs"
+"""推荐药物物化表名称"""
+
+TOP_DRUGS_PER_DISEASE: int = 20
+"""每个疾病、每个分桶保留的药物数量"""
+
+RATING_PRIOR_REVIEWS: int = 10
+"""加权评分的先验评论数：评论数越少，评分越向全体平均评分收缩"""
+
+AVAILABILITY_BUCKETS: tuple[str, ...] = ("any", "otc", "rx")
+"""处方分桶：any 为全部药物，otc / rx 分别为可非处方 / 处方获得的药物（Rx/OTC 同时属于两者）"""
+
+PREGNANCY_BUCKETS: dict[str, str] = {
+    "A": "low_risk",
+    "B": "low_risk",
+    "C": "caution",
+    "D": "avoid",
+    "X": "avoid",
+}
+"""妊娠分级 → 妊娠分桶，其余取值（含 N 与缺失）归为 unknown"""
+
+RECOMMENDATION_COLUMNS: tuple[str, ...] = (
+    "avg_rating",
+    "total_reviews",
+    "rx_otc",
+    "pregnancy_category",
+)
+"""生成推荐表时从增强药物表读取的可选列"""
+
+
+def availability_buckets(rx_otc: Optional[str]) -> tuple[str, ...]:
+    """根据 rx_otc 字段（如 Rx、OTC、Rx/OTC）确定药物所属的处方分桶"""
+    tokens = {
+        token.strip().upper() for token in str(rx_otc or "").split("/") if token.strip()
+    }
+    buckets = ["any"]
+    if "OTC" in tokens:
+        buckets.append("otc")
+    if "RX" in tokens:
+        buckets.append("rx")
+    return tuple(buckets)
+
+
+def pregnancy_bucket(pregnancy_category: Optional[str]) -> str:
+    """将妊娠分级归入妊娠分桶"""
+    return PREGNANCY_BUCKETS.get(str(pregnancy_category or "").strip().upper(), "unknown")
+
+
+def weighted_rating(
+    avg_rating: Optional[float],
+    total_reviews: Optional[int],
+    prior_rating: float,
+    prior_reviews: int = RATING_PRIOR_REVIEWS,
+) -> float:
+    """
+    按评论数加权的评分
+
+    score = (v * R + m * C) / (v + m)，其中 R 为药物平均评分、v 为评论数、
+    C 为全体药物的平均评分、m 为先验评论数；没有评分的药物得分为 C。
+    """
+    reviews = int(total_reviews or 0)
+    if avg_rating is None or reviews <= 0:
+        return prior_rating
+    return (reviews * float(avg_rating) + prior_reviews * prior_rating) / (
+        reviews + prior_reviews
+    )
+
+
+def load_disease_keys(
+    disease_keys_file: os.PathLike = Path.cwd() / DISEASE_KEYS_FILE,
+) -> Optional[list[str]]:
+    """读取标准疾病名列表，文件不存在或格式错误时返回 None"""
+    try:
+        keys = json.loads(Path(disease_keys_file).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"读取疾病名列表 {disease_keys_file} 失败: {e}")
+        return None
+    return [str(key) for key in keys] if isinstance(keys, list) else None
+
+
+def _create_top_drugs_table(cursor: sqlite3.Cursor) -> None:
+    """重建推荐药物物化表"""
+    cursor.execute(f'DROP TABLE IF EXISTS "{TOP_DRUGS_TABLE}";')
+    cursor.execute(
+        f'CREATE TABLE "{TOP_DRUGS_TABLE}" ('
+        '"disease_key" TEXT NOT NULL, '
+        '"availability" TEXT NOT NULL, '
+        '"rank" INTEGER NOT NULL, '
+        '"drug_name" TEXT NOT NULL, '
+        '"score" REAL NOT NULL, '
+        '"avg_rating" REAL, '
+        '"total_reviews" INTEGER NOT NULL, '
+        '"rx_otc" TEXT, '
+        '"pregnancy_category" TEXT, '
+        '"pregnancy_bucket" TEXT NOT NULL, '
+        'PRIMARY KEY ("disease_key", "availability", "rank")) WITHOUT ROWID;'
+    )
+
+
+def build_disease_top_drugs(
+    conn: sqlite3.Connection,
+    *,
+    disease_keys_file: os.PathLike = Path.cwd() / DISEASE_KEYS_FILE,
+    top_n: int = TOP_DRUGS_PER_DISEASE,
+) -> int:
+    """
+    构建推荐药物物化表
+
+    数据来源为已入库的增强药物表；每个疾病在每个处方分桶内按加权评分降序保留前 top_n 种药物。
+    疾病名列表文件缺失时使用增强药物表中出现过的全部 disease_key。
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        disease_keys_file (os.PathLike): 标准疾病名列表文件
+        top_n (int): 每个疾病、每个分桶保留的药物数量
+
+    Returns:
+        int: 写入的行数
+    """
+    enhanced_table = find_table_with_columns(conn, ENHANCED_DRUG_COLUMNS)
+    drugs: dict[str, dict[str, Any]] = {}
+    if enhanced_table is not None:
+        enhanced_columns = {
+            row[1] for row in conn.execute(f'PRAGMA table_info("{enhanced_table}");')
+        }
+        select_columns = ", ".join(
+            f'"{col}"' if col in enhanced_columns else "NULL"
+            for col in RECOMMENDATION_COLUMNS
+        )
+        for drug_name, keys_json, *values in conn.execute(
+            f'SELECT "drug_name", "matched_disease_keys", {select_columns} '
+            f'FROM "{enhanced_table}" WHERE "drug_name" IS NOT NULL;'
+        ):
+            drug = dict(zip(RECOMMENDATION_COLUMNS, values))
+            drug["drug_name"] = str(drug_name).strip().lower()
+            drug["total_reviews"] = int(drug["total_reviews"] or 0)
+            drug["disease_keys"] = [str(key) for key in parse_json_list(keys_json)]
+            # 同名药物保留评论数最多的一行
+            previous = drugs.get(drug["drug_name"])
+            if previous is None or drug["total_reviews"] > previous["total_reviews"]:
+                drugs[drug["drug_name"]] = drug
+    else:
+        logger.warning(f"数据库中未找到增强药物表，[{TOP_DRUGS_TABLE}] 为空")
+
+    disease_keys = load_disease_keys(disease_keys_file)
+    if disease_keys is None:
+        disease_keys = sorted({key for drug in drugs.values() for key in drug["disease_keys"]})
+    key_set = set(disease_keys)
+
+    # 全体药物按评论数加权的平均评分作为先验
+    rated = [drug for drug in drugs.values() if drug["avg_rating"] is not None]
+    total_reviews = sum(drug["total_reviews"] for drug in rated)
+    if total_reviews > 0:
+        prior_rating = (
+            sum(float(drug["avg_rating"]) * drug["total_reviews"] for drug in rated)
+            / total_reviews
+        )
+    elif rated:
+        prior_rating = sum(float(drug["avg_rating"]) for drug in rated) / len(rated)
+    else:
+        prior_rating = 0.0
+
+    candidates: dict[tuple[str, str], list[tuple[float, str]]] = {}
+    for drug in drugs.values():
+        drug["score"] = weighted_rating(
+            drug["avg_rating"], drug["total_reviews"], prior_rating
+        )
+        buckets = availability_buckets(drug["rx_otc"])
+        for disease_key in dict.fromkeys(drug["disease_keys"]):
+            if disease_key not in key_set:
+                continue
+            for bucket in buckets:
+                candidates.setdefault((disease_key, bucket), []).append(
+                    (drug["score"], drug["drug_name"])
+                )
+
+    rows: list[tuple] = []
+    for disease_key in disease_keys:
+        for bucket in AVAILABILITY_BUCKETS:
+            ranked = sorted(
+                candidates.get((disease_key, bucket), ()),
+                key=lambda item: (-item[0], item[1]),
+            )[:top_n]
+            for rank, (score, drug_name) in enumerate(ranked, start=1):
+                drug = drugs[drug_name]
+                rows.append(
+                    (
+                        disease_key,
+                        bucket,
+                        rank,
+                        drug_name,
+                        round(score, 4),
+                        drug["avg_rating"],
+                        drug["total_reviews"],
+                        drug["rx_otc"],
+                        drug["pregnancy_category"],
+                        pregnancy_bucket(drug["pregnancy_category"]),
+                    )
+                )
+
+    cursor = conn.cursor()
+    try:
+        with conn:
+            _create_top_drugs_table(cursor)
+            cursor.executemany(
+                f'INSERT INTO "{TOP_DRUGS_TABLE}" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);',
+                rows,
+            )
+            bump_table_version(cursor, TOP_DRUGS_TABLE)
+    finally:
+        cursor.close()
+    logger.info(
+        f"推荐药物表 [{TOP_DRUGS_TABLE}] 写入 {len(rows)} 行，覆盖 {len(disease_keys)} 个疾病"
+    )
+    return len(rows)
+
+
+def top_drugs_for_disease(
+    disease_key: str,
+    *,
+    availability: str = "any",
+    pregnancy_buckets: Optional[tuple[str, ...]] = None,
+    limit: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """
+    查询某疾病的推荐药物（按加权评分排名）
+
+    Args:
+        disease_key (str): 疾病标准名
+        availability (str): 处方分桶，见 `AVAILABILITY_BUCKETS`
+        pregnancy_buckets (Optional[tuple[str, ...]]): 仅返回这些妊娠分桶的药物，为空时不过滤
+        limit (Optional[int]): 返回的最大条数
+
+    Returns:
+        list[dict[str, Any]]: 推荐药物记录
+
+    Example:
+        >>> top_drugs_for_disease("migraine", availability="otc", limit=3)
+        [{"rank": 1, "drug_name": "...", "score": 8.1, "rx_otc": "OTC", ...}]
+    """
+    if availability not in AVAILABILITY_BUCKETS:
+        raise ValueError(f"未知的处方分桶: {availability}")
+    sql = (
+        f'SELECT "rank", "drug_name", "score", "avg_rating", "total_reviews", '
+        f'"rx_otc", "pregnancy_category", "pregnancy_bucket" FROM "{TOP_DRUGS_TABLE}" '
+        f'WHERE "disease_key" = ? AND "availability" = ?'
+    )
+    params: list[Any] = [disease_key, availability]
+    if pregnancy_buckets:
+        sql += f' AND "pregnancy_bucket" IN ({", ".join("?" * len(pregnancy_buckets))})'
+        params.extend(pregnancy_buckets)
+    sql += ' ORDER BY "rank"'
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return DatabaseQueryPool().query(sql + ";", params)
@@ -0,0 +1,221 @@
+"""
+全文检索模块
+
+基于 SQLite FTS5 为问答语料、疾病描述与药物说明建立全文索引，
+并提供按 bm25 排序、附带摘要片段的检索接口。
+"""
+
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from utility_module import logger
+from dataset_module.qa_corpus import QA_CORPUS_DIRS, QACorpus, discover_qa_files
+from .database_query import DatabaseQueryPool, find_table_with_columns
+from .build_manifest import bump_table_version
+
+FTS_TABLES: dict[str, tuple[str, ...]] = {
+    "qa_fts": ("question", "answer", "disease", "symptoms", "source"),
+    "disease_description_fts": ("disease", "description"),
+    "drug_text_fts": ("drug_name", "side_effects", "medical_condition_description"),
+}
+"""全文检索表及其列定义"""
+
+FTS_UNINDEXED_COLUMNS: frozenset[str] = frozenset({"source"})
+"""只存储不参与检索的列"""
+
+FTS_COLUMN_WEIGHTS: dict[str, tuple[float, ...]] = {
+    "qa_fts": (2.0, 1.0, 1.5, 1.5, 0.0),
+    "disease_description_fts": (3.0, 1.0),
+    "drug_text_fts": (3.0, 1.0, 1.0),
+}
+"""bm25 各列权重，与 FTS_TABLES 的列顺序一致"""
+
+FTS_TOKENIZER: str = "porter unicode61 remove_diacritics 2"
+"""FTS5 分词器配置"""
+
+_TOKEN_PATTERN: re.Pattern = re.compile(r"\w+", re.UNICODE)
+
+
+def _create_fts_table(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """重建单个 FTS5 虚拟表"""
+    column_defs = ", ".join(
+        f"{col} UNINDEXED" if col in FTS_UNINDEXED_COLUMNS else col
+        for col in FTS_TABLES[table_name]
+    )
+    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}";')
+    cursor.execute(
+        f'CREATE VIRTUAL TABLE "{table_name}" USING fts5('
+        f"{column_defs}, tokenize = '{FTS_TOKENIZER}');"
+    )
+
+
+def _join_field(value: Any) -> str:
+    """将 JSON 字段（字符串或列表）展开为可检索文本"""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(str(item).replace("_", " ").strip() for item in value)
+    return str(value).replace("_", " ").strip()
+
+
+def iter_qa_records(
+    dataset_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> Iterator[tuple[str, str, str, str, str]]:
+    """
+    遍历问答语料目录下的所有 JSON 文件
+
+    相同的 (question, answer) 只返回一次。
+
+    Args:
+        dataset_dir (os.PathLike): 数据集根目录
+
+    Yields:
+        tuple[str, str, str, str, str]: (question, answer, disease, symptoms, source)
+    """
+    seen: set[tuple[str, str]] = set()
+    for json_file in discover_qa_files(dataset_dir):
+        try:
+            # 经旁路索引逐条读取，同时为训练代码的随机访问准备好索引
+            with QACorpus(json_file) as corpus:
+                records = list(corpus)
+        except (OSError, ValueError) as e:
+            logger.error(f"读取问答语料 {json_file} 失败: {e}")
+            continue
+        source = json_file.relative_to(dataset_dir).as_posix()
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            question = str(record.get("question") or "").strip()
+            answer = str(record.get("answer") or "").strip()
+            if not question or (question, answer) in seen:
+                continue
+            seen.add((question, answer))
+            yield (
+                question,
+                answer,
+                _join_field(record.get("disease")),
+                _join_field(record.get("symptoms")),
+                source,
+            )
+
+
+def build_fts_tables(
+    conn: sqlite3.Connection,
+    *,
+    dataset_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> dict[str, int]:
+    """
+    构建全文检索表
+
+    问答语料直接读取 JSON 文件；疾病描述与药物说明从已入库的数据表中选取。
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        dataset_dir (os.PathLike): 问答语料所在的数据集根目录
+
+    Returns:
+        dict[str, int]: 每个全文检索表写入的行数
+    """
+    table_sources: dict[str, tuple[str, ...]] = {
+        "disease_description_fts": ("Disease", "Description"),
+        "drug_text_fts": FTS_TABLES["drug_text_fts"],
+    }
+    row_counts: dict[str, int] = {}
+    cursor = conn.cursor()
+    try:
+        with conn:
+            _create_fts_table(cursor, "qa_fts")
+            cursor.executemany(
+                'INSERT INTO "qa_fts" (question, answer, disease, symptoms, source) '
+                "VALUES (?, ?, ?, ?, ?);",
+                iter_qa_records(dataset_dir),
+            )
+            row_counts["qa_fts"] = cursor.execute(
+                'SELECT count(*) FROM "qa_fts";'
+            ).fetchone()[0]
+            for table_name, source_columns in table_sources.items():
+                source_table = find_table_with_columns(conn, source_columns)
+                if source_table is None:
+                    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}";')
+                    bump_table_version(cursor, table_name)
+                    continue
+                _create_fts_table(cursor, table_name)
+                select_columns = ", ".join(
+                    f"COALESCE(\"{col}\", '')" for col in source_columns
+                )
+                cursor.execute(
+                    f'INSERT INTO "{table_name}" ({", ".join(FTS_TABLES[table_name])}) '
+                    f'SELECT DISTINCT {select_columns} FROM "{source_table}";'
+                )
+                row_counts[table_name] = cursor.rowcount
+            for table_name, rows in row_counts.items():
+                cursor.execute(
+                    f'INSERT INTO "{table_name}" ("{table_name}") VALUES (\'optimize\');'
+                )
+                bump_table_version(cursor, table_name)
+                logger.info(f"全文检索表 [{table_name}] 写入 {rows} 行")
+    finally:
+        cursor.close()
+    return row_counts
+
+
+def to_fts_query(text: str) -> str:
+    """
+    将自由文本转换为安全的 FTS5 查询（各词以 OR 连接）
+
+    Args:
+        text (str): 用户输入文本
+
+    Returns:
+        str: FTS5 MATCH 表达式，无有效词时为空串
+    """
+    tokens = _TOKEN_PATTERN.findall(text.replace("_", " "))
+    return " OR ".join(f'"{token}"' for token in tokens)
+
+
+def search_fts(
+    table_name: str,
+    query: str,
+    *,
+    limit: int = 10,
+    raw: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[dict[str, Any]]:
+    """
+    按 bm25 排序检索全文索引表
+
+    Args:
+        table_name (str): 全文检索表名称，见 `FTS_TABLES`
+        query (str): 检索文本
+        limit (int): 返回的最大条数
+        raw (bool): 为 True 时直接将 query 作为 FTS5 语法使用
+        conn (Optional[sqlite3.Connection]): 复用的数据库连接，为空时使用 `DatabaseQueryPool` 的只读连接
+
+    Returns:
+        list[dict[str, Any]]: 命中记录，包含各列、`score`（越小越相关）与 `snippet`
+
+    Example:
+        >>> search_fts("qa_fts", "nose bleeding", limit=3)
+        [{"question": "...", "answer": "...", "score": -9.8, "snippet": "...[bleeding]..."}]
+    """
+    if table_name not in FTS_TABLES:
+        raise ValueError(f"未知的全文检索表: {table_name}")
+    match = query if raw else to_fts_query(query)
+    if not match:
+        return []
+
+    columns = FTS_TABLES[table_name]
+    weights = ", ".join(str(w) for w in FTS_COLUMN_WEIGHTS[table_name])
+    search_sql = (
+        f'SELECT {", ".join(columns)}, bm25("{table_name}", {weights}) AS score, '
+        f"snippet(\"{table_name}\", -1, '[', ']', '...', 16) AS snippet "
+        f'FROM "{table_name}" WHERE "{table_name}" MATCH ? ORDER BY score LIMIT ?;'
+    )
+    if conn is None:
+        return DatabaseQueryPool().query(search_sql, (match, limit))
+    cursor = conn.execute(search_sql, (match, limit))
+    names = [description[0] for description in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
@@ -0,0 +1,229 @@
+"""
+查询结果缓存模块
+
+以规范化 SQL 与参数为键缓存只读查询结果（LRU，同时限制条目数与估算字节数）。
+每个缓存条目记录查询涉及的数据表版本号，数据表被重建后版本号递增，
+旧条目在下次访问时失效。
+"""
+
+import re
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable, Optional, Sequence
+
+from static_module import QueryCacheStats
+
+QUERY_CACHE_MAX_ENTRIES: int = 4096
+"""缓存的最大条目数"""
+
+QUERY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+"""缓存结果的最大估算字节数"""
+
+_WHITESPACE_PATTERN: re.Pattern = re.compile(r"\s+")
+_FROM_PATTERN: re.Pattern = re.compile(r"\b(?:FROM|JOIN)\b\s*", re.IGNORECASE)
+_TABLE_REF_PATTERN: re.Pattern = re.compile(
+    r'(?:main\.)?("(?:[^"]|"")+"|[A-Za-z_][\w-]*)', re.IGNORECASE
+)
+_ALIAS_PATTERN: re.Pattern = re.compile(
+    r"\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|USING|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL"
+    r"|OUTER|GROUP|ORDER|LIMIT|UNION|EXCEPT|INTERSECT|HAVING|WINDOW|INDEXED|NOT)\b)"
+    r'(?:"(?:[^"]|"")+"|[A-Za-z_]\w*)',
+    re.IGNORECASE,
+)
+_COMMA_PATTERN: re.Pattern = re.compile(r"\s*,\s*")
+_CLAUSE_END_PATTERN: re.Pattern = re.compile(
+    r"(?:WHERE|GROUP|ORDER|LIMIT|HAVING|WINDOW|UNION|EXCEPT|INTERSECT)\b", re.IGNORECASE
+)
+
+CacheKey = tuple[str, tuple[Hashable, ...]]
+TableVersions = tuple[tuple[str, int], ...]
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """合并空白并去掉末尾分号，使格式不同的相同语句共用缓存条目"""
+    return _WHITESPACE_PATTERN.sub(" ", sql).strip().rstrip(";").rstrip()
+
+
+def make_cache_key(sql: str, params: Sequence[Any]) -> Optional[CacheKey]:
+    """生成缓存键，参数不可哈希（如列表）时返回 None"""
+    key = (normalize_sql(sql), tuple(params))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _unquote(name: str) -> str:
+    """去掉标识符两侧的双引号"""
+    return name[1:-1].replace('""', '"') if name.startswith('"') else name
+
+
+def _has_unparsed_comma(sql: str, pos: int) -> bool:
+    """
+    从 pos 到 FROM 子句结束（子句关键字、外层右括号或语句结束）之间
+    是否还有最外层的逗号（如 `JOIN b USING (id), c`），即存在未识别的表
+    """
+    depth = 0
+    i = pos
+    while i < len(sql):
+        ch = sql[i]
+        if ch in "'\"":
+            end = sql.find(ch, i + 1)
+            while end != -1 and sql.startswith(ch, end + 1):
+                end = sql.find(ch, end + 2)  # 转义的引号
+            if end == -1:
+                return True
+            i = end
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                return False
+        elif ch == ";":
+            return False
+        elif depth == 0:
+            if ch == ",":
+                return True
+            if not (sql[i - 1 : i].isalnum() or sql[i - 1 : i] == "_") and (
+                _CLAUSE_END_PATTERN.match(sql, i)
+            ):
+                return False
+        i += 1
+    return False
+
+
+@lru_cache(maxsize=1024)
+def extract_tables(sql: str) -> Optional[tuple[str, ...]]:
+    """
+    提取 SQL 中 FROM / JOIN 之后引用的数据表名称（含逗号分隔的 FROM 列表，去重并排序）
+
+    FROM / JOIN 之后为子查询时，子查询中的表由其自身的 FROM 提取；
+    无法确定引用了哪些表时（如逗号列表中出现子查询、JOIN 约束之后的逗号或无法识别的写法）返回 None，
+    调用方此时不应使用缓存。
+    """
+    names: set[str] = set()
+    for match in _FROM_PATTERN.finditer(sql):
+        pos = match.end()
+        while True:
+            if sql.startswith("(", pos):
+                if pos != match.end():
+                    return None  # 逗号列表中的子查询
+                break
+            ref = _TABLE_REF_PATTERN.match(sql, pos)
+            if ref is None:
+                return None
+            names.add(_unquote(ref.group(1)))
+            pos = ref.end()
+            alias = _ALIAS_PATTERN.match(sql, pos)
+            if alias is not None:
+                pos = alias.end()
+            comma = _COMMA_PATTERN.match(sql, pos)
+            if comma is None:
+                break
+            pos = comma.end()
+        if _has_unparsed_comma(sql, pos):
+            return None
+    return tuple(sorted(names))
+
+
+def estimate_result_size(rows: list[dict[str, Any]]) -> int:
+    """粗略估算查询结果占用的字节数"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row.values():
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryResultCache:
+    """线程安全的 LRU 查询结果缓存"""
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        max_bytes: int = QUERY_CACHE_MAX_BYTES,
+    ):
+        self.max_entries: int = max_entries
+        """最大条目数"""
+        self.max_bytes: int = max_bytes
+        """最大估算字节数"""
+        self._entries: OrderedDict[
+            CacheKey, tuple[TableVersions, list[dict[str, Any]], int]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = QueryCacheStats()
+
+    def get(
+        self, key: CacheKey, versions: TableVersions
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        读取缓存结果
+
+        Args:
+            key (CacheKey): 缓存键
+            versions (TableVersions): 查询涉及的数据表当前版本号
+
+        Returns:
+            Optional[list[dict[str, Any]]]: 结果副本，未命中或已失效时为 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            cached_versions, rows, size = entry
+            if cached_versions != versions:
+                del self._entries[key]
+                self._stats.bytes -= size
+                self._stats.invalidations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+        return [dict(row) for row in rows]
+
+    def put(
+        self, key: CacheKey, versions: TableVersions, rows: list[dict[str, Any]]
+    ) -> None:
+        """写入缓存结果，超出条目数或字节上限时淘汰最久未使用的条目"""
+        size = estimate_result_size(rows)
+        if size > self.max_bytes:
+            return
+        rows = [dict(row) for row in rows]
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._stats.bytes -= previous[2]
+            self._entries[key] = (versions, rows, size)
+            self._stats.bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._stats.bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._stats.bytes -= evicted_size
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存（保留命中统计）"""
+        with self._lock:
+            self._entries.clear()
+            self._stats.bytes = 0
+
+    def stats(self) -> QueryCacheStats:
+        """返回当前统计信息的快照"""
+        with self._lock:
+            return QueryCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                bytes=self._stats.bytes,
+            )
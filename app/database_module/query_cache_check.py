@@ -0,0 +1,78 @@
+"""
+查询结果缓存一致性检查
+
+在临时数据库上验证查询结果缓存不会返回过期数据：
+有版本号的数据表在版本号递增后缓存失效；系统表（sqlite_master）以及
+不在版本表中的数据表不经缓存，其他连接写入后立即可见；
+不在版本表中的数据表新增列后，按列查询无需重建连接池即可使用新列。
+
+在 app 目录下运行：python -m database_module.query_cache_check
+"""
+
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from singleton_module import SingletonMeta
+from utility_module import logger
+from .build_manifest import TABLE_VERSION_TABLE, bump_table_version
+from .database_query import DatabaseQueryPool
+
+
+def check_query_cache_consistency() -> None:
+    """
+    执行查询结果缓存一致性检查，结果不符合预期时抛出 AssertionError
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_path = Path(temp_dir) / "query_cache_check.db"
+        writer = sqlite3.connect(database_path)
+        writer.execute('CREATE TABLE "v" ("k" TEXT, "n" INTEGER);')
+        writer.execute('INSERT INTO "v" VALUES (\'a\', 1);')
+        bump_table_version(writer.cursor(), "v")
+        writer.commit()
+
+        # 绕过单例，避免影响全局连接池
+        pool: DatabaseQueryPool = super(SingletonMeta, DatabaseQueryPool).__call__(
+            database_path
+        )
+        try:
+            # 有版本号的表：命中缓存，版本号递增后失效
+            assert pool.lookup("v", "k", "a") == [{"k": "a", "n": 1}]
+            assert pool.lookup("v", "k", "a") == [{"k": "a", "n": 1}]
+            assert pool.cache.stats().hits == 1, "有版本号的表应命中缓存"
+            writer.execute('UPDATE "v" SET "n" = 2;')
+            bump_table_version(writer.cursor(), "v")
+            writer.commit()
+            assert pool.lookup("v", "k", "a") == [{"k": "a", "n": 2}], "版本号递增后缓存应失效"
+            assert pool.multi_get("v", "k", ["a"]) == {"a": [{"k": "a", "n": 2}]}
+
+            # 系统表不经缓存
+            tables_sql = "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name;"
+            before = [row["name"] for row in pool.query(tables_sql)]
+            writer.execute('CREATE TABLE "u" ("k" TEXT);')
+            writer.commit()
+            after = [row["name"] for row in pool.query(tables_sql)]
+            assert "u" not in before and "u" in after, "sqlite_master 的查询结果不应被缓存"
+
+            # 不在版本表中的表不经缓存
+            assert pool.query('SELECT * FROM "u";') == []
+            writer.execute('INSERT INTO "u" VALUES (\'b\');')
+            writer.commit()
+            assert pool.query('SELECT * FROM "u";') == [{"k": "b"}], "无版本号的表不应被缓存"
+            assert pool.query(f'SELECT * FROM "{TABLE_VERSION_TABLE}";') == [
+                {"table_name": "v", "version": 2}
+            ]
+
+            # 不在版本表中的表新增列后立即可用
+            assert pool.lookup("u", "k", "b") == [{"k": "b"}]
+            writer.execute('ALTER TABLE "u" ADD COLUMN "m" INTEGER;')
+            writer.commit()
+            assert pool.lookup("u", "k", "b", columns=["m"]) == [{"m": None}]
+        finally:
+            pool.close_all()
+            writer.close()
+    logger.info("查询结果缓存一致性检查通过")
+
+
+if __name__ == "__main__":
+    check_query_cache_consistency()
@@ -0,0 +1,245 @@
+"""
+关系表模块
+
+将增强药物表中以 JSON 字符串存储的 matched_disease_keys / symptom_severity
+以及疾病-症状数据集拆分为整数键的关系表，使“某疾病的药物”
+“具有某症状的疾病”等查询成为索引连接。
+"""
+
+import json
+import sqlite3
+from typing import Any, Iterable, Optional
+
+from dataset_module import disease_key
+from utility_module import logger
+from .database_query import DatabaseQueryPool, find_table_with_columns
+from .build_manifest import bump_table_version
+
+ENTITY_TABLES: dict[str, str] = {
+    "drug": "drug_id",
+    "disease_key": "disease_id",
+    "symptom": "symptom_id",
+}
+"""实体表名称 → 整数主键列"""
+
+RELATION_TABLES: tuple[str, ...] = ("drug_disease", "disease_symptom", "symptom_weight")
+"""关系表名称"""
+
+DERIVED_TABLES: tuple[str, ...] = (*ENTITY_TABLES, *RELATION_TABLES)
+"""由本模块生成的全部数据表"""
+
+ENHANCED_DRUG_COLUMNS: tuple[str, ...] = ("drug_name", "matched_disease_keys")
+"""识别增强药物表所需的列"""
+
+
+def parse_json_list(value: Optional[str]) -> list[Any]:
+    """解析 JSON 数组字符串，失败时返回空列表"""
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def _parse_json_dict(value: Optional[str]) -> dict[str, Any]:
+    """解析 JSON 对象字符串，失败时返回空字典"""
+    if not value:
+        return {}
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+class _Vocabulary:
+    """名称 → 连续整数 ID 的映射"""
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+
+    def get_id(self, name: str) -> int:
+        if name not in self.ids:
+            self.ids[name] = len(self.ids) + 1
+        return self.ids[name]
+
+    def rows(self) -> Iterable[tuple[int, str]]:
+        return ((entity_id, name) for name, entity_id in self.ids.items())
+
+
+def _create_derived_tables(cursor: sqlite3.Cursor) -> None:
+    """重建实体表与关系表（含覆盖索引）"""
+    for table_name in DERIVED_TABLES:
+        cursor.execute(f'DROP TABLE IF EXISTS "{table_name}";')
+    for table_name, id_column in ENTITY_TABLES.items():
+        cursor.execute(
+            f'CREATE TABLE "{table_name}" ('
+            f'"{id_column}" INTEGER PRIMARY KEY, "name" TEXT NOT NULL UNIQUE);'
+        )
+    cursor.execute(
+        'CREATE TABLE "drug_disease" ('
+        '"drug_id" INTEGER NOT NULL, "disease_id" INTEGER NOT NULL, '
+        'PRIMARY KEY ("drug_id", "disease_id")) WITHOUT ROWID;'
+    )
+    cursor.execute(
+        'CREATE INDEX "idx_drug_disease_disease" '
+        'ON "drug_disease" ("disease_id", "drug_id");'
+    )
+    cursor.execute(
+        'CREATE TABLE "disease_symptom" ('
+        '"disease_id" INTEGER NOT NULL, "symptom_id" INTEGER NOT NULL, '
+        'PRIMARY KEY ("disease_id", "symptom_id")) WITHOUT ROWID;'
+    )
+    cursor.execute(
+        'CREATE INDEX "idx_disease_symptom_symptom" '
+        'ON "disease_symptom" ("symptom_id", "disease_id");'
+    )
+    cursor.execute(
+        'CREATE TABLE "symptom_weight" ('
+        '"symptom_id" INTEGER PRIMARY KEY, "weight" INTEGER NOT NULL);'
+    )
+    cursor.execute(
+        'CREATE INDEX "idx_symptom_weight_weight" '
+        'ON "symptom_weight" ("weight", "symptom_id");'
+    )
+
+
+def build_relation_tables(conn: sqlite3.Connection) -> dict[str, int]:
+    """
+    构建整数键关系表
+
+    数据来源（均为已入库的数据表，缺失时对应关系为空）：
+    - drug_disease: 增强药物表的 matched_disease_keys
+    - disease_symptom: 疾病-症状数据集（Disease, Symptom_1..17）
+    - symptom_weight: 症状严重度数据集（Symptom, weight），并以增强药物表的 symptom_severity 补充
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+
+    Returns:
+        dict[str, int]: 每个关系表写入的行数
+    """
+    drugs, diseases, symptoms = _Vocabulary(), _Vocabulary(), _Vocabulary()
+    drug_disease: set[tuple[int, int]] = set()
+    disease_symptom: set[tuple[int, int]] = set()
+    symptom_weight: dict[int, int] = {}
+
+    severity_table = find_table_with_columns(
+        conn, ("Symptom", "weight"), exclude=DERIVED_TABLES
+    )
+    if severity_table is not None:
+        for symptom, weight in conn.execute(
+            f'SELECT "Symptom", "weight" FROM "{severity_table}" '
+            f'WHERE "Symptom" IS NOT NULL AND "weight" IS NOT NULL;'
+        ):
+            symptom_weight[symptoms.get_id(str(symptom).strip())] = int(weight)
+
+    disease_symptom_table = find_table_with_columns(
+        conn, ("Disease", "Symptom_1"), exclude=DERIVED_TABLES
+    )
+    if disease_symptom_table is not None:
+        cursor = conn.execute(f'SELECT * FROM "{disease_symptom_table}";')
+        names = [description[0] for description in cursor.description]
+        symptom_indexes = [i for i, name in enumerate(names) if name.startswith("Symptom")]
+        disease_index = names.index("Disease")
+        for row in cursor:
+            if row[disease_index] is None:
+                continue
+            disease_id = diseases.get_id(disease_key(row[disease_index]))
+            for i in symptom_indexes:
+                if row[i] is not None and str(row[i]).strip():
+                    disease_symptom.add(
+                        (disease_id, symptoms.get_id(str(row[i]).strip()))
+                    )
+
+    enhanced_table = find_table_with_columns(
+        conn, ENHANCED_DRUG_COLUMNS, exclude=DERIVED_TABLES
+    )
+    if enhanced_table is not None:
+        enhanced_columns = {
+            row[1] for row in conn.execute(f'PRAGMA table_info("{enhanced_table}");')
+        }
+        severity_select = (
+            ', "symptom_severity"' if "symptom_severity" in enhanced_columns else ", NULL"
+        )
+        for drug_name, keys_json, severity_json in conn.execute(
+            f'SELECT "drug_name", "matched_disease_keys"{severity_select} '
+            f'FROM "{enhanced_table}" WHERE "drug_name" IS NOT NULL;'
+        ):
+            drug_id = drugs.get_id(str(drug_name).strip().lower())
+            disease_ids = [
+                diseases.get_id(str(key)) for key in parse_json_list(keys_json)
+            ]
+            for disease_id in disease_ids:
+                drug_disease.add((drug_id, disease_id))
+            for symptom, weight in _parse_json_dict(severity_json).items():
+                symptom_id = symptoms.get_id(str(symptom).strip())
+                symptom_weight.setdefault(symptom_id, int(weight))
+    else:
+        logger.warning("数据库中未找到增强药物表，drug_disease 关系表为空")
+
+    rows: dict[str, list[tuple]] = {
+        "drug": list(drugs.rows()),
+        "disease_key": list(diseases.rows()),
+        "symptom": list(symptoms.rows()),
+        "drug_disease": sorted(drug_disease),
+        "disease_symptom": sorted(disease_symptom),
+        "symptom_weight": sorted(symptom_weight.items()),
+    }
+    cursor = conn.cursor()
+    try:
+        with conn:
+            _create_derived_tables(cursor)
+            # 实体表与关系表均为两列
+            for table_name, table_rows in rows.items():
+                cursor.executemany(
+                    f'INSERT INTO "{table_name}" VALUES (?, ?);', table_rows
+                )
+                bump_table_version(cursor, table_name)
+    finally:
+        cursor.close()
+    row_counts = {table_name: len(rows[table_name]) for table_name in RELATION_TABLES}
+    logger.info(f"关系表构建完成: {row_counts}")
+    return row_counts
+
+
+def drugs_for_disease(disease_key: str) -> list[str]:
+    """
+    查询匹配到指定 disease_key 的药物
+
+    Args:
+        disease_key (str): 疾病标准名
+
+    Returns:
+        list[str]: 药物名称（按名称排序）
+    """
+    rows = DatabaseQueryPool().query(
+        'SELECT "drug"."name" AS name FROM "disease_key" '
+        'JOIN "drug_disease" USING ("disease_id") '
+        'JOIN "drug" USING ("drug_id") '
+        'WHERE "disease_key"."name" = ? ORDER BY name;',
+        (disease_key,),
+    )
+    return [row["name"] for row in rows]
+
+
+def diseases_with_symptom(symptom: str) -> list[str]:
+    """
+    查询具有指定症状的疾病
+
+    Args:
+        symptom (str): 症状名称
+
+    Returns:
+        list[str]: disease_key（按名称排序）
+    """
+    rows = DatabaseQueryPool().query(
+        'SELECT "disease_key"."name" AS name FROM "symptom" '
+        'JOIN "disease_symptom" USING ("symptom_id") '
+        'JOIN "disease_key" USING ("disease_id") '
+        'WHERE "symptom"."name" = ? ORDER BY name;',
+        (symptom,),
+    )
+    return [row["name"] for row in rows]
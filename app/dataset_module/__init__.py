@@ -4,14 +4,45 @@
 在这里预处理和加载数据集
 """
 
-from .disease_data_process import load_disease_with_symptoms
-from .kaggle_download import download_and_open_datasets
+from .disease_data_process import (
+    load_disease_with_symptoms,
+    load_disease_symptom_matrix,
+    disease_key,
+)
+from .symptom_registry import SymptomRegistry, canonical_symptom, symptom_key
+from .qa_corpus import QACorpus, convert_json_to_jsonl, build_qa_indexes
+from .column_profiler import ColumnProfiler, profile_data_frame, profile_dataset
+from .kaggle_download import (
+    download_and_open_datasets,
+    KaggleDatasetCache,
+    KagglehubProvider,
+    LocalDirectoryProvider,
+)
 from .data_process import *
 
 __all__ = [
     "download_and_open_datasets",
+    "KaggleDatasetCache",
+    "KagglehubProvider",
+    "LocalDirectoryProvider",
     "load_dataset",
+    "discover_dataset_files",
+    "clean_data_frame",
+    "read_csv_fast",
+    "iter_dataset_chunks",
+    "compact_data_frame",
     "visualize_data_frame",
     "generate_visualize_data_frame",
     "load_disease_with_symptoms",
+    "load_disease_symptom_matrix",
+    "disease_key",
+    "SymptomRegistry",
+    "canonical_symptom",
+    "symptom_key",
+    "QACorpus",
+    "convert_json_to_jsonl",
+    "build_qa_indexes",
+    "ColumnProfiler",
+    "profile_data_frame",
+    "profile_dataset",
 ]
@@ -0,0 +1,99 @@
+"""
+HTML 清洗基准测试
+
+对比逐单元格 BeautifulSoup 清洗（`df.map(clean_with_bs4)`）与向量化快速路径
+（`clean_html_series`）在药物数据集上的输出一致性与吞吐量。
+
+在 app 目录下运行：python -m dataset_module.cleaning_benchmark
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from utility_module import logger
+from .data_process import (
+    clean_html_series,
+    clean_with_bs4,
+    discover_dataset_files,
+    prepare_data_frame,
+)
+
+DRUG_DATASET_KEYWORD: str = "drug"
+"""默认基准数据集：路径中包含该关键字的数据集文件"""
+
+
+def discover_drug_dataset_files(
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> list[str]:
+    """发现药物相关的数据集文件"""
+    return [
+        file
+        for file in discover_dataset_files(file_dir)
+        if DRUG_DATASET_KEYWORD in Path(file).relative_to(file_dir).as_posix().lower()
+    ]
+
+
+def benchmark_cleaning(
+    file_name: Optional[list[str]] = None,
+    *,
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> list[dict[str, Any]]:
+    """
+    运行清洗基准测试
+
+    参数：
+    - file_name: 数据集文件列表，为 None 时使用目录下所有药物数据集
+    - file_dir: 数据集文件所在目录
+
+    返回：
+    - 每个文件的测试结果（单元格数、两种路径的耗时与吞吐量、输出是否一致）
+    """
+    if file_name is None:
+        file_name = discover_drug_dataset_files(file_dir)
+    results: list[dict[str, Any]] = []
+    for file in file_name:
+        full_path = Path(file_dir, file)
+        df = prepare_data_frame(pd.read_csv(full_path))
+        cells = df.size
+
+        start = time.perf_counter()
+        reference = df.map(clean_with_bs4)
+        reference_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = df.apply(clean_html_series)
+        fast_seconds = time.perf_counter() - start
+
+        try:
+            pd.testing.assert_frame_equal(reference, fast)
+            equal = True
+        except AssertionError as e:
+            logger.error(f"{full_path.name} 清洗结果不一致: {e}")
+            equal = False
+
+        result = {
+            "file": full_path.name,
+            "cells": cells,
+            "reference_seconds": reference_seconds,
+            "fast_seconds": fast_seconds,
+            "reference_cells_per_second": cells / reference_seconds if reference_seconds else float("inf"),
+            "fast_cells_per_second": cells / fast_seconds if fast_seconds else float("inf"),
+            "equal": equal,
+        }
+        results.append(result)
+        logger.info(
+            f"[{result['file']}] {cells:,} 个单元格："
+            f"BeautifulSoup {reference_seconds:.3f}s（{result['reference_cells_per_second']:,.0f} 个/秒），"
+            f"快速路径 {fast_seconds:.3f}s（{result['fast_cells_per_second']:,.0f} 个/秒），"
+            f"加速 {reference_seconds / fast_seconds if fast_seconds else float('inf'):.1f} 倍，"
+            f"输出{'一致' if equal else '不一致'}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_cleaning()
@@ -0,0 +1,235 @@
+"""
+流式列概况统计
+
+对数据集分块单遍扫描，统计每列的行数、空值率、基数与高频值。
+内存占用与数据量无关：高频值使用 Misra-Gries 摘要（最多保留 `DEFAULT_TOP_K_CAPACITY` 个计数器），
+基数使用 HyperLogLog 估计（`2 ** DEFAULT_HLL_PRECISION` 个寄存器）；
+每个分块只对其中的不同取值做字符串转换与哈希。
+
+不同取值数不超过计数器容量时，Misra-Gries 摘要不会发生扣减，高频值计数与基数均为精确值。
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from static_module import ColumnProfile
+from .data_process import DEFAULT_CHUNK_ROWS, iter_dataset_chunks
+
+DEFAULT_TOP_K_CAPACITY: int = 1000
+"""Misra-Gries 摘要的计数器容量，高频值计数的误差不超过 非空值数 / (容量 + 1)"""
+
+DEFAULT_HLL_PRECISION: int = 14
+"""HyperLogLog 寄存器数量的对数，相对误差约为 1.04 / sqrt(2 ** precision)"""
+
+
+class MisraGries:
+    """Misra-Gries 高频值摘要（可按分块合并）"""
+
+    def __init__(self, capacity: int = DEFAULT_TOP_K_CAPACITY):
+        self.capacity: int = capacity
+        """计数器容量"""
+        self.counters: dict[str, int] = {}
+        """取值 → 计数下界，按首次出现的顺序排列"""
+        self.decrement: int = 0
+        """累计扣减量，即任一计数的最大低估量"""
+
+    @property
+    def exact(self) -> bool:
+        """是否未发生过扣减（计数器中即为全部取值的精确计数）"""
+        return self.decrement == 0
+
+    def update(self, labels: Iterable[str], counts: Iterable[int]) -> None:
+        """合并一个分块中各取值的计数"""
+        counters = self.counters
+        for label, count in zip(labels, counts):
+            counters[label] = counters.get(label, 0) + int(count)
+        if len(counters) > self.capacity:
+            # 扣减第 capacity + 1 大的计数，丢弃不再为正的计数器
+            counts_array = np.fromiter(counters.values(), dtype=np.int64)
+            kth = len(counts_array) - (self.capacity + 1)
+            threshold = int(np.partition(counts_array, kth)[kth])
+            self.counters = {
+                label: count - threshold
+                for label, count in counters.items()
+                if count > threshold
+            }
+            self.decrement += threshold
+
+    def top(self, k: Optional[int] = None) -> list[tuple[str, int]]:
+        """计数最高的 k 个取值（计数相同时按首次出现的顺序）"""
+        items = sorted(self.counters.items(), key=lambda item: -item[1])
+        return items if k is None else items[:k]
+
+
+class HyperLogLog:
+    """HyperLogLog 基数估计"""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision: int = precision
+        """寄存器数量的对数"""
+        self.registers: np.ndarray = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """加入一组 64 位哈希值"""
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # rest 的二进制位长（分高低 32 位用 frexp 精确计算）
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, labels: Sequence[str]) -> None:
+        """加入一组取值"""
+        self.update_hashes(pd.util.hash_array(np.asarray(labels, dtype=object)))
+
+    def estimate(self) -> float:
+        """估计的不同取值数"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # 小基数时使用线性计数
+            return m * np.log(m / zeros)
+        return float(raw)
+
+
+class _ColumnSketch:
+    """单列的流式统计状态"""
+
+    def __init__(self, name: str, capacity: int, precision: int):
+        self.name = name
+        self.rows = 0
+        self.null_count = 0
+        self.heavy_hitters = MisraGries(capacity)
+        self.distinct = HyperLogLog(precision)
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        self.null_count += int(series.isna().sum())
+        counts = series.value_counts(sort=False, dropna=True)
+        counts = counts[counts > 0]  # 分类类型会包含计数为 0 的类别
+        labels = [str(value) for value in counts.index]
+        self.heavy_hitters.update(labels, counts.to_numpy())
+        self.distinct.update(labels)
+
+    def profile(self) -> ColumnProfile:
+        exact = self.heavy_hitters.exact
+        return ColumnProfile(
+            name=self.name,
+            rows=self.rows,
+            null_count=self.null_count,
+            distinct=(
+                len(self.heavy_hitters.counters)
+                if exact
+                else max(round(self.distinct.estimate()), len(self.heavy_hitters.counters))
+            ),
+            distinct_exact=exact,
+            top_values=self.heavy_hitters.top(),
+            top_values_exact=exact,
+            error_bound=self.heavy_hitters.decrement,
+        )
+
+
+class ColumnProfiler:
+    """
+    分块单遍统计各列概况
+
+    Example:
+        >>> profiler = ColumnProfiler()
+        >>> for chunk in iter_dataset_chunks("drugsComTrain_raw"):
+        ...     profiler.update(chunk)
+        >>> profiler.profiles()["condition"].top_values[:3]
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = DEFAULT_TOP_K_CAPACITY,
+        precision: int = DEFAULT_HLL_PRECISION,
+    ):
+        self.capacity: int = capacity
+        """Misra-Gries 计数器容量"""
+        self.precision: int = precision
+        """HyperLogLog 精度"""
+        self._sketches: dict[str, _ColumnSketch] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """加入一个分块"""
+        for col in chunk.columns:
+            sketch = self._sketches.get(col)
+            if sketch is None:
+                sketch = self._sketches[col] = _ColumnSketch(
+                    str(col), self.capacity, self.precision
+                )
+            sketch.update(chunk[col])
+
+    def profiles(self) -> dict[str, ColumnProfile]:
+        """各列概况，顺序与列的首次出现顺序一致"""
+        return {col: sketch.profile() for col, sketch in self._sketches.items()}
+
+
+def profile_data_frame(
+    df: pd.DataFrame,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    capacity: int = DEFAULT_TOP_K_CAPACITY,
+    precision: int = DEFAULT_HLL_PRECISION,
+) -> dict[str, ColumnProfile]:
+    """
+    按行分块统计内存中数据帧的各列概况
+
+    参数：
+    - df: 数据帧
+    - chunk_size: 每块行数
+    - capacity: Misra-Gries 计数器容量
+    - precision: HyperLogLog 精度
+
+    返回：
+    - 列名 → 列概况
+    """
+    profiler = ColumnProfiler(capacity=capacity, precision=precision)
+    for start in range(0, max(len(df), 1), chunk_size):
+        profiler.update(df.iloc[start : start + chunk_size])
+    return profiler.profiles()
+
+
+def profile_dataset(
+    file: str,
+    *,
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+    columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    capacity: int = DEFAULT_TOP_K_CAPACITY,
+    precision: int = DEFAULT_HLL_PRECISION,
+) -> dict[str, ColumnProfile]:
+    """
+    流式统计数据集文件的各列概况（分块读取并清洗，不加载整个文件）
+
+    参数：
+    - file: 数据集文件路径（相对于 file_dir）
+    - file_dir: 数据集文件所在目录
+    - columns: 只统计这些列，为空时统计全部列
+    - chunk_size: 每次读取的行数
+    - capacity: Misra-Gries 计数器容量
+    - precision: HyperLogLog 精度
+
+    返回：
+    - 列名 → 列概况
+    """
+    profiler = ColumnProfiler(capacity=capacity, precision=precision)
+    for chunk in iter_dataset_chunks(
+        file, file_dir=file_dir, columns=columns, chunk_size=chunk_size
+    ):
+        profiler.update(chunk)
+    return profiler.profiles()
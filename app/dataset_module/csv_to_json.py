@@ -2,12 +2,39 @@ from optparse import Option
 import os
 import sys
 import json
-from typing import Optional, Callable
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, IO, Optional, Callable
 import pandas as pd
 from pathlib import Path
 import ast
 import re
 
+JSON_FORMATS: tuple[str, ...] = ("json", "jsonl")
+"""输出格式：json 为缩进 4 格的 JSON 数组，jsonl 为每行一条记录"""
+
+DEFAULT_CHUNK_ROWS: int = 50_000
+"""流式转换时每次读取的行数"""
+
+FORMAT_SAMPLE_SIZE: int = 200
+"""检测列格式时抽样的不同取值数"""
+
+CONVERTER_MEMO_MAX_ENTRIES: int = 100_000
+"""每列转换结果缓存的最大条目数"""
+
+ARRAY_FORMATS: tuple[str, ...] = ("json", "python_list", "mixed")
+"""数组字符串列的格式：JSON、仅含无转义字符串的 Python 列表、需要逐个尝试的混合格式"""
+
+_DISEASE_DESCRIPTION_PATTERN: re.Pattern = re.compile(
+    r"\[(?P<disease>.*?)\]\s*(?P<description>.*)"
+)
+_PYTHON_STRING_LIST_PATTERN: re.Pattern = re.compile(
+    r"""\[\s*(?:(?:'[^'\\]*'|"[^"\\]*")\s*(?:,\s*|(?=\])))*\]"""
+)
+_PYTHON_STRING_ITEM_PATTERN: re.Pattern = re.compile(r"""'([^'\\]*)'|"([^"\\]*)\"""")
+_json_decode: Callable[[str], Any] = json.JSONDecoder().decode
+
 
 def parse_array_string(val):
     """解析数组字符串"""
@@ -57,64 +84,401 @@ def parse_disease_description(val: str) -> dict[str, str]:
         return {}
     list_of_pairs = val.split(" | ")
     # [disease] description
-    pattern: re.Pattern = re.compile(r"\[(?P<disease>.*?)\]\s*(?P<description>.*)")
     result = {}
     for pair in list_of_pairs:
         if pair is not None:
-            match = pattern.match(pair)
+            match = _DISEASE_DESCRIPTION_PATTERN.match(pair)
             if match:
                 disease, description = match.groupdict().values()
                 result[disease] = description
     return result
 
 
-def csv_to_json(
+def _parse_python_string_list(val: str) -> Any:
+    """解析仅含无转义字符串的 Python 列表（如 "['a', 'b']"），其余写法退回 parse_array_string"""
+    if _PYTHON_STRING_LIST_PATTERN.fullmatch(val):
+        return [
+            single or double for single, double in _PYTHON_STRING_ITEM_PATTERN.findall(val)
+        ]
+    return parse_array_string(val)
+
+
+def detect_array_format(sample: list[str]) -> str:
+    """
+    根据抽样的取值检测数组字符串列的格式
+
+    参数：
+    - sample: 列中的部分原始字符串
+
+    返回：
+    - `ARRAY_FORMATS` 之一：全部可按 JSON 解析时为 json，全部为简单 Python 字符串列表时为 python_list，否则为 mixed
+    """
+    values = [val.strip() for val in sample if val.strip()]
+    is_json = True
+    for val in values:
+        try:
+            _json_decode(val)
+        except json.JSONDecodeError:
+            is_json = False
+            break
+    if is_json:
+        return "json"
+    if all(_PYTHON_STRING_LIST_PATTERN.fullmatch(val) for val in values):
+        return "python_list"
+    return "mixed"
+
+
+def compile_array_parser(array_format: str) -> Callable[[str], Any]:
+    """
+    生成数组字符串列的解析函数，结果与 `parse_array_string` 一致
+
+    json / python_list 格式只运行对应的快速解析器，个别不符合该格式的取值才退回
+    `parse_array_string`（JSON → literal_eval → 原值）。
+    """
+    if array_format not in ARRAY_FORMATS:
+        raise ValueError(f"未知的数组格式: {array_format}")
+    if array_format == "mixed":
+        return parse_array_string
+
+    if array_format == "json":
+
+        def fast_parse(val: str) -> Any:
+            try:
+                return _json_decode(val)
+            except json.JSONDecodeError:
+                return parse_array_string(val)
+
+    else:
+        fast_parse = _parse_python_string_list
+
+    def parse(val: str) -> Any:
+        val = val.strip()
+        return fast_parse(val) if val else []
+
+    return parse
+
+
+class ColumnConverter:
+    """
+    列转换器
+
+    首次转换时根据抽样检测列格式并选定解析函数（数组字符串列见 `compile_array_parser`，
+    其余转换函数原样使用），之后整列只对不同的取值各解析一次，重复字符串直接复用缓存结果。
+    结果中相同字符串对应的列表/字典为同一对象，仅供序列化，不应原地修改。
+    """
+
+    def __init__(
+        self,
+        func: Callable[[str], Any],
+        memo_max_entries: int = CONVERTER_MEMO_MAX_ENTRIES,
+    ):
+        self.func: Callable[[str], Any] = func
+        """逐个取值的转换函数"""
+        self.format: Optional[str] = None
+        """检测到的列格式，非数组字符串列为 None"""
+        self.memo_max_entries: int = memo_max_entries
+        """转换结果缓存的最大条目数"""
+        self._parser: Optional[Callable[[str], Any]] = None
+        self._memo: dict[str, Any] = {}
+
+    def prepare(self, sample: list[str]) -> None:
+        """根据抽样选定解析函数"""
+        if self.func is parse_array_string:
+            self.format = detect_array_format(sample)
+            self._parser = compile_array_parser(self.format)
+        else:
+            self._parser = self.func
+
+    def convert(self, series: pd.Series) -> pd.Series:
+        """转换一列原始字符串"""
+        uniques = series.unique()
+        if self._parser is None:
+            self.prepare([str(val) for val in uniques[:FORMAT_SAMPLE_SIZE]])
+        parser = self._parser
+        memo = self._memo
+        mapping: dict[str, Any] = {}
+        for val in uniques:
+            if val in memo:
+                mapping[val] = memo[val]
+                continue
+            result = parser(val)
+            mapping[val] = result
+            if len(memo) < self.memo_max_entries:
+                memo[val] = result
+        return pd.Series(
+            [mapping[val] for val in series], index=series.index, dtype=object
+        )
+
+
+class JsonRecordWriter:
+    """
+    流式记录写出器
+
+    逐条写出记录，内存占用与记录总数无关。json 格式的输出与
+    `json.dump(records, f, ensure_ascii=False, indent=4)` 完全一致。
+    """
+
+    def __init__(self, file: IO[str], json_format: str = "json"):
+        if json_format not in JSON_FORMATS:
+            raise ValueError(f"未知的输出格式: {json_format}")
+        self.file: IO[str] = file
+        """输出文件对象"""
+        self.json_format: str = json_format
+        """输出格式"""
+        self.count: int = 0
+        """已写出的记录数"""
+        self._encode: Callable[[Any], str] = json.JSONEncoder(
+            ensure_ascii=False, indent=None if json_format == "jsonl" else 4
+        ).encode
+
+    def write(self, record: dict[str, Any]) -> None:
+        """写出一条记录"""
+        if self.json_format == "jsonl":
+            self.file.write(self._encode(record))
+            self.file.write("\n")
+        else:
+            # JSON 字符串中的换行均已转义，按行缩进不会改变字符串内容
+            text = self._encode(record)
+            self.file.write("[\n    " if self.count == 0 else ",\n    ")
+            self.file.write(text.replace("\n", "\n    "))
+        self.count += 1
+
+    def close(self) -> None:
+        """写出数组结尾（不关闭文件对象）"""
+        if self.json_format == "json":
+            self.file.write("\n]" if self.count else "[]")
+
+    def __enter__(self) -> "JsonRecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def _sample_dtypes(sample: pd.DataFrame, convert_policy: dict[str, Callable]) -> dict[str, str]:
+    """
+    由首个分块推断的类型确定整个文件的读取类型：首块中为字符串的列整列按字符串读取，
+    避免之后的分块把该列中的数字解析为数值
+    """
+    return {
+        column: "str"
+        for column, dtype in sample.dtypes.items()
+        if column not in convert_policy and dtype.kind == "O"
+    }
+
+
+def _conform_chunk(chunk: pd.DataFrame, kinds: dict[str, str]) -> pd.DataFrame:
+    """
+    将分块中推断类型与首个分块不同的数值列转换为首块的类型（不重新解析）：
+    首块为浮点时整数列转为浮点；首块为整数而本块因缺失值成为浮点时，
+    若全部为整数值则转为可空整数（缺失值输出为空字符串）
+    """
+    for column, kind in kinds.items():
+        if column not in chunk.columns or chunk[column].dtype.kind == kind:
+            continue
+        series = chunk[column]
+        if kind == "f" and series.dtype.kind in "iu":
+            chunk[column] = series.astype("float64")
+        elif kind in "iu" and series.dtype.kind == "f":
+            values = series.dropna()
+            if (values == values.round()).all():
+                chunk[column] = series.astype("Int64").astype(object).where(series.notna())
+    return chunk
+
+
+def _iter_csv_chunks(
     csv_file_path: Path,
-    convert_policy: Optional[dict[str, Callable]] = {},
-    json_file_path: Optional[Path] = None,
-) -> None:
-    """将CSV文件转换为JSON格式"""
-    if not csv_file_path.exists():
-        raise FileNotFoundError(f"CSV文件 {csv_file_path} 不存在")
+    convert_policy: dict[str, Callable],
+    chunk_size: int,
+):
+    """
+    分块读取 CSV 文件，每行只解析一次
 
-    # 读取CSV文件
-    df = pd.read_csv(
+    先读取首个分块：不足一块时直接返回该结果（与整体读取一致）；否则由首块确定各列类型，
+    字符串列整列按字符串读取，数值列的类型差异在各分块读取后就地统一，保证同一列在所有记录中的类型一致。
+    首块之外的数据不会被重复解析。
+    """
+    sample = pd.read_csv(
+        csv_file_path, encoding="utf-8", converters=convert_policy, nrows=chunk_size
+    )
+    if len(sample) < chunk_size:
+        yield sample
+        return
+    kinds = {
+        column: dtype.kind
+        for column, dtype in sample.dtypes.items()
+        if column not in convert_policy and dtype.kind in "iuf"
+    }
+    dtypes = _sample_dtypes(sample, convert_policy)
+    del sample
+    with pd.read_csv(
         csv_file_path,
         encoding="utf-8",
         converters=convert_policy,
-    ).fillna("")
+        dtype=dtypes or None,
+        chunksize=chunk_size,
+    ) as reader:
+        for chunk in reader:
+            yield _conform_chunk(chunk, kinds)
+
+
+def csv_to_json(
+    csv_file_path: Path,
+    convert_policy: Optional[dict[str, Callable]] = {},
+    json_file_path: Optional[Path] = None,
+    *,
+    json_format: str = "json",
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+) -> dict[str, Any]:
+    """
+    将CSV文件转换为JSON格式
+
+    分块读取并流式写出，内存占用只与 chunk_size 有关；先写入临时文件，完成后再替换目标文件。
+    convert_policy 中的列经 `ColumnConverter` 整列转换，重复的字符串只解析一次。
 
-    # 将DataFrame转换为字典列表
-    data_dict_list = df.to_dict(orient="records")
+    参数：
+    - csv_file_path: CSV 文件路径
+    - convert_policy: 列名 → 转换函数
+    - json_file_path: 输出文件路径，为空时与 CSV 文件同名（后缀为 .json / .jsonl）
+    - json_format: 输出格式，见 `JSON_FORMATS`
+    - chunk_size: 每次读取的行数
+
+    返回：
+    - 转换结果（文件、行数、耗时、每秒行数）
+    """
+    if not csv_file_path.exists():
+        raise FileNotFoundError(f"CSV文件 {csv_file_path} 不存在")
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"未知的输出格式: {json_format}")
+    convert_policy = convert_policy or {}
+    # 转换列先按原始字符串读取，再由列转换器整列转换
+    raw_columns: dict[str, Callable] = {column: str for column in convert_policy}
+    converters = {
+        column: ColumnConverter(func) for column, func in convert_policy.items()
+    }
 
-    # 将字典列表写入JSON文件
     if json_file_path is None:
-        json_file_path = csv_file_path.with_suffix(".json")
+        json_file_path = csv_file_path.with_suffix(f".{json_format}")
 
-    with open(json_file_path, "w", encoding="utf-8") as json_file:
-        json.dump(data_dict_list, json_file, ensure_ascii=False, indent=4)
+    start = time.perf_counter()
+    temp_path = json_file_path.with_name(f"{json_file_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "w", encoding="utf-8") as json_file:
+            with JsonRecordWriter(json_file, json_format) as writer:
+                for chunk in _iter_csv_chunks(csv_file_path, raw_columns, chunk_size):
+                    for column, converter in converters.items():
+                        if column in chunk.columns:
+                            chunk[column] = converter.convert(chunk[column])
+                    for record in chunk.fillna("").to_dict(orient="records"):
+                        writer.write(record)
+        os.replace(temp_path, json_file_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    seconds = time.perf_counter() - start
 
     print(f"已成功将CSV文件 {csv_file_path} 转换为JSON文件 {json_file_path}")
+    return {
+        "file": str(csv_file_path),
+        "output": str(json_file_path),
+        "rows": writer.count,
+        "seconds": seconds,
+        "rows_per_second": writer.count / seconds if seconds else float("inf"),
+    }
+
+
+CONVERT_POLICY: dict[str, Callable] = {
+    "related_drugs": parse_related_drugs,
+    "original_conditions": parse_array_string,
+    "matched_disease_keys": parse_array_string,
+    "matched_symptoms": parse_array_string,
+    "symptom_severity": parse_array_string,
+    "disease_description": parse_disease_description,
+}
+"""默认的列转换策略"""
 
 
-def convert_all_csv_to_json():
-    """将当前目录下的所有CSV文件转换为JSON格式"""
-    for root, dirs, files in os.walk(Path.cwd() / "dataset_module"):
-        for filename in files:
+def _convert_file(
+    csv_file_path: Path, json_format: str, chunk_size: int
+) -> dict[str, Any]:
+    """进程池任务：按默认转换策略转换单个文件"""
+    return csv_to_json(
+        csv_file_path,
+        convert_policy=CONVERT_POLICY,
+        json_format=json_format,
+        chunk_size=chunk_size,
+    )
+
+
+def convert_all_csv_to_json(
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+    *,
+    json_format: str = "json",
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+) -> list[dict[str, Any]]:
+    """
+    将目录下的所有CSV文件转换为JSON格式（跳过隐藏目录）
+
+    参数：
+    - file_dir: 数据集目录
+    - json_format: 输出格式，见 `JSON_FORMATS`
+    - workers: 进程数，为空时取 CPU 核数，为 1 时在当前进程中逐个转换
+    - chunk_size: 每次读取的行数
+
+    返回：
+    - 每个文件的转换结果，并输出每个文件的每秒行数汇总
+    """
+    csv_files: list[Path] = []
+    for root, dirs, files in os.walk(file_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for filename in sorted(files):
             if filename.endswith(".csv"):
-                csv_file_path = Path(root) / filename
-                csv_to_json(
-                    csv_file_path,
-                    convert_policy={
-                        "related_drugs": parse_related_drugs,
-                        "original_conditions": parse_array_string,
-                        "matched_disease_keys": parse_array_string,
-                        "matched_symptoms": parse_array_string,
-                        "symptom_severity": parse_array_string,
-                        "disease_description": parse_disease_description,
-                    },
-                )  # Pass an empty convert_policy
+                csv_files.append(Path(root) / filename)
+    if not csv_files:
+        return []
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(csv_files)))
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_convert_file(file, json_format, chunk_size) for file in csv_files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _convert_file,
+                    csv_files,
+                    [json_format] * len(csv_files),
+                    [chunk_size] * len(csv_files),
+                )
+            )
+    seconds = time.perf_counter() - start
+
+    print(f"{'文件':<60} {'行数':>10} {'耗时(s)':>10} {'行/秒':>12}")
+    for result in results:
+        name = Path(result["file"]).relative_to(file_dir).as_posix()
+        print(
+            f"{name:<60} {result['rows']:>10,} {result['seconds']:>10.3f} "
+            f"{result['rows_per_second']:>12,.0f}"
+        )
+    total_rows = sum(result["rows"] for result in results)
+    print(
+        f"共转换 {len(results)} 个文件、{total_rows:,} 行，{workers} 个进程，"
+        f"总耗时 {seconds:.3f}s（{total_rows / seconds if seconds else float('inf'):,.0f} 行/秒）"
+    )
+    return results
 
 
 if __name__ == "__main__":
-    convert_all_csv_to_json()
+    parser = argparse.ArgumentParser(description="将数据集目录下的所有CSV文件转换为JSON")
+    parser.add_argument("--format", choices=JSON_FORMATS, default="json", help="输出格式")
+    parser.add_argument("--workers", type=int, default=None, help="进程数")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_ROWS, help="每次读取的行数"
+    )
+    args = parser.parse_args()
+    convert_all_csv_to_json(
+        json_format=args.format, workers=args.workers, chunk_size=args.chunk_size
+    )
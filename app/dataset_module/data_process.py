@@ -6,22 +6,29 @@
 
 # 标准库导入
 import os
+import re
 import sys
+import hashlib
 from pathlib import Path
 import pandas as pd
-from typing import Optional
-from matplotlib import pyplot as plt
-from matplotlib import cm
+from typing import Callable, Iterator, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.patches import Rectangle
 import tqdm
 import json
 import numpy as np
 import html
+import html.entities
 import warnings
 from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
 
 # 本地模块导入
-from utility_module import logger
+from static_module import ColumnProfile
+from utility_module import logger, hash_file
 
 warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 
@@ -36,263 +43,868 @@ def clean_with_bs4(text):
     return soup.get_text()
 
 
+_ENTITY_REFERENCE_PATTERN: re.Pattern = re.compile(
+    r"&(?:#[0-9]+;|#[xX][0-9a-fA-F]+;|([A-Za-z][A-Za-z0-9]*;))"
+)
+_BLANK_PATTERN: str = r"[ \t\n\r\f]+"
+
+
+def _unescape_entities(text: str) -> Optional[str]:
+    """
+    仅含规范实体引用的文本直接用 html.unescape 解码
+
+    存在无法识别的 `&`（如 "AT&T"、未知实体名）或解码结果为纯空白时，
+    BeautifulSoup 的处理与 html.unescape 不同，返回 None 交由解析器处理。
+    """
+    references = _ENTITY_REFERENCE_PATTERN.findall(text)
+    if len(references) != text.count("&"):
+        return None
+    if any(name and name not in html.entities.html5 for name in references):
+        return None
+    decoded = html.unescape(text)
+    if decoded and re.fullmatch(_BLANK_PATTERN, decoded):
+        return None
+    return decoded
+
+
+def clean_html_series(series: pd.Series) -> pd.Series:
+    """
+    向量化清洗一列中的 HTML 标记与实体，结果与逐个单元格调用 `clean_with_bs4` 一致
+
+    - 不含 `<` 与 `&` 的单元格保持不变（纯空白单元格除外，BeautifulSoup 会将其折叠）
+    - 只含规范实体引用的单元格使用 html.unescape 解码
+    - 其余单元格（含 `<`、非规范 `&` 或纯空白）交由 BeautifulSoup 解析
+
+    参数：
+    - series: 数据列
+
+    返回：
+    - 清洗后的数据列
+    """
+    if not (
+        pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+    ):
+        return series
+    try:
+        has_markup = series.str.contains("<", regex=False, na=False)
+        has_entity = series.str.contains("&", regex=False, na=False)
+        is_blank = series.str.fullmatch(_BLANK_PATTERN, na=False)
+    except AttributeError:
+        # 列中没有字符串，无法使用 .str 访问器
+        return series.map(clean_with_bs4)
+
+    needs_parser = has_markup | is_blank
+    entity_only = has_entity & ~needs_parser
+    if not (needs_parser.any() or entity_only.any()) and not pd.api.types.is_object_dtype(
+        series
+    ):
+        return series
+
+    values = series.to_numpy(dtype=object, copy=True)
+    parser_mask = needs_parser.to_numpy(copy=True)
+    for i in np.flatnonzero(entity_only.to_numpy()):
+        decoded = _unescape_entities(values[i])
+        if decoded is None:
+            parser_mask[i] = True
+        else:
+            values[i] = decoded
+    for i in np.flatnonzero(parser_mask):
+        values[i] = clean_with_bs4(values[i])
+    # object 列与逐元素 map 一样重新推断类型（全为字符串时得到字符串类型）
+    dtype = None if pd.api.types.is_object_dtype(series) else series.dtype
+    return pd.Series(values, index=series.index, name=series.name, dtype=dtype)
+
+
+CLEANED_SUFFIX: str = "_cleaned"
+"""清洗后输出文件的文件名后缀"""
+
+CLEANING_VERSION: int = 1
+"""清洗逻辑版本号，修改 `clean_data_frame` 的行为时需要递增，使旧的缓存失效"""
+
+CLEANED_CACHE_DIR: str = ".cache/cleaned"
+"""清洗结果缓存目录（相对于数据集目录）"""
+
+DEFAULT_CHUNK_ROWS: int = 50_000
+"""分块加载时每块的默认行数"""
+
+CATEGORY_MAX_RATIO: float = 0.5
+"""紧凑模式下，不同取值占比不超过该值的字符串列转换为分类类型"""
+
+SYMPTOM_COLUMN_PATTERN: re.Pattern = re.compile(r"^Symptom_\d+$")
+"""共用同一类别集合的症状列"""
+
+
+def discover_dataset_files(
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> list[str]:
+    """
+    发现目录下的所有数据集文件(.csv)
+
+    若同目录下存在去掉 `_cleaned` 后缀的原始文件，则该文件视为
+    `load_dataset` 的派生输出而跳过，避免重复清洗产生 `_cleaned_cleaned.csv`；
+    隐藏目录（如清洗结果缓存目录）也会被跳过。
+
+    参数：
+    - file_dir: 数据集文件所在目录
+
+    返回：
+    - 数据集文件路径列表
+    """
+    file_name: list[str] = []
+    for root, dirs, files in os.walk(file_dir):
+        # 跳过隐藏目录（如清洗结果缓存目录）
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for file in sorted(files):
+            if not str(file).endswith(".csv"):
+                continue
+            stem = Path(file).stem
+            if stem.endswith(CLEANED_SUFFIX) and (
+                stem[: -len(CLEANED_SUFFIX)] + ".csv" in files
+            ):
+                continue
+            file_name.append(str(Path(root, file)))
+            logger.debug(f"发现数据集文件[{file}]")
+    return file_name
+
+
+def cleaned_cache_path(
+    content_hash: str,
+    *,
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> Path:
+    """
+    清洗结果的缓存文件路径
+
+    以源文件内容哈希与清洗逻辑版本号寻址，内容相同的文件共用同一份缓存。
+
+    参数：
+    - content_hash: 源文件内容哈希
+    - file_dir: 数据集文件所在目录
+
+    返回：
+    - Parquet 缓存文件路径
+    """
+    return Path(file_dir, CLEANED_CACHE_DIR, f"{content_hash}-v{CLEANING_VERSION}.parquet")
+
+
+def read_cleaned_cache(cache_path: Path) -> Optional[pd.DataFrame]:
+    """读取清洗结果缓存，不存在或损坏时返回 None"""
+    if not cache_path.exists():
+        return None
+    try:
+        return pd.read_parquet(cache_path)
+    except Exception as e:
+        logger.warning(f"读取清洗缓存 {cache_path} 失败: {e}")
+        return None
+
+
+def write_cleaned_cache(df: pd.DataFrame, cache_path: Path) -> None:
+    """写入清洗结果缓存（先写临时文件再替换），无法以 Parquet 表示时跳过"""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"写入清洗缓存 {cache_path} 失败，跳过缓存: {e}")
+        temp_path.unlink(missing_ok=True)
+
+
+def clean_data_frame(df: pd.DataFrame, *, filter_columns: bool = True) -> pd.DataFrame:
+    """
+    清洗数据帧
+
+    填充缺失值、过滤索引/ID 列，并解码所有单元格中的 HTML 实体。
+    修改此函数的行为时需要递增 `CLEANING_VERSION`。
+
+    参数：
+    - df: 原始数据帧
+    - filter_columns: 是否过滤索引/ID 列（调用方显式选择了列时应为 False）
+
+    返回：
+    - 清洗后的数据帧
+    """
+    return prepare_data_frame(df, filter_columns=filter_columns).apply(clean_html_series)
+
+
+def prepare_data_frame(df: pd.DataFrame, *, filter_columns: bool = True) -> pd.DataFrame:
+    """填充缺失值并过滤索引/ID 列（HTML 清洗之前的步骤）"""
+    df = df.fillna("NaN")  # 填充缺失值
+    if not filter_columns:
+        return df
+    df = df.drop(columns=["Unnamed: 0"], errors="ignore")
+    # 过滤掉包含'Unnamed''index''ID'的列
+    return df.filter(regex="^(?!Unnamed.*$|.*index.*|.*ID.*$).*$")
+
+
+def compact_data_frame(
+    df: pd.DataFrame,
+    *,
+    name: str = "DataFrame",
+    max_category_ratio: float = CATEGORY_MAX_RATIO,
+) -> pd.DataFrame:
+    """
+    压缩数据帧的内存占用
+
+    - 不同取值占比不超过 max_category_ratio 的字符串列转换为分类类型，
+      所有 `Symptom_*` 列共用同一个类别集合（便于跨列比较与合并）
+    - 整数列向下转换为最小的整数类型；浮点列仅在转换为 float32 无损时转换
+
+    参数：
+    - df: 数据帧
+    - name: 数据集名称（用于日志）
+    - max_category_ratio: 转换为分类类型的最大不同取值占比
+
+    返回：
+    - 压缩后的数据帧
+    """
+    before = df.memory_usage(deep=True).sum()
+    df = df.copy()
+    text_columns = [
+        col
+        for col in df.columns
+        if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])
+    ]
+    symptom_columns = [col for col in text_columns if SYMPTOM_COLUMN_PATTERN.match(str(col))]
+    if symptom_columns:
+        values = pd.concat([df[col] for col in symptom_columns], ignore_index=True)
+        shared_dtype = pd.CategoricalDtype(pd.unique(values.dropna()))
+        for col in symptom_columns:
+            df[col] = df[col].astype(shared_dtype)
+    for col in text_columns:
+        if col in symptom_columns or len(df) == 0:
+            continue
+        if df[col].nunique(dropna=False) / len(df) <= max_category_ratio:
+            df[col] = df[col].astype("category")
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        elif pd.api.types.is_float_dtype(df[col]):
+            downcast = df[col].astype("float32")
+            if downcast.astype(df[col].dtype).equals(df[col]):
+                df[col] = downcast
+    after = df.memory_usage(deep=True).sum()
+    logger.info(
+        f"数据集[{name}]内存占用: {before / 1024**2:.2f} MiB -> {after / 1024**2:.2f} MiB"
+        f"（{after / before:.1%}）" if before else f"数据集[{name}]为空"
+    )
+    return df
+
+
+def read_csv_fast(file_path: os.PathLike) -> pd.DataFrame:
+    """
+    读取 CSV 文件，优先使用 pyarrow 的多线程解析器
+
+    空列名按默认解析器的规则命名为 "Unnamed: i"。以下情况回退到 pandas 默认解析器：
+    pyarrow 解析失败（如字段内含换行）、推断出默认解析器不会产生的类型
+    （日期、日期时间、时间间隔），或存在重复列名（默认解析器会追加 ".1" 等后缀）。
+    文本列无论为 `StringDtype`（pandas 3）还是 `object`（pandas 2）均直接接受。
+
+    参数：
+    - file_path: CSV 文件路径
+
+    返回：
+    - 与 `pd.read_csv(file_path)` 相同的数据帧
+    """
+    try:
+        df = pd.read_csv(file_path, engine="pyarrow")
+    except Exception as e:
+        logger.debug(f"pyarrow 无法解析 {file_path}，回退到默认解析器: {e}")
+        return pd.read_csv(file_path)
+    columns = [
+        name if name != "" else f"Unnamed: {i}" for i, name in enumerate(df.columns)
+    ]
+    if len(set(columns)) != len(columns):
+        logger.debug(f"数据集文件 {file_path} 存在重复列名，回退到默认解析器")
+        return pd.read_csv(file_path)
+    for col in df.columns:
+        series = df[col]
+        if series.dtype.kind in "Mm":
+            break
+        if series.dtype.kind == "O":
+            # pyarrow 的每列类型唯一，首个非空值即可判断是否为字符串列（而非日期等对象）
+            first = series.first_valid_index()
+            if first is not None and not isinstance(series[first], str):
+                break
+    else:
+        df.columns = columns
+        return df
+    logger.debug(f"pyarrow 推断的列类型与默认解析器不一致，回退: {file_path}")
+    return pd.read_csv(file_path)
+
+
+def _load_dataset_file(
+    file: str,
+    file_dir: os.PathLike,
+    use_cache: bool,
+    compact: bool = False,
+) -> tuple[str, Optional[pd.DataFrame]]:
+    """
+    加载并清洗单个数据集文件（可在子进程中执行）
+
+    返回：
+    - (数据集名称, 清洗后的 DataFrame)，加载失败时 DataFrame 为 None
+    """
+    if file.endswith(".csv") is False:
+        file += ".csv"
+    full_path: Path = Path(file_dir, file)
+    try:
+        logger.debug(f"正在处理数据集文件:{full_path}")
+        cleaned_path = Path(
+            file_dir, full_path.parent, full_path.stem + CLEANED_SUFFIX + ".csv"
+        )
+        cache_path = (
+            cleaned_cache_path(hash_file(full_path), file_dir=file_dir)
+            if use_cache
+            else None
+        )
+        df = read_cleaned_cache(cache_path) if cache_path is not None else None
+        if df is not None:
+            logger.debug(f"命中清洗缓存: {cache_path.name}")
+            if not cleaned_path.exists():
+                df.to_csv(cleaned_path, index=False)
+        else:
+            df = clean_data_frame(read_csv_fast(full_path))
+            df.to_csv(cleaned_path, index=False)
+            if cache_path is not None:
+                write_cleaned_cache(df, cache_path)
+        if compact:
+            df = compact_data_frame(df, name=Path(file).stem)
+        logger.debug(f"成功加载文件: {full_path}")
+        return Path(file).stem, df
+    except Exception as e:
+        logger.error(f"加载文件{full_path}失败: {e}")
+        return Path(file).stem, None
+
+
 def load_dataset(
     file_name: Optional[list[str]],
     *,
     file_dir: os.PathLike = Path.cwd() / "dataset_module",
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    compact: bool = False,
 ) -> dict[str, pd.DataFrame]:
     """
     加载数据集文件
 
+    清洗结果以 Parquet 格式缓存在 `CLEANED_CACHE_DIR` 下，键为源文件内容哈希与
+    `CLEANING_VERSION`；命中缓存时直接返回缓存的数据帧，且仅在 `_cleaned.csv` 缺失时重新写出。
+    多个文件时在进程池中同时读取与清洗，返回字典的顺序与文件列表一致。
+
     参数：
     - file_name: 可选的文件名列表。如果为None，则加载`Path.cwd() / dataset_module`目录下所有.csv文件。
     - file_dir: 数据集文件所在目录，默认为当前工作目录下的'dataset_module'目录。
+    - use_cache: 是否使用清洗结果缓存
+    - workers: 进程数，为空时取 CPU 核数，为 1 时在当前进程中逐个加载
+    - compact: 是否使用紧凑类型（分类类型与数值向下转换，见 `compact_data_frame`），并输出压缩前后的内存占用
 
     返回：
     - 包含数据集名称和对应DataFrame的字典。
     """
-    datasets_dict = {}
     if file_name is None:
-        file_name = []
         # 实现自动加载目录下所有数据集的功能
-        for root, dirs, files in os.walk(file_dir):
-            for file in files:
-                if str(file).endswith(".csv"):
-                    file_name.append(str(Path(root, file)))
-                    logger.debug(f"发现数据集文件[{file}]")
-
-    for file in file_name:
-        if file.endswith(".csv") is False:
-            file += ".csv"
-        full_path: Path = Path(file_dir, file)
-        try:
-            logger.debug(f"正在处理数据集文件:{full_path}")
-            df = pd.read_csv(full_path).fillna("NaN")  # 加载数据并填充缺失值
-            df = df.drop(columns=["Unnamed: 0"], errors="ignore")
-            # 过滤掉包含'Unnamed''index''ID'的列
-            df = df.filter(regex="^(?!Unnamed.*$|.*index.*|.*ID.*$).*$")
-            df = df.map(clean_with_bs4)
-            df.to_csv(
-                Path(
-                    file_dir,
-                    full_path.parent,
-                    full_path.stem + "_cleaned.csv",
-                ),
-                index=False,
+        file_name = discover_dataset_files(file_dir)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(file_name)))
+    if workers == 1:
+        results = [
+            _load_dataset_file(file, file_dir, use_cache, compact) for file in file_name
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _load_dataset_file,
+                    file_name,
+                    [file_dir] * len(file_name),
+                    [use_cache] * len(file_name),
+                    [compact] * len(file_name),
+                )
             )
-            logger.debug(f"成功加载文件: {full_path}")
-            datasets_dict[Path(file).stem] = df
-        except Exception as e:
-            logger.error(f"加载文件{full_path}失败: {e}")
-            continue
+
+    datasets_dict = {}
+    for name, df in results:
+        if df is not None:
+            datasets_dict[name] = df
     return datasets_dict
 
 
-def visualize_data_frame(
-    df: pd.DataFrame,
+def iter_dataset_chunks(
+    file: str,
     *,
-    file_name="DataFrame Visualization",
-    max_categories_per_chart=10,
-) -> os.PathLike:
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+    columns: Optional[Sequence[str]] = None,
+    predicate: Optional[Callable[[pd.DataFrame], pd.Series]] = None,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
     """
-    可视化数据帧
+    分块流式加载数据集文件
 
-    参数：
-    - df: 需要可视化信息的DataFrame
-    - file_name: 输出文件名
-    - max_categories_per_chart: 每个图表最多显示的类别数
-    """
-    # 设置中文字体和样式 - 更彻底的配置
-    plt.rcParams["font.sans-serif"] = ["SimHei", "Microsoft YaHei", "STSong"]
-    plt.rcParams["axes.unicode_minus"] = False
-    plt.rcParams["font.family"] = "sans-serif"
-    plt.rcParams["text.usetex"] = False
-    plt.style.use("seaborn-v0_8-whitegrid")
+    每次只读取 chunk_size 行：先只解析 columns 指定的列，再用 predicate 过滤行，
+    最后仅对保留下来的行执行与 `load_dataset` 相同的清洗，内存占用与文件大小无关。
+    该模式不读写清洗结果缓存，也不写出 `_cleaned.csv`。
 
-    file_name = Path(file_name).stem
+    参数：
+    - file: 数据集文件（相对于 file_dir，可省略 .csv 后缀）
+    - file_dir: 数据集文件所在目录
+    - columns: 需要读取的列，为 None 时读取全部列（并与 `load_dataset` 一样过滤索引/ID 列）；
+      给出时返回的列及其顺序与其完全一致
+    - predicate: 行过滤函数，接收未清洗的分块（仅含 columns 中的列），返回布尔掩码
+    - chunk_size: 每块的最大行数
 
-    # 计算布局
-    num_rows = len(df.columns)
+    返回：
+    - 清洗后的数据块迭代器，索引为行在文件中的序号
+
+    示例：
+    >>> for chunk in iter_dataset_chunks(
+    ...     "drugsComTrain_raw",
+    ...     columns=["drugName", "condition", "rating"],
+    ...     predicate=lambda df: df["rating"] >= 8,
+    ... ):
+    ...     ...
+    """
+    if file.endswith(".csv") is False:
+        file += ".csv"
+    full_path: Path = Path(file_dir, file)
+    if columns is not None:
+        columns = list(columns)
+        header = pd.read_csv(full_path, nrows=0).columns
+        unknown = [col for col in columns if col not in header]
+        if unknown:
+            raise ValueError(f"数据集文件 {full_path} 不存在列: {unknown}")
+    logger.debug(f"正在分块读取数据集文件:{full_path}")
+    with pd.read_csv(full_path, usecols=columns, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            if columns is not None:
+                chunk = chunk[columns]
+            if predicate is not None:
+                chunk = chunk[predicate(chunk).to_numpy(dtype=bool)]
+            if chunk.empty:
+                continue
+            # 显式选择的列（包括索引/ID 列）全部保留
+            yield clean_data_frame(chunk, filter_columns=columns is None)
+
+
+FIGURES_DIR: str = "reports/figures"
+"""可视化图表输出目录（相对于工作目录）"""
+
+FIGURE_DPI: int = 300
+"""可视化图表的默认分辨率"""
+
+FIGURE_RENDER_VERSION: int = 1
+"""图表绘制逻辑版本号，修改绘制逻辑时需要递增，使已生成的图表重新绘制"""
+
+FIGURE_HASH_DIR: str = ".hashes"
+"""图表源数据哈希的存放目录（相对于图表输出目录）"""
+
+ChartSummary = tuple[str, list[str], list[int], int]
+"""单列图表的绘制数据：(列名, 类别标签, 类别计数, 总行数)"""
+
+
+def _summarize_column(
+    profile: ColumnProfile, max_categories_per_chart: int
+) -> ChartSummary:
+    """由列概况生成图表数据，类别过多时合并较小的类别"""
+    if profile.distinct > max_categories_per_chart:
+        main_values = profile.top_values[: max_categories_per_chart - 1]
+        other_count = profile.non_null_count - sum(count for _, count in main_values)
+        main_values = main_values + [
+            (
+                f"Others ({profile.distinct-max_categories_per_chart+1})",
+                other_count,
+            )
+        ]
+    else:
+        main_values = profile.top_values
+    return (
+        profile.name,
+        [label for label, _ in main_values],
+        [count for _, count in main_values],
+        profile.rows,
+    )
 
-    # 创建图形 - 增加宽度
-    fig = plt.figure(figsize=(28, 5 * num_rows))
 
-    # 创建外部布局 - 调整高度比例
-    gs = fig.add_gridspec(
-        num_rows + 1, 1, hspace=0.3, height_ratios=[0.08] + [1] * num_rows
+def _draw_column_chart(fig, slot, chart: ChartSummary) -> None:
+    """在 slot 中绘制一列的甜甜圈图（左）与图例（右）"""
+    col, labels, counts, total = chart
+
+    # 为每一行创建子网格：左边饼图，右边图例
+    inner_gs = slot.subgridspec(1, 2, width_ratios=[1, 1.2], wspace=0.1)
+
+    # 左侧：饼图
+    ax_pie = fig.add_subplot(inner_gs[0])
+    # 右侧：图例
+    ax_legend = fig.add_subplot(inner_gs[1])
+    ax_legend.axis("off")
+
+    # 计算百分比
+    sizes = np.array(counts)
+    percentages = (sizes.astype(float) / total * 100).round(2)
+
+    # 创建好看的颜色
+    colors = matplotlib.colormaps["Set3"](np.linspace(0, 1, len(sizes)))
+    colors = [tuple(c) for c in colors]
+
+    # 绘制甜甜圈图
+    wedges, texts, autotexts = ax_pie.pie(  # type: ignore
+        sizes,
+        colors=colors,
+        startangle=90,
+        wedgeprops=dict(width=0.5, edgecolor="white", linewidth=2),
+        autopct=lambda pct: f"{pct:.1f}%" if pct > 3 else "",
+        pctdistance=0.75,
+        textprops=dict(color="white", fontsize=11, fontweight="bold"),
     )
 
-    # 添加标题
-    title_ax = fig.add_subplot(gs[0, :])
-    title_ax.axis("off")
-    title_ax.text(
-        0.5,
-        0.5,
-        f"{file_name}",
-        fontsize=24,
-        fontweight="bold",
+    # 中心添加信息
+    center_text = f"Total\n{total:,}"
+    ax_pie.text(
+        0,
+        0,
+        center_text,
         ha="center",
         va="center",
+        fontsize=13,
+        fontweight="bold",
+        style="italic",
+        fontfamily="sans-serif",
     )
 
-    progress_bar = tqdm.tqdm(enumerate(df.columns), desc="绘制图表", total=num_rows)
-
-    for idx, col in progress_bar:
-        row_idx = idx + 1
-
-        # 为每一行创建子网格：左边饼图，右边图例
-        inner_gs = gs[row_idx].subgridspec(1, 2, width_ratios=[1, 1.2], wspace=0.1)
-
-        # 左侧：饼图
-        ax_pie = fig.add_subplot(inner_gs[0])
-        # 右侧：图例
-        ax_legend = fig.add_subplot(inner_gs[1])
-        ax_legend.axis("off")
-
-        # 统计值分布
-        value_counts = df[col].astype(str).value_counts()
-        total = len(df)
-
-        # 如果类别太多，合并小的类别
-        if len(value_counts) > max_categories_per_chart:
-            main_values = value_counts.head(max_categories_per_chart - 1)
-            other_count = value_counts.tail(
-                len(value_counts) - max_categories_per_chart + 1
-            ).sum()
-            main_values = pd.concat(
-                [
-                    main_values,
-                    pd.Series(
-                        {
-                            f"Others ({len(value_counts)-max_categories_per_chart+1})": other_count
-                        }
-                    ),
-                ]
-            )
+    # 设置子图标题
+    ax_pie.set_title(
+        f"{col}", fontsize=16, fontweight="bold", pad=15, fontfamily="sans-serif"
+    )
+    ax_pie.axis("equal")
+
+    # 在右侧面板创建带颜色的图例
+    num_labels = len(labels)
+    # 根据标签数量动态调整列数
+
+    cols = (num_labels + 9) // 10  # 每列最多显示10个标签
+    cols = max(1, cols)  # 确保至少有1列
+
+    rows_per_col = (num_labels + cols - 1) // cols  # 向上取整
+    col_width = 1.0 / cols
+
+    for i, (label, count, pct, color) in enumerate(
+        zip(labels, counts, percentages, colors)
+    ):
+        label_str = str(label).replace("_", " ")
+        if len(label_str) > 20:
+            label_display = label_str[:17] + "..."
         else:
-            main_values = value_counts
-
-        # 计算百分比
-        percentages = (main_values.astype(float) / total * 100).round(2)
-
-        # 准备数据
-        sizes = np.array(main_values.values)
-        labels = main_values.index.tolist()
-
-        # 创建好看的颜色
-        colors = cm.get_cmap("Set3")(np.linspace(0, 1, len(sizes)))
-        colors = [tuple(c) for c in colors]
-
-        # 绘制甜甜圈图
-        wedges, texts, autotexts = ax_pie.pie(  # type: ignore
-            sizes,
-            colors=colors,
-            startangle=90,
-            wedgeprops=dict(width=0.5, edgecolor="white", linewidth=2),
-            autopct=lambda pct: f"{pct:.1f}%" if pct > 3 else "",
-            pctdistance=0.75,
-            textprops=dict(color="white", fontsize=11, fontweight="bold"),
+            label_display = label_str
+
+        # 计算当前项在第几列、第几行
+        col_idx = i // rows_per_col
+        row_idx = i % rows_per_col
+
+        # 计算位置
+        x_start = col_idx * col_width + 0.02
+        y_start = 0.95
+        y_step = 0.85 / rows_per_col
+        y_pos = y_start - row_idx * y_step
+
+        # 绘制颜色方块
+        rect = Rectangle(
+            (x_start, y_pos - 0.015),
+            0.04,
+            0.03,
+            facecolor=color,
+            edgecolor="black",
+            linewidth=1,
+            transform=ax_legend.transAxes,
         )
+        ax_legend.add_patch(rect)
+
+        # 添加文本 - 明确指定字体
+        text_content = f"{i+1:2d}. {label_display:<18} {count:>6,} ({pct:>6.2f}%)"
+        ax_legend.text(
+            x_start + 0.06,
+            y_pos,
+            text_content,
+            fontsize=9,
+            verticalalignment="center",
+            transform=ax_legend.transAxes,
+            fontfamily="sans-serif",
+        )
+
 
-        # 中心添加信息
-        center_text = f"Total\n{total:,}"
-        ax_pie.text(
-            0,
-            0,
-            center_text,
+def _render_figure(
+    fig_path: str, title: str, charts: list[ChartSummary], dpi: int
+) -> str:
+    """
+    绘制并保存一张图表（可在子进程中运行）
+
+    直接使用 Agg 画布，不经过 pyplot 的全局图形管理，保存后立即释放。
+    """
+    # 设置中文字体和样式，只作用于本次绘制
+    style = [
+        "seaborn-v0_8-whitegrid",
+        {
+            "font.sans-serif": ["SimHei", "Microsoft YaHei", "STSong"],
+            "axes.unicode_minus": False,
+            "font.family": "sans-serif",
+            "text.usetex": False,
+        },
+    ]
+    with matplotlib.style.context(style), warnings.catch_warnings():
+        # 缺少中文字体时每个文本都会告警
+        warnings.simplefilter("ignore", UserWarning)
+        num_rows = len(charts)
+
+        # 创建图形 - 增加宽度
+        fig = Figure(figsize=(28, 5 * num_rows))
+        FigureCanvasAgg(fig)
+
+        # 创建外部布局 - 调整高度比例
+        gs = fig.add_gridspec(
+            num_rows + 1, 1, hspace=0.3, height_ratios=[0.08] + [1] * num_rows
+        )
+
+        # 添加标题
+        title_ax = fig.add_subplot(gs[0, :])
+        title_ax.axis("off")
+        title_ax.text(
+            0.5,
+            0.5,
+            f"{title}",
+            fontsize=24,
+            fontweight="bold",
             ha="center",
             va="center",
-            fontsize=13,
-            fontweight="bold",
-            style="italic",
-            fontfamily="sans-serif",
         )
 
-        # 设置子图标题
-        ax_pie.set_title(
-            f"{col}", fontsize=16, fontweight="bold", pad=15, fontfamily="sans-serif"
-        )
-        ax_pie.axis("equal")
+        for idx, chart in enumerate(charts):
+            _draw_column_chart(fig, gs[idx + 1], chart)
 
-        # 在右侧面板创建带颜色的图例
-        num_labels = len(labels)
-        # 根据标签数量动态调整列数
+        # 调整布局
+        fig.subplots_adjust(top=0.95, bottom=0.05, left=0.05, right=0.95, hspace=0.3)
 
-        cols = (num_labels + 9) // 10  # 每列最多显示10个标签
-        cols = max(1, cols)  # 确保至少有1列
+        Path(fig_path).parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(fig_path, dpi=dpi, bbox_inches="tight", facecolor="white")
+        fig.clear()
+    return fig_path
 
-        rows_per_col = (num_labels + cols - 1) // cols  # 向上取整
-        col_width = 1.0 / cols
 
-        for i, (label, count, pct, color) in enumerate(
-            zip(labels, main_values.values, percentages, colors)
+def _figure_hash(title: str, charts: list[ChartSummary], dpi: int) -> str:
+    """图表源数据哈希：绘制数据与绘制参数均未变化时图表无需重新绘制"""
+    payload = json.dumps(
+        [FIGURE_RENDER_VERSION, title, dpi, charts], ensure_ascii=False
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _figure_hash_path(fig_path: Path, figures_dir: Path) -> Path:
+    """图表源数据哈希文件路径"""
+    relative = fig_path.relative_to(figures_dir).as_posix().replace("/", "__")
+    return figures_dir / FIGURE_HASH_DIR / f"{relative}.sha256"
+
+
+def _safe_figure_name(name: str) -> str:
+    """将数据集名、列名转换为文件名"""
+    return re.sub(r"[^\w.\-]+", "_", name).strip("_") or "column"
+
+
+def _figure_tasks(
+    profiles: dict[str, ColumnProfile],
+    file_name: str,
+    max_categories_per_chart: int,
+    per_column: bool,
+    dpi: int,
+    figures_dir: Path,
+) -> list[tuple[str, str, list[ChartSummary], int, str]]:
+    """生成一个数据集的绘制任务：(图表路径, 标题, 各列绘制数据, 分辨率, 源数据哈希)"""
+    file_name = Path(file_name).stem
+    charts = [
+        _summarize_column(profile, max_categories_per_chart)
+        for profile in profiles.values()
+    ]
+    if per_column:
+        dataset_dir = figures_dir / _safe_figure_name(file_name)
+        groups = [
+            (dataset_dir / f"{idx:02d}_{_safe_figure_name(chart[0])}.png", [chart])
+            for idx, chart in enumerate(charts)
+        ]
+    else:
+        groups = [(figures_dir / f"{file_name.replace(' ', '_')}.png", charts)]
+    return [
+        (str(fig_path), file_name, group, dpi, _figure_hash(file_name, group, dpi))
+        for fig_path, group in groups
+    ]
+
+
+def _run_figure_tasks(
+    tasks: list[tuple[str, str, list[ChartSummary], int, str]],
+    *,
+    figures_dir: Path,
+    workers: Optional[int],
+    force: bool,
+) -> list[str]:
+    """跳过源数据未变化的图表，其余在进程池中并行绘制；返回全部图表路径"""
+    pending = []
+    for task in tasks:
+        fig_path, _, _, _, figure_hash = task
+        hash_path = _figure_hash_path(Path(fig_path), figures_dir)
+        if (
+            not force
+            and Path(fig_path).exists()
+            and hash_path.exists()
+            and hash_path.read_text(encoding="utf-8") == figure_hash
         ):
-            label_str = str(label).replace("_", " ")
-            if len(label_str) > 20:
-                label_display = label_str[:17] + "..."
-            else:
-                label_display = label_str
-
-            # 计算当前项在第几列、第几行
-            col_idx = i // rows_per_col
-            row_idx = i % rows_per_col
-
-            # 计算位置
-            x_start = col_idx * col_width + 0.02
-            y_start = 0.95
-            y_step = 0.85 / rows_per_col
-            y_pos = y_start - row_idx * y_step
-
-            # 绘制颜色方块
-            rect = Rectangle(
-                (x_start, y_pos - 0.015),
-                0.04,
-                0.03,
-                facecolor=color,
-                edgecolor="black",
-                linewidth=1,
-                transform=ax_legend.transAxes,
-            )
-            ax_legend.add_patch(rect)
-
-            # 添加文本 - 明确指定字体
-            text_content = f"{i+1:2d}. {label_display:<18} {count:>6,} ({pct:>6.2f}%)"
-            ax_legend.text(
-                x_start + 0.06,
-                y_pos,
-                text_content,
-                fontsize=9,
-                verticalalignment="center",
-                transform=ax_legend.transAxes,
-                fontfamily="sans-serif",
-            )
+            continue
+        pending.append(task)
+    logger.info(f"共 {len(tasks)} 张图表，{len(tasks) - len(pending)} 张未变化已跳过")
+    if not pending:
+        return [task[0] for task in tasks]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(pending)))
+    progress_bar = tqdm.tqdm(desc="绘制图表", total=len(pending))
+    if workers == 1:
+        for fig_path, title, charts, dpi, figure_hash in pending:
+            _render_figure(fig_path, title, charts, dpi)
+            _write_figure_hash(Path(fig_path), figures_dir, figure_hash)
+            progress_bar.update()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_render_figure, fig_path, title, charts, dpi): (
+                    fig_path,
+                    figure_hash,
+                )
+                for fig_path, title, charts, dpi, figure_hash in pending
+            }
+            for future in as_completed(futures):
+                future.result()
+                fig_path, figure_hash = futures[future]
+                _write_figure_hash(Path(fig_path), figures_dir, figure_hash)
+                progress_bar.update()
+    progress_bar.close()
+    for task in pending:
+        logger.info(f"可视化图表已保存至: {task[0]}")
+    return [task[0] for task in tasks]
+
+
+def _write_figure_hash(fig_path: Path, figures_dir: Path, figure_hash: str) -> None:
+    """图表保存成功后记录其源数据哈希"""
+    hash_path = _figure_hash_path(fig_path, figures_dir)
+    hash_path.parent.mkdir(parents=True, exist_ok=True)
+    hash_path.write_text(figure_hash, encoding="utf-8")
+
+
+def visualize_data_frame(
+    df: pd.DataFrame,
+    *,
+    file_name="DataFrame Visualization",
+    max_categories_per_chart=10,
+    per_column: bool = False,
+    dpi: int = FIGURE_DPI,
+    force: bool = False,
+    workers: Optional[int] = 1,
+) -> os.PathLike:
+    """
+    可视化数据帧
 
-    # 调整布局
-    plt.subplots_adjust(top=0.95, bottom=0.05, left=0.05, right=0.95, hspace=0.3)
+    源数据（各列的值分布）与绘制参数均未变化时跳过绘制，直接返回已有图表。
 
-    # 保存文件
-    figures_dir = Path.cwd() / "reports" / "figures"
-    figures_dir.mkdir(parents=True, exist_ok=True)
+    参数：
+    - df: 需要可视化信息的DataFrame
+    - file_name: 输出文件名
+    - max_categories_per_chart: 每个图表最多显示的类别数
+    - per_column: 是否每列单独输出一张图表（保存在以数据集命名的子目录中），内存占用只与单列图表有关
+    - dpi: 图表分辨率
+    - force: 是否忽略源数据哈希强制重新绘制
+    - workers: 单列输出时的进程数，为空时取 CPU 核数
 
-    fig_path = figures_dir / f"{file_name.replace(' ', '_')}.png"
+    返回：
+    - 图表路径；单列输出时为图表所在目录
+    """
+    from .column_profiler import profile_data_frame  # 避免循环导入
+
+    figures_dir = Path.cwd() / FIGURES_DIR
+    tasks = _figure_tasks(
+        profile_data_frame(df),
+        str(file_name),
+        max_categories_per_chart,
+        per_column,
+        dpi,
+        figures_dir,
+    )
+    paths = _run_figure_tasks(
+        tasks, figures_dir=figures_dir, workers=workers, force=force
+    )
+    if per_column:
+        return figures_dir / _safe_figure_name(Path(file_name).stem)
+    return Path(paths[0])
 
-    plt.savefig(fig_path, dpi=300, bbox_inches="tight", facecolor="white")
-    plt.close()
 
-    logger.info(f"可视化图表已保存至: {fig_path}")
-    return fig_path
+def _profile_dataset_file(
+    file: str, file_dir: os.PathLike
+) -> tuple[str, Optional[dict[str, ColumnProfile]]]:
+    """流式统计单个数据集文件的列概况（可在子进程中执行），失败时返回 None"""
+    from .column_profiler import profile_dataset  # 避免循环导入
 
+    try:
+        return Path(file).stem, profile_dataset(file, file_dir=file_dir)
+    except Exception as e:
+        logger.error(f"统计数据集文件 {Path(file_dir, file)} 失败: {e}")
+        return Path(file).stem, None
 
-def generate_visualize_data_frame() -> list[Optional[os.PathLike]]:
+
+def generate_visualize_data_frame(
+    *,
+    file_dir: os.PathLike = Path.cwd() / "dataset_module",
+    per_column: bool = False,
+    dpi: int = FIGURE_DPI,
+    force: bool = False,
+    workers: Optional[int] = None,
+) -> list[Optional[os.PathLike]]:
     """
     生成可视化数据集图表
+
+    各数据集经流式列概况统计（见 `column_profiler`）后绘制，不需要将数据集整体载入内存；
+    统计与绘制均按数据集（per_column 为 True 时绘制按列）在进程池中并行，源数据未变化的图表跳过。
+
+    参数：
+    - file_dir: 数据集文件所在目录
+    - per_column: 是否每列单独输出一张图表，内存占用更低
+    - dpi: 图表分辨率
+    - force: 是否忽略源数据哈希强制重新绘制
+    - workers: 进程数，为空时取 CPU 核数
+
+    返回：
+    - 每个数据集的图表路径（单列输出时为图表所在目录）
     """
-    datasets: dict[str, pd.DataFrame] = load_dataset(None)
-    fig_paths = []
-    for file_name, df in datasets.items():
+    file_name = discover_dataset_files(file_dir)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    profile_workers = max(1, min(workers, len(file_name)))
+    if profile_workers == 1:
+        results = [_profile_dataset_file(file, file_dir) for file in file_name]
+    else:
+        with ProcessPoolExecutor(max_workers=profile_workers) as executor:
+            results = list(
+                executor.map(
+                    _profile_dataset_file, file_name, [file_dir] * len(file_name)
+                )
+            )
 
-        fig_path = visualize_data_frame(
-            df, file_name=file_name, max_categories_per_chart=30
-        )
-        fig_paths.append(fig_path)
+    figures_dir = Path.cwd() / FIGURES_DIR
+    tasks = []
+    fig_paths: list[Optional[os.PathLike]] = []
+    for name, profiles in results:
+        if profiles is None:
+            continue
+        dataset_tasks = _figure_tasks(profiles, name, 30, per_column, dpi, figures_dir)
+        tasks.extend(dataset_tasks)
+        if per_column:
+            fig_paths.append(figures_dir / _safe_figure_name(name))
+        else:
+            fig_paths.append(Path(dataset_tasks[0][0]))
+    _run_figure_tasks(tasks, figures_dir=figures_dir, workers=workers, force=force)
     return fig_paths
@@ -5,16 +5,259 @@ import sys
 import json
 import re
 from pathlib import Path
+from typing import Optional
+import numpy as np
 import pandas as pd
+from scipy import sparse
+
+from static_module import DiseaseSymptomMatrix
+from utility_module import logger, hash_file
+from .symptom_registry import SymptomRegistry
 
 
 MODULE_DIR: Path = Path(__file__).parent
 
+DISEASE_SYMPTOMS_VERSION: int = 1
+"""疾病-症状数据生成逻辑版本号，修改生成逻辑时需要递增，使旧的缓存失效"""
+
+DISEASE_SYMPTOMS_CACHE_DIR: Path = MODULE_DIR / ".cache" / "disease_symptoms"
+"""疾病-症状关联矩阵缓存目录"""
+
+
+def _source_files() -> dict[str, Path]:
+    """疾病-症状数据的源文件"""
+    dataset_dir = Path(MODULE_DIR, "disease-symptom-description-dataset")
+    files = {
+        "description": dataset_dir / "symptom_Description_cleaned.csv",
+        "symptoms": dataset_dir / "dataset_cleaned.csv",
+    }
+    if not files["description"].exists():
+        raise FileNotFoundError(f"疾病描述数据文件 {files['description']} 不存在")
+    if not files["symptoms"].exists():
+        raise FileNotFoundError(f"疾病-症状数据文件 {files['symptoms']} 不存在")
+    return files
+
+
+def _json_file() -> Path:
+    """疾病-症状数据 JSON 输出文件"""
+    return Path(
+        MODULE_DIR, "disease-symptom-description-dataset", "disease_symptoms_dict.json"
+    )
+
+
+def disease_key(disease: str) -> str:
+    """将单个疾病名称转换为 disease_key 格式"""
+    return (
+        str(disease)
+        .strip()
+        .replace(" (", "(")
+        .replace(") ", ")")
+        .replace(" ", "_")
+        .lower()
+    )
+
+
+def _normalize_disease(diseases: pd.Series) -> pd.Series:
+    """将疾病名称转换为 disease_key 格式"""
+    return diseases.map(disease_key)
+
+
+def _first_non_null(df: pd.DataFrame, like: str) -> pd.Series:
+    """取每行中列名包含 like 的首个非空值"""
+    columns = df.filter(like=like)
+    if columns.shape[1] == 0:
+        return pd.Series(np.nan, index=df.index, dtype=object)
+    return columns.bfill(axis=1).iloc[:, 0]
 
-def load_disease_with_symptoms() -> dict[str, dict[str, str | list[str]]]:
+
+def build_disease_symptoms_dict() -> dict[str, dict[str, str | list[str]]]:
+    """
+    由源数据集生成疾病-症状数据（向量化实现，不读写缓存）
+
+    疾病顺序为疾病描述数据集中的出现顺序，随后是仅出现在疾病-症状数据集中的疾病；
+    每个疾病的症状按首次出现的顺序去重。
+
+    Returns:
+        dict[str, dict[str, str | list[str]]]: 疾病-症状数据，格式见 `load_disease_with_symptoms`
+    """
+    files = _source_files()
+
+    description_df = pd.read_csv(files["description"])
+    disease = _first_non_null(description_df, "Disease")
+    descriptions = pd.DataFrame(
+        {
+            "disease": _normalize_disease(disease[disease.notna()]),
+            "description": description_df.loc[disease.notna(), "Description"]
+            .map(str)
+            .str.strip(),
+        }
+    ).drop_duplicates("disease")  # 只存一遍
+
+    symptom_df = pd.read_csv(files["symptoms"])
+    disease = _first_non_null(symptom_df, "Disease")
+    symptom_df = symptom_df[disease.notna()]
+    symptom_columns = list(symptom_df.filter(like="Symptom").columns)
+    long_df = (
+        symptom_df[symptom_columns]
+        .assign(disease=_normalize_disease(disease[disease.notna()]))
+        .reset_index(drop=True)
+        .reset_index(names="row")
+        .melt(id_vars=["row", "disease"], value_name="symptom", var_name="column")
+        .dropna(subset=["symptom"])
+    )
+    # 按原始的行、列顺序排列，保证症状按首次出现的顺序去重
+    long_df["column"] = long_df["column"].map(symptom_columns.index)
+    long_df = long_df.sort_values(["row", "column"], kind="stable")
+    # 每种写法只规范化一次，去重与分组在症状编号上进行
+    registry = SymptomRegistry()
+    symptom_ids = {
+        symptom: registry.register(str(symptom)) for symptom in long_df["symptom"].unique()
+    }
+    long_df["symptom"] = long_df["symptom"].map(symptom_ids)
+    long_df = long_df.drop_duplicates(["disease", "symptom"])
+    names = registry.names
+    symptoms_by_disease: dict[str, list[str]] = {
+        disease: [names[symptom_id] for symptom_id in ids]
+        for disease, ids in long_df.groupby("disease", sort=False)["symptom"]
+        .agg(list)
+        .items()
+    }
+
+    disease_symptoms_description_dict: dict[str, dict[str, str | list[str]]] = {
+        disease: {
+            "symptoms": symptoms_by_disease.get(disease, []),
+            "description": description,
+        }
+        for disease, description in zip(descriptions["disease"], descriptions["description"])
+    }
+    for disease, symptoms in symptoms_by_disease.items():
+        if disease not in disease_symptoms_description_dict:
+            disease_symptoms_description_dict[disease] = {
+                "symptoms": symptoms,
+                "description": "",
+            }
+    return disease_symptoms_description_dict
+
+
+def build_disease_symptom_matrix(
+    disease_symptoms_dict: dict[str, dict[str, str | list[str]]],
+) -> DiseaseSymptomMatrix:
+    """
+    生成疾病×症状关联矩阵
+
+    行、列编号分别为疾病与症状在 disease_symptoms_dict 中的首次出现顺序。
+
+    Args:
+        disease_symptoms_dict (dict[str, dict[str, str | list[str]]]): 疾病-症状数据
+
+    Returns:
+        DiseaseSymptomMatrix: CSR 关联矩阵（值为 1）及疾病、症状词表
+    """
+    diseases = list(disease_symptoms_dict)
+    registry = SymptomRegistry()
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, disease in enumerate(diseases):
+        for symptom in disease_symptoms_dict[disease]["symptoms"]:
+            rows.append(row)
+            cols.append(registry.register(symptom))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+        shape=(len(diseases), len(registry)),
+    )
+    return DiseaseSymptomMatrix(matrix, diseases, registry.names)
+
+
+def _source_fingerprint() -> dict[str, str | int]:
+    """源文件内容哈希与生成逻辑版本号"""
+    fingerprint: dict[str, str | int] = {
+        name: hash_file(path) for name, path in _source_files().items()
+    }
+    fingerprint["version"] = DISEASE_SYMPTOMS_VERSION
+    return fingerprint
+
+
+def _load_cache(
+    fingerprint: dict[str, str | int],
+) -> Optional[tuple[dict[str, dict[str, str | list[str]]], DiseaseSymptomMatrix]]:
+    """源文件未变化且缓存完整时读取缓存，否则返回 None"""
+    manifest_file = DISEASE_SYMPTOMS_CACHE_DIR / "manifest.json"
+    try:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        if manifest.get("source") != fingerprint:
+            return None
+        json_file = _json_file()
+        if hash_file(json_file) != manifest.get("json"):
+            return None
+        with open(json_file, "r", encoding="utf-8") as f:
+            disease_symptoms_dict = json.load(f)
+        vocabulary = json.loads(
+            (DISEASE_SYMPTOMS_CACHE_DIR / "vocabulary.json").read_text(encoding="utf-8")
+        )
+        matrix = sparse.load_npz(DISEASE_SYMPTOMS_CACHE_DIR / "matrix.npz").tocsr()
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"疾病-症状缓存不可用: {e}")
+        return None
+    return disease_symptoms_dict, DiseaseSymptomMatrix(
+        matrix, vocabulary["diseases"], vocabulary["symptoms"]
+    )
+
+
+def _write_cache(
+    fingerprint: dict[str, str | int],
+    disease_symptoms_dict: dict[str, dict[str, str | list[str]]],
+    disease_symptom_matrix: DiseaseSymptomMatrix,
+) -> None:
+    """写出疾病-症状 JSON、关联矩阵与缓存清单"""
+    json_file = _json_file()
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump(disease_symptoms_dict, f, ensure_ascii=False, indent=4)
+    DISEASE_SYMPTOMS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(DISEASE_SYMPTOMS_CACHE_DIR / "matrix.npz", disease_symptom_matrix.matrix)
+    (DISEASE_SYMPTOMS_CACHE_DIR / "vocabulary.json").write_text(
+        json.dumps(
+            {
+                "diseases": disease_symptom_matrix.diseases,
+                "symptoms": disease_symptom_matrix.symptoms,
+            },
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    # 清单最后写出，保证清单存在时其余文件均已完整
+    (DISEASE_SYMPTOMS_CACHE_DIR / "manifest.json").write_text(
+        json.dumps({"source": fingerprint, "json": hash_file(json_file)}),
+        encoding="utf-8",
+    )
+
+
+def _load_disease_symptoms(
+    use_cache: bool,
+) -> tuple[dict[str, dict[str, str | list[str]]], DiseaseSymptomMatrix]:
+    """读取缓存或重新生成疾病-症状数据与关联矩阵"""
+    fingerprint = _source_fingerprint()
+    if use_cache:
+        cached = _load_cache(fingerprint)
+        if cached is not None:
+            logger.debug("疾病-症状数据命中缓存")
+            return cached
+    disease_symptoms_dict = build_disease_symptoms_dict()
+    disease_symptom_matrix = build_disease_symptom_matrix(disease_symptoms_dict)
+    _write_cache(fingerprint, disease_symptoms_dict, disease_symptom_matrix)
+    return disease_symptoms_dict, disease_symptom_matrix
+
+
+def load_disease_with_symptoms(
+    *, use_cache: bool = True
+) -> dict[str, dict[str, str | list[str]]]:
     """
     读取对应的疾病-症状数据
 
+    源数据集未变化时直接读取上次生成的 disease_symptoms_dict.json，不再重写。
+
+    Args:
+        use_cache (bool): 是否复用缓存，为 False 时重新生成并覆盖缓存
+
     Returns:
         disease_symptoms_dict(dict[str, dict[str, str | list[str]]]): 疾病-症状数据
 
@@ -28,88 +271,25 @@ def load_disease_with_symptoms() -> dict[str, dict[str, str | list[str]]]:
             }
         }
     """
-    disease_symptoms_description_dict: dict[str, dict[str, str | list[str]]] = {}
-    disease_description_file_name = Path(
-        MODULE_DIR,
-        "disease-symptom-description-dataset",
-        "symptom_Description_cleaned.csv",
-    )
-    if not disease_description_file_name.exists():
-        raise FileNotFoundError(
-            f"疾病描述数据文件 {disease_description_file_name} 不存在"
-        )
+    return _load_disease_symptoms(use_cache)[0]
 
-    disease_description_df = pd.read_csv(disease_description_file_name)
-    for idx, row in disease_description_df.iterrows():
-        disease_list: list = row.filter(like="Disease").dropna().tolist()
-        if len(disease_list) == 0:
-            continue
-        disease: str = (
-            str(disease_list[0])
-            .strip()
-            .replace(" (", "(")
-            .replace(") ", ")")
-            .replace(" ", "_")
-            .lower()
-        )
-        description: str = str(row["Description"]).strip()
-        if disease not in disease_symptoms_description_dict:
-            disease_symptoms_description_dict[disease] = {
-                "symptoms": [],
-                "description": description,
-            }
-        else:
-            # 只存一遍
-            continue
-    disease_names = list(disease_symptoms_description_dict.keys())
-    disease_symptoms_file_name = Path(
-        MODULE_DIR, "disease-symptom-description-dataset", "dataset_cleaned.csv"
-    )
-    if not disease_symptoms_file_name.exists():
-        raise FileNotFoundError(
-            f"疾病-症状数据文件 {disease_symptoms_file_name} 不存在"
-        )
-    disease_symptom_df = pd.read_csv(disease_symptoms_file_name)
-    for idx, row in disease_symptom_df.iterrows():
-        disease_list: list = row.filter(like="Disease").dropna().tolist()
-        if len(disease_list) == 0:
-            continue
-        disease: str = (
-            str(disease_list[0])
-            .strip()
-            .replace(" (", "(")
-            .replace(") ", ")")
-            .replace(" ", "_")
-            .lower()
-        )
-        symptoms: list = row.filter(like="Symptom").dropna().tolist()
-        for symptom in symptoms:
-            symptom = str(symptom).strip().replace(" ", "").lower()
-            if disease not in disease_symptoms_description_dict:
-                disease_symptoms_description_dict[disease] = {
-                    "symptoms": [symptom],
-                    "description": "",
-                }
-            elif isinstance(
-                disease_symptoms_description_dict[disease]["symptoms"], list
-            ):
-                if (
-                    symptom
-                    not in disease_symptoms_description_dict[disease]["symptoms"]
-                ):
-                    disease_symptoms_description_dict[disease]["symptoms"].append(  # type: ignore
-                        symptom
-                    )
-
-            else:
-                # 添加新的病症
-                disease_symptoms_description_dict[disease]["symptoms"] = [symptom]
-    json_file_name = Path(
-        MODULE_DIR, "disease-symptom-description-dataset", "disease_symptoms_dict.json"
-    )
-    with open(json_file_name, "w", encoding="utf-8") as f:
-        json.dump(disease_symptoms_description_dict, f, ensure_ascii=False, indent=4)
-    return disease_symptoms_description_dict
+
+def load_disease_symptom_matrix(*, use_cache: bool = True) -> DiseaseSymptomMatrix:
+    """
+    读取疾病×症状 CSR 关联矩阵
+
+    Args:
+        use_cache (bool): 是否复用缓存，为 False 时重新生成并覆盖缓存
+
+    Returns:
+        DiseaseSymptomMatrix: 关联矩阵及疾病、症状词表
+
+    Example:
+        >>> m = load_disease_symptom_matrix()
+        >>> m.matrix.shape, m.symptoms_of("malaria")[:2]
+        ((41, 131), ["chills", "vomiting"])
+    """
+    return _load_disease_symptoms(use_cache)[1]
 
 
 if __name__ == "__main__":
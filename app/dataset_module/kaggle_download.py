@@ -1,24 +1,346 @@
-"""Kaggle 数据下载"""
+"""
+Kaggle 数据下载
+
+下载结果保存在按内容寻址的本地缓存中：每个文件复制一份以其 SHA-256 命名的只读对象存放在
+`KAGGLE_OBJECTS_DIR` 下（不与数据来源的文件共享 inode），dataset_module/<数据集名> 中的文件
+是指向这些对象的硬链接（跨文件系统时退回复制）；复用已有对象前会校验其内容。清单 `KAGGLE_MANIFEST_FILE` 记录每个数据集的版本与各文件的校验和，
+本地副本与最新版本一致时跳过下载与复制。
+
+数据来源通过 `DatasetProvider` 抽象：`KagglehubProvider` 使用 kagglehub，
+`LocalDirectoryProvider` 从本地目录提供数据集（用于测试与离线镜像）。
+"""
 
-import shutil
-from typing import Any, Optional
-import kagglehub
-import pandas as pd
 import os
-import subprocess
+import re
 import json
+import shutil
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Optional, Protocol
+
 from static_module import KAGGLE_DATASET_DOWNLOAD_URLS_FILE
-from utility_module import logger
+from utility_module import logger, hash_file
+
+KAGGLE_CACHE_DIR: str = ".cache/kaggle"
+"""下载缓存目录（相对于 dataset_module）"""
+
+KAGGLE_OBJECTS_DIR: str = f"{KAGGLE_CACHE_DIR}/objects"
+"""按内容寻址的文件对象目录（相对于 dataset_module）"""
+
+KAGGLE_MANIFEST_FILE: str = f"{KAGGLE_CACHE_DIR}/manifest.json"
+"""数据集版本与文件校验和清单（相对于 dataset_module）"""
+
+OBJECT_FILE_MODE: int = 0o444
+"""缓存对象的文件权限（只读，防止通过硬链接原地修改对象内容）"""
+
+_VERSION_PATTERN: re.Pattern = re.compile(r"[\\/]versions[\\/](\d+)(?:[\\/]|$)")
+
+
+class DatasetProvider(Protocol):
+    """数据集来源"""
+
+    def latest_version(self, handle: str) -> Optional[str]:
+        """数据集的最新版本号，无法廉价获知时返回 None（此时总是调用 fetch）"""
+        ...
+
+    def fetch(self, handle: str) -> tuple[Path, Optional[str]]:
+        """获取数据集最新版本，返回 (文件所在目录, 版本号)"""
+        ...
+
+
+class KagglehubProvider:
+    """
+    通过 kagglehub 获取数据集
+
+    kagglehub 自身按版本缓存下载结果，不强制重新下载时，最新版本已在其缓存中则不会再次下载；
+    版本号从 kagglehub 返回的缓存路径（.../versions/<N>）中解析。
+    """
+
+    def latest_version(self, handle: str) -> Optional[str]:
+        return None
+
+    def fetch(self, handle: str) -> tuple[Path, Optional[str]]:
+        import kagglehub
+
+        path = kagglehub.dataset_download(handle)
+        match = _VERSION_PATTERN.search(str(path))
+        return Path(path), match.group(1) if match else None
+
+
+class LocalDirectoryProvider:
+    """
+    从本地目录提供数据集，目录结构为 `<root>/<owner>/<dataset>/<版本号>/...`
+
+    最新版本为数值最大的版本目录；`fetch_counts` 记录每个数据集被获取的次数，便于验证缓存是否生效。
+    """
+
+    def __init__(self, root: os.PathLike):
+        self.root: Path = Path(root)
+        """数据集根目录"""
+        self.fetch_counts: dict[str, int] = {}
+        """数据集 → 获取次数"""
+        self._lock = threading.Lock()
+
+    def latest_version(self, handle: str) -> Optional[str]:
+        versions = [
+            path.name for path in Path(self.root, handle).iterdir() if path.is_dir()
+        ]
+        if not versions:
+            return None
+        return max(versions, key=lambda v: (int(v) if v.isdigit() else -1, v))
+
+    def fetch(self, handle: str) -> tuple[Path, Optional[str]]:
+        with self._lock:
+            self.fetch_counts[handle] = self.fetch_counts.get(handle, 0) + 1
+        version = self.latest_version(handle)
+        if version is None:
+            raise FileNotFoundError(f"数据集 {handle} 在 {self.root} 下没有任何版本")
+        return Path(self.root, handle, version), version
+
+
+def _temp_path(target: Path) -> Path:
+    """与 target 同目录的临时文件路径（区分进程与线程）"""
+    return target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _replace(temp_path: Path, target: Path) -> None:
+    """用 temp_path 原子地替换 target（目标为只读文件而替换失败时先恢复可写再重试）"""
+    try:
+        os.replace(temp_path, target)
+    except PermissionError:
+        os.chmod(target, stat.S_IREAD | stat.S_IWRITE)
+        os.replace(temp_path, target)
+
 
+def _link_or_copy(source: Path, target: Path) -> None:
+    """原子地在 target 处创建 source 的硬链接，无法硬链接时复制"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = _temp_path(target)
+    try:
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copy2(source, temp_path)
+        _replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _file_is_current(path: Path, record: dict[str, Any]) -> bool:
+    """本地文件与清单记录一致：大小与修改时间未变时直接认定，否则重新计算校验和"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_size != record["size"]:
+        return False
+    if stat.st_mtime_ns == record.get("mtime_ns"):
+        return True
+    return hash_file(path) == record["sha256"]
+
+
+def _is_current(
+    dataset_dir: Path, entry: Optional[dict[str, Any]], version: Optional[str]
+) -> bool:
+    """本地副本是否为指定版本且全部文件完好"""
+    return (
+        entry is not None
+        and version is not None
+        and entry.get("version") == version
+        and all(
+            _file_is_current(dataset_dir / name, record)
+            for name, record in entry["files"].items()
+        )
+    )
+
+
+class KaggleDatasetCache:
+    """按内容寻址的 Kaggle 数据集本地缓存"""
+
+    def __init__(
+        self,
+        dataset_root: os.PathLike = Path.cwd() / "dataset_module",
+        provider: Optional[DatasetProvider] = None,
+    ):
+        self.dataset_root: Path = Path(dataset_root)
+        """数据集根目录（dataset_module）"""
+        self.provider: DatasetProvider = provider or KagglehubProvider()
+        """数据集来源"""
+        self.objects_dir: Path = self.dataset_root / KAGGLE_OBJECTS_DIR
+        """文件对象目录"""
+        self.manifest_file: Path = self.dataset_root / KAGGLE_MANIFEST_FILE
+        """清单文件"""
+        self._lock = threading.Lock()
+        try:
+            self._manifest: dict[str, Any] = json.loads(
+                self.manifest_file.read_text(encoding="utf-8")
+            )
+        except (OSError, json.JSONDecodeError):
+            self._manifest = {}
+
+    def dataset_dir(self, handle: str) -> Path:
+        """数据集在本地的目录"""
+        return self.dataset_root / os.path.basename(handle)
+
+    def _store_object(self, source: Path, sha256: str) -> Path:
+        """
+        将文件复制为只读对象放入对象目录
+
+        已存在的对象校验内容后才复用，内容不符（被修改或损坏）时用 source 重新写入。
+
+        Args:
+            source (Path): 来源文件
+            sha256 (str): 来源文件内容的 SHA-256
+
+        Returns:
+            Path: 对象文件路径
+        """
+        object_path = self.objects_dir / sha256[:2] / sha256
+        if object_path.exists() and hash_file(object_path) == sha256:
+            return object_path
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = _temp_path(object_path)
+        try:
+            shutil.copyfile(source, temp_path)
+            if hash_file(temp_path) != sha256:
+                raise ValueError(f"文件 {source} 在同步过程中发生了变化")
+            os.chmod(temp_path, OBJECT_FILE_MODE)
+            _replace(temp_path, object_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return object_path
+
+    def sync(self, handle: str, *, force: bool = False) -> Path:
+        """
+        同步单个数据集到本地
 
-# Download latest version
-def download_and_open_datasets() -> dict[str, Optional[str]]:
+        Args:
+            handle (str): 数据集标识，如 owner/dataset
+            force (bool): 是否忽略清单，重新获取并链接全部文件
+
+        Returns:
+            Path: 本地数据集目录
+        """
+        dataset_dir = self.dataset_dir(handle)
+        with self._lock:
+            entry = self._manifest.get(handle)
+        if not force and _is_current(
+            dataset_dir, entry, self.provider.latest_version(handle)
+        ):
+            logger.debug(f"数据集 {handle} 已是最新版本 {entry['version']}，跳过下载")
+            return dataset_dir
+
+        source_dir, version = self.provider.fetch(handle)
+        if not force and _is_current(dataset_dir, entry, version):
+            logger.debug(f"数据集 {handle} 已是最新版本 {version}，跳过复制")
+            return dataset_dir
+
+        files: dict[str, dict[str, Any]] = {}
+        linked = 0
+        for source in sorted(Path(source_dir).rglob("*")):
+            if not source.is_file():
+                continue
+            name = source.relative_to(source_dir).as_posix()
+            target = dataset_dir / name
+            sha256 = hash_file(source)
+            previous = (entry or {}).get("files", {}).get(name)
+            if (
+                force
+                or previous is None
+                or previous["sha256"] != sha256
+                or not _file_is_current(target, previous)
+            ):
+                _link_or_copy(self._store_object(source, sha256), target)
+                linked += 1
+            stat = target.stat()
+            files[name] = {
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+
+        # 删除旧版本中存在、新版本中已不存在的文件（不影响清洗结果等其他文件）
+        for name in (entry or {}).get("files", {}):
+            if name not in files:
+                (dataset_dir / name).unlink(missing_ok=True)
+
+        with self._lock:
+            self._manifest[handle] = {"version": version, "files": files}
+            self._save_manifest()
+        logger.info(
+            f"数据集 {handle} 已同步到 {dataset_dir}（版本 {version}，更新 {linked}/{len(files)} 个文件）"
+        )
+        return dataset_dir
+
+    def _save_manifest(self) -> None:
+        """原子地写出清单（调用方持有锁）"""
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_file.with_name(
+            f"{self.manifest_file.name}.{os.getpid()}.tmp"
+        )
+        temp_path.write_text(
+            json.dumps(self._manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(temp_path, self.manifest_file)
+
+    def sync_all(
+        self,
+        handles: list[str],
+        *,
+        workers: Optional[int] = None,
+        force: bool = False,
+    ) -> dict[str, Optional[str]]:
+        """
+        并发同步多个数据集
+
+        Args:
+            handles (list[str]): 数据集标识列表
+            workers (Optional[int]): 并发线程数，为空时同时处理全部数据集
+            force (bool): 是否忽略清单强制重新获取
+
+        Returns:
+            dict[str, Optional[str]]: 数据集标识 → 本地目录，失败时为 None
+        """
+        if not handles:
+            return {}
+
+        def sync_one(handle: str) -> Optional[str]:
+            try:
+                return str(self.sync(handle, force=force))
+            except Exception as e:
+                logger.error(f"同步数据集 {handle} 时出错: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers or len(handles)) as executor:
+            results = dict(zip(handles, executor.map(sync_one, handles)))
+        failed = [handle for handle, path in results.items() if path is None]
+        logger.info(
+            f"数据集同步完成：共 {len(handles)} 个，失败 {len(failed)} 个"
+            + (f"（{', '.join(failed)}）" if failed else "")
+        )
+        return results
+
+
+def download_and_open_datasets(
+    *,
+    provider: Optional[DatasetProvider] = None,
+    dataset_root: os.PathLike = Path.cwd() / "dataset_module",
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> dict[str, Optional[str]]:
     """
-    下载并加载数据集，在下载完成后打开下载文件夹。
+    下载数据集到 dataset_module 下（经本地缓存，已是最新版本的数据集跳过下载与复制）
+
+    参数：
+    - provider: 数据集来源，默认为 kagglehub
+    - dataset_root: 数据集根目录
+    - workers: 并发数，为空时同时处理全部数据集
+    - force: 是否忽略缓存清单强制重新获取
 
     返回
-    - dict[str, Optional[str]]: 包含数据集文件路径的字典
+    - dict[str, Optional[str]]: 数据集标识 → 本地目录，失败时为 None
     """
     urls_file_path = Path.cwd() / KAGGLE_DATASET_DOWNLOAD_URLS_FILE
     if not urls_file_path.exists():
@@ -27,22 +349,5 @@ def download_and_open_datasets() -> dict[str, Optional[str]]:
     url_dict: dict[str, Optional[str]] = json.loads(
         urls_file_path.read_text(encoding="utf-8")
     )
-    for url in url_dict.keys():
-        url_dict[url] = kagglehub.dataset_download(url, force_download=True)
-        try:
-            # 使用浏览器打开下载文件夹
-            # subprocess.run(
-            #     ["explorer", str(url_dict[url])],
-            #     check=True,
-            # )
-            shutil.copytree(
-                str(url_dict[url]),
-                os.path.join(os.getcwd(), "dataset_module", os.path.basename(url)),
-                dirs_exist_ok=True,
-            )
-            logger.debug(
-                f"已复制文件夹 {url_dict[url]} 到 dataset_module/{os.path.basename(url)}"
-            )
-        except Exception as e:
-            logger.error(f"复制文件夹 {url_dict[url]} 时出错: {e}")
-    return url_dict
+    cache = KaggleDatasetCache(dataset_root, provider)
+    return cache.sync_all(list(url_dict), workers=workers, force=force)
@@ -0,0 +1,319 @@
+"""
+问答语料随机访问模块
+
+first-aid-QA 与 generated_qa_data 下的问答语料为单个 JSON 数组（每个 2~3.3 MB），
+为读取少量记录而整体 json.load 代价较高。本模块为每个语料文件生成记录字节偏移的
+旁路索引（与语料同目录的 `<文件名>.idx`），之后通过 mmap 按需解析单条记录，
+支持随机访问、切片与均匀抽样；也可将语料转换为 JSONL（每行一条记录），
+JSONL 文件同样可以建立索引。
+
+训练代码可以直接按下标读取或抽样，QACorpus 可被 pickle（仅保存路径，
+在子进程中重新打开），便于在多进程数据加载中使用；检索代码（全文索引构建）
+通过遍历 QACorpus 读取全部记录。
+"""
+
+import os
+import re
+import json
+import mmap
+import codecs
+import random
+import struct
+import argparse
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+
+from utility_module import logger
+
+QA_CORPUS_DIRS: tuple[str, ...] = ("first-aid-QA", "generated_qa_data")
+"""问答语料所在目录（相对于 dataset_module）"""
+
+QA_INDEX_SUFFIX: str = ".idx"
+"""旁路索引文件后缀，索引文件为 `<语料文件名>.idx`"""
+
+QA_INDEX_MAGIC: bytes = b"QAIDX\x00\x00\x01"
+"""旁路索引文件头魔数（含格式版本号）"""
+
+_INDEX_HEADER: struct.Struct = struct.Struct("<8sqqq")
+"""索引文件头：魔数、语料文件大小、语料文件修改时间（纳秒）、记录数"""
+
+_WHITESPACE_PATTERN: re.Pattern = re.compile(r"[ \t\n\r]*")
+
+
+def discover_qa_files(
+    dataset_dir: os.PathLike = Path.cwd() / "dataset_module",
+) -> list[Path]:
+    """发现问答语料目录下的所有 JSON 文件"""
+    return [
+        json_file
+        for corpus_dir in QA_CORPUS_DIRS
+        for json_file in sorted(Path(dataset_dir, corpus_dir).glob("*.json"))
+    ]
+
+
+def index_path(corpus_file: os.PathLike) -> Path:
+    """语料文件对应的旁路索引文件路径"""
+    corpus_file = Path(corpus_file)
+    return corpus_file.with_name(corpus_file.name + QA_INDEX_SUFFIX)
+
+
+def _jsonl_offsets(data: bytes) -> list[tuple[int, int]]:
+    """JSONL 文件中每条非空记录的字节区间"""
+    offsets: list[tuple[int, int]] = []
+    start = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = len(data)
+        if data[start:end].strip():
+            offsets.append((start, end))
+        start = end + 1
+    return offsets
+
+
+def _json_array_offsets(data: bytes) -> list[tuple[int, int]]:
+    """JSON 数组文件中每个元素的字节区间（逐个元素解析一遍以确定边界）"""
+    base = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+    text = data[base:].decode("utf-8")
+    ascii_only = text.isascii()
+    decoder = json.JSONDecoder()
+    offsets: list[tuple[int, int]] = []
+    char_pos, byte_pos = 0, base
+
+    def to_byte(pos: int) -> int:
+        """字符位置 → 字节位置（位置单调递增，逐段累加编码长度）"""
+        nonlocal char_pos, byte_pos
+        if ascii_only:
+            return base + pos
+        byte_pos += len(text[char_pos:pos].encode("utf-8"))
+        char_pos = pos
+        return byte_pos
+
+    pos = _WHITESPACE_PATTERN.match(text).end()
+    if text[pos : pos + 1] != "[":
+        raise ValueError("问答语料不是 JSON 数组")
+    pos = _WHITESPACE_PATTERN.match(text, pos + 1).end()
+    if text[pos : pos + 1] == "]":
+        return offsets
+    while True:
+        _, end = decoder.raw_decode(text, pos)
+        offsets.append((to_byte(pos), to_byte(end)))
+        pos = _WHITESPACE_PATTERN.match(text, end).end()
+        separator = text[pos : pos + 1]
+        if separator == "]":
+            return offsets
+        if separator != ",":
+            raise ValueError(f"问答语料第 {pos} 个字符处缺少 ',' 或 ']'")
+        pos = _WHITESPACE_PATTERN.match(text, pos + 1).end()
+
+
+def build_record_offsets(corpus_file: os.PathLike) -> np.ndarray:
+    """
+    计算语料文件中每条记录的字节区间
+
+    Args:
+        corpus_file (os.PathLike): JSON 数组或 JSONL 语料文件
+
+    Returns:
+        np.ndarray: 形状为 (记录数, 2) 的 int64 数组，每行为 [起始, 结束) 字节偏移
+    """
+    data = Path(corpus_file).read_bytes()
+    if Path(corpus_file).suffix == ".jsonl":
+        offsets = _jsonl_offsets(data)
+    else:
+        offsets = _json_array_offsets(data)
+    return np.array(offsets, dtype=np.int64).reshape(-1, 2)
+
+
+def _read_index(corpus_file: Path, stat: os.stat_result) -> Optional[np.ndarray]:
+    """读取旁路索引，索引缺失、格式不符或语料已变化时返回 None"""
+    try:
+        data = index_path(corpus_file).read_bytes()
+        magic, size, mtime_ns, count = _INDEX_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if (
+        magic != QA_INDEX_MAGIC
+        or size != stat.st_size
+        or mtime_ns != stat.st_mtime_ns
+        or len(data) != _INDEX_HEADER.size + count * 16
+    ):
+        return None
+    return np.frombuffer(data, dtype="<i8", offset=_INDEX_HEADER.size).reshape(-1, 2)
+
+
+def _write_index(corpus_file: Path, stat: os.stat_result, offsets: np.ndarray) -> None:
+    """原子地写出旁路索引，写入失败（如只读目录）时仅记录警告"""
+    target = index_path(corpus_file)
+    temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(
+                _INDEX_HEADER.pack(
+                    QA_INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets)
+                )
+            )
+            f.write(offsets.astype("<i8").tobytes())
+        os.replace(temp_path, target)
+    except OSError as e:
+        logger.warning(f"写出问答语料索引 {target} 失败: {e}")
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+class QACorpus:
+    """
+    问答语料的惰性随机访问视图
+
+    首次打开时建立旁路索引（语料文件大小或修改时间变化后自动重建），
+    之后只解析被访问的记录。
+
+    Example:
+        >>> with QACorpus("dataset_module/first-aid-QA/labeled_firstaidqa.json") as corpus:
+        ...     len(corpus), corpus[0]["question"], corpus[10:12], corpus.sample(5, seed=0)
+    """
+
+    def __init__(self, corpus_file: os.PathLike, *, rebuild: bool = False):
+        self.path: Path = Path(corpus_file)
+        """语料文件路径"""
+        stat = self.path.stat()
+        offsets = None if rebuild else _read_index(self.path, stat)
+        if offsets is None:
+            offsets = build_record_offsets(self.path)
+            _write_index(self.path, stat, offsets)
+        self._offsets: np.ndarray = offsets
+        self._file = open(self.path, "rb")
+        self._mmap: Optional[mmap.mmap] = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if stat.st_size
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _read(self, index: int) -> Any:
+        """解析第 index 条记录（index 已规范化为非负数）"""
+        start, end = self._offsets[index]
+        return json.loads(self._mmap[start:end])
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self._read(i) for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"记录下标 {index} 超出范围（共 {len(self)} 条）")
+        return self._read(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self._read(i)
+
+    def records(self, indices: list[int]) -> list[Any]:
+        """按给定下标顺序读取多条记录（按文件位置顺序访问）"""
+        order = sorted(range(len(indices)), key=lambda i: indices[i])
+        records: list[Any] = [None] * len(indices)
+        for i in order:
+            records[i] = self[indices[i]]
+        return records
+
+    def sample(self, k: int, *, seed: Optional[int] = None) -> list[Any]:
+        """
+        不放回地均匀抽样 k 条记录
+
+        Args:
+            k (int): 抽样条数，不能超过记录数
+            seed (Optional[int]): 随机种子，相同种子得到相同的结果
+
+        Returns:
+            list[Any]: 抽中的记录
+        """
+        return self.records(random.Random(seed).sample(range(len(self)), k))
+
+    def close(self) -> None:
+        """关闭 mmap 与文件句柄"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "QACorpus":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # 只保存路径，反序列化时重新打开（索引已存在，开销很小）
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["path"])
+
+
+def convert_json_to_jsonl(
+    json_file: os.PathLike, jsonl_file: Optional[os.PathLike] = None
+) -> Path:
+    """
+    将 JSON 数组语料转换为 JSONL（每行一条记录），逐条读取、写出
+
+    Args:
+        json_file (os.PathLike): JSON 数组语料文件
+        jsonl_file (Optional[os.PathLike]): 输出文件，为空时与语料同名、后缀为 .jsonl
+
+    Returns:
+        Path: 输出文件路径
+    """
+    json_file = Path(json_file)
+    jsonl_file = Path(jsonl_file) if jsonl_file is not None else json_file.with_suffix(".jsonl")
+    temp_path = jsonl_file.with_name(f"{jsonl_file.name}.{os.getpid()}.tmp")
+    try:
+        with QACorpus(json_file) as corpus, open(temp_path, "w", encoding="utf-8") as f:
+            for record in corpus:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+        os.replace(temp_path, jsonl_file)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    logger.info(f"已将问答语料 {json_file} 转换为 {jsonl_file}")
+    return jsonl_file
+
+
+def build_qa_indexes(
+    dataset_dir: os.PathLike = Path.cwd() / "dataset_module",
+    *,
+    jsonl: bool = False,
+    rebuild: bool = False,
+) -> dict[str, int]:
+    """
+    为所有问答语料建立旁路索引
+
+    Args:
+        dataset_dir (os.PathLike): 数据集根目录
+        jsonl (bool): 是否同时转换为 JSONL
+        rebuild (bool): 是否忽略已有索引重新建立
+
+    Returns:
+        dict[str, int]: 语料文件（相对路径）→ 记录数
+    """
+    counts: dict[str, int] = {}
+    for json_file in discover_qa_files(dataset_dir):
+        with QACorpus(json_file, rebuild=rebuild) as corpus:
+            counts[json_file.relative_to(dataset_dir).as_posix()] = len(corpus)
+        if jsonl:
+            convert_json_to_jsonl(json_file)
+    for name, count in counts.items():
+        logger.info(f"问答语料 {name}: {count} 条记录")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="为问答语料建立记录偏移索引")
+    parser.add_argument("--jsonl", action="store_true", help="同时转换为 JSONL")
+    parser.add_argument("--rebuild", action="store_true", help="重新建立已有索引")
+    args = parser.parse_args()
+    build_qa_indexes(jsonl=args.jsonl, rebuild=args.rebuild)
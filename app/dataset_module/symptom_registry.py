@@ -0,0 +1,141 @@
+"""
+症状标准名注册表
+
+同一症状在不同数据源中的写法不一致，如 dataset.csv 中的 " skin_rash"、
+Symptom-severity.csv 中的 "skin_rash" 以及 LLM 输出中的 "Skin rash"。
+注册表对每种写法只规范化一次，为每个症状分配连续的整数编号，
+之后任意写法均可通过字典在 O(1) 时间内解析为编号，跨数据源的关联在整数上进行。
+
+本模块只依赖标准库，match_data_preprocessing/scripts 下的独立脚本可以将
+app/dataset_module 加入 sys.path 后直接 `from symptom_registry import SymptomRegistry`。
+"""
+
+import os
+import csv
+import re
+from typing import Iterable, Optional
+
+_WHITESPACE_PATTERN: re.Pattern = re.compile(r"\s+")
+_SEPARATOR_PATTERN: re.Pattern = re.compile(r"[\s_]+")
+
+DEFAULT_SYMPTOM_WEIGHT: int = 1
+"""严重度权重无法解析时使用的默认权重"""
+
+
+def canonical_symptom(symptom: str) -> str:
+    """
+    症状标准名：去首尾空白并转小写；含下划线的写法删除其中的空白
+    （与 Symptom-severity.csv 一致，如 "foul_smell_of urine" → "foul_smell_ofurine"），
+    否则空白替换为下划线（如 "Skin rash" → "skin_rash"）
+    """
+    symptom = str(symptom).strip().lower()
+    if "_" in symptom:
+        return _WHITESPACE_PATTERN.sub("", symptom)
+    return _WHITESPACE_PATTERN.sub("_", symptom)
+
+
+def symptom_key(symptom: str) -> str:
+    """症状查找键：转小写并删除全部空白与下划线，写法不同的同一症状得到相同的键"""
+    return _SEPARATOR_PATTERN.sub("", str(symptom).lower())
+
+
+class SymptomRegistry:
+    """
+    症状注册表
+
+    编号从 0 开始按注册顺序连续分配；每个编号对应一个标准名，并可选地带有严重度权重。
+    """
+
+    def __init__(self, symptoms: Iterable[str] = ()):
+        self._names: list[str] = []
+        self._weights: list[Optional[int]] = []
+        self._key_ids: dict[str, int] = {}
+        self._alias_ids: dict[str, int] = {}
+        """原始写法 → 编号，同一写法只规范化一次"""
+        for symptom in symptoms:
+            self.register(symptom)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, symptom: object) -> bool:
+        return isinstance(symptom, str) and self.resolve(symptom) is not None
+
+    @property
+    def names(self) -> list[str]:
+        """按编号排列的症状标准名"""
+        return list(self._names)
+
+    def register(self, symptom: str, weight: Optional[int] = None) -> int:
+        """
+        注册症状并返回编号，已注册的症状（任意写法）返回原编号
+
+        Args:
+            symptom (str): 症状的任意写法
+            weight (Optional[int]): 严重度权重，给出时覆盖已有权重
+
+        Returns:
+            int: 症状编号
+        """
+        symptom_id = self.resolve(symptom)
+        if symptom_id is None:
+            symptom_id = len(self._names)
+            self._names.append(canonical_symptom(symptom))
+            self._weights.append(None)
+            self._key_ids[symptom_key(symptom)] = symptom_id
+            self._alias_ids[symptom] = symptom_id
+        if weight is not None:
+            self._weights[symptom_id] = weight
+        return symptom_id
+
+    def resolve(self, symptom: str) -> Optional[int]:
+        """解析症状写法为编号，未注册时返回 None"""
+        symptom_id = self._alias_ids.get(symptom)
+        if symptom_id is None:
+            symptom_id = self._key_ids.get(symptom_key(symptom))
+            if symptom_id is not None:
+                self._alias_ids[symptom] = symptom_id
+        return symptom_id
+
+    def encode(self, symptoms: Iterable[str]) -> list[int]:
+        """注册一组症状并返回编号列表"""
+        return [self.register(symptom) for symptom in symptoms]
+
+    def name(self, symptom_id: int) -> str:
+        """编号对应的症状标准名"""
+        return self._names[symptom_id]
+
+    def weight(self, symptom_id: int) -> Optional[int]:
+        """编号对应的严重度权重，没有权重时返回 None"""
+        return self._weights[symptom_id]
+
+    def weight_of(self, symptom: str) -> Optional[int]:
+        """症状任意写法对应的严重度权重，未注册或没有权重时返回 None"""
+        symptom_id = self.resolve(symptom)
+        return None if symptom_id is None else self._weights[symptom_id]
+
+    @classmethod
+    def from_severity_csv(cls, path: os.PathLike) -> "SymptomRegistry":
+        """
+        由症状严重度数据集（Symptom,weight 两列）创建注册表
+
+        Args:
+            path (os.PathLike): Symptom-severity 数据集文件
+
+        Returns:
+            SymptomRegistry: 带严重度权重的注册表，按文件中的顺序编号
+        """
+        registry = cls()
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                row = {str(k).strip(): v for k, v in row.items()}
+                symptom = str(row.get("Symptom") or "").strip()
+                if not symptom or symptom.lower() == "nan":
+                    continue
+                try:
+                    weight = int(float(row.get("weight") or DEFAULT_SYMPTOM_WEIGHT))
+                except (ValueError, TypeError):
+                    weight = DEFAULT_SYMPTOM_WEIGHT
+                registry.register(symptom, weight)
+        return registry
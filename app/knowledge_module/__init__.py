@@ -0,0 +1,19 @@
+"""
+知识快照包
+
+将疾病、症状与药物知识编译为内存映射的二进制快照，供启动时快速查询。
+"""
+
+from .knowledge_snapshot import (
+    KnowledgeSnapshot,
+    compile_knowledge_snapshot,
+    open_knowledge_snapshot,
+    compare_startup_time,
+)
+
+__all__ = [
+    "KnowledgeSnapshot",
+    "compile_knowledge_snapshot",
+    "open_knowledge_snapshot",
+    "compare_startup_time",
+]
@@ -121,10 +121,12 @@ def app_run() -> None:
     # register_default_main_thread_tasks()
 
     # main_thread_task_handler()
-    import dataset_module
+    import knowledge_module
     import json
 
-    disease_symptoms_dict = dataset_module.load_disease_with_symptoms()
+    # 从内存映射的知识快照读取，无需 pandas 解析 CSV
+    knowledge_snapshot = knowledge_module.open_knowledge_snapshot()
+    disease_symptoms_dict = knowledge_snapshot.disease_symptoms_dict()
     logger.debug(
         "加载疾病-症状数据\n"
         + json.dumps(disease_symptoms_dict, ensure_ascii=False, indent=4)
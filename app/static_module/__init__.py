@@ -21,8 +21,16 @@ __all__ = [
     "THREAD_TIMEOUT",
     "KAGGLE_DATASET_DOWNLOAD_URLS_FILE",
     "DATABASE_FILE",
+    "ENHANCED_DRUG_TABLE_FILE",
+    "DISEASE_KEYS_FILE",
+    "KNOWLEDGE_SNAPSHOT_FILE",
     # Classes
     "AppAsyncTask",
+    "TableBuildStats",
+    "SourceFingerprint",
+    "QueryCacheStats",
+    "DiseaseSymptomMatrix",
+    "ColumnProfile",
     # Enums
     "TaskStatus",
 ]
@@ -2,13 +2,16 @@
 
 # 系统/第三方模块导入
 from dataclasses import dataclass, field
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, TYPE_CHECKING
 import threading
 from datetime import datetime
 
 # 本地模块导入
 from .enums import TaskStatus
 
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
 
 @dataclass
 class AppAsyncTask:
@@ -37,3 +40,102 @@ class AppAsyncTask:
     def is_cancelled(self) -> bool:
         """检查任务是否已被取消"""
         return self.cancel_event.is_set()
+
+
+@dataclass
+class TableBuildStats:
+    """数据表构建统计"""
+
+    table_name: str
+    rows: int
+    seconds: float
+    load_seconds: float = 0.0
+    insert_seconds: float = 0.0
+    merge_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """每秒写入行数"""
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+@dataclass
+class SourceFingerprint:
+    """数据源文件指纹"""
+
+    source_path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+
+    def same_content(self, other: Optional["SourceFingerprint"]) -> bool:
+        """判断两个指纹是否对应相同的文件内容"""
+        return (
+            other is not None
+            and self.size == other.size
+            and self.content_hash == other.content_hash
+        )
+
+
+@dataclass
+class QueryCacheStats:
+    """查询结果缓存统计"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class DiseaseSymptomMatrix:
+    """疾病×症状关联矩阵（CSR 稀疏矩阵及行列词表）"""
+
+    matrix: "csr_matrix"
+    diseases: list[str]
+    symptoms: list[str]
+    disease_ids: dict[str, int] = field(init=False, repr=False)
+    symptom_ids: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.disease_ids = {name: i for i, name in enumerate(self.diseases)}
+        self.symptom_ids = {name: i for i, name in enumerate(self.symptoms)}
+
+    def symptoms_of(self, disease: str) -> list[str]:
+        """查询疾病的症状"""
+        row = self.disease_ids[disease]
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return [self.symptoms[i] for i in self.matrix.indices[start:end]]
+
+
+@dataclass
+class ColumnProfile:
+    """单列数据概况（流式统计结果）"""
+
+    name: str
+    rows: int
+    null_count: int
+    distinct: int
+    distinct_exact: bool
+    top_values: list[tuple[str, int]]
+    top_values_exact: bool
+    error_bound: int = 0
+    """top_values 中计数的最大低估量，top_values_exact 为 True 时为 0"""
+
+    @property
+    def null_rate(self) -> float:
+        """空值率"""
+        return self.null_count / self.rows if self.rows else 0.0
+
+    @property
+    def non_null_count(self) -> int:
+        """非空值数"""
+        return self.rows - self.null_count
@@ -42,4 +42,17 @@ KAGGLE_DATASET_DOWNLOAD_URLS_FILE: str = os.getenv(
 
 DATABASE_FILE: str = os.getenv("DATABASE_FILE", "database_module/database.db")
 """ 数据库文件路径 """
+ENHANCED_DRUG_TABLE_FILE: str = os.getenv(
+    "ENHANCED_DRUG_TABLE_FILE",
+    "../match_data_preprocessing/data/enhanced_drug_table.csv",
+)
+""" 增强药物表文件路径（由 match_data_preprocessing 生成，存在时一并入库） """
+DISEASE_KEYS_FILE: str = os.getenv(
+    "DISEASE_KEYS_FILE", "../match_data_preprocessing/disease_keys.json"
+)
+""" 标准疾病名列表文件路径（用于生成每种疾病的推荐药物表） """
+KNOWLEDGE_SNAPSHOT_FILE: str = os.getenv(
+    "KNOWLEDGE_SNAPSHOT_FILE", "dataset_module/.cache/knowledge_snapshot.bin"
+)
+""" 编译后的知识快照文件路径（内存映射方式打开） """
 # endregion
@@ -5,5 +5,6 @@
 """
 
 from .log_utility import *
+from .file_utility import *
 
-__all__ = ["logger"]
+__all__ = ["logger", "hash_file"]
@@ -0,0 +1,20 @@
+"""
+文件工具模块
+"""
+
+import os
+import hashlib
+
+__all__ = ["HASH_BLOCK_SIZE", "hash_file"]
+
+HASH_BLOCK_SIZE: int = 1 << 20
+"""计算文件哈希时每次读取的字节数"""
+
+
+def hash_file(file_path: os.PathLike) -> str:
+    """计算文件内容的 SHA-256 哈希"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
@@ -39,7 +39,12 @@ DEFAULT_MAPPING = DATA_DIR / "others_condition_symptoms.json"
 DEFAULT_TABLE = DATA_DIR / "enhanced_drug_table.csv"
 
 # DS8: 症状严重度
-DS8_PATH = PROJECT_ROOT / "app" / "dataset_module" / "disease-symptom-description-dataset" / "Symptom-severity_cleaned.csv"
+DATASET_DIR = PROJECT_ROOT / "app" / "dataset_module"
+DS8_PATH = DATASET_DIR / "disease-symptom-description-dataset" / "Symptom-severity_cleaned.csv"
+
+# 症状标准名注册表 (app/dataset_module/symptom_registry.py, 仅依赖标准库)
+sys.path.insert(0, str(DATASET_DIR))
+from symptom_registry import SymptomRegistry  # noqa: E402
 
 
 def parse_args():
@@ -72,44 +77,18 @@ def parse_args():
     return parser.parse_args()
 
 
-def load_symptom_severity_map() -> dict:
-    """从 DS8 加载 symptom → weight 映射"""
+def load_symptom_severity_map() -> SymptomRegistry:
+    """从 DS8 加载症状注册表 (symptom_id → weight)"""
     if not DS8_PATH.exists():
         print(f"[WARN] DS8 文件不存在: {DS8_PATH}")
-        return {}
-    ds8 = pd.read_csv(DS8_PATH)
-    ds8.columns = [c.strip() for c in ds8.columns]
-    severity_map = {}
-    for _, row in ds8.iterrows():
-        symptom = str(row.get("Symptom", "")).strip()
-        weight = row.get("weight", 1)
-        if symptom and symptom.lower() != "nan":
-            try:
-                severity_map[symptom] = int(weight)
-            except (ValueError, TypeError):
-                severity_map[symptom] = 1
-    # 也建立小写映射用于模糊匹配
-    severity_map_lower = {}
-    for k, v in severity_map.items():
-        severity_map_lower[k.lower().replace(" ", "_")] = v
-    return severity_map, severity_map_lower
-
-
-def match_severity(symptom: str, severity_map: dict, severity_map_lower: dict) -> int:
-    """尝试匹配症状的严重度权重"""
-    # 精确匹配
-    if symptom in severity_map:
-        return severity_map[symptom]
-    # 小写下划线格式匹配
-    sym_norm = symptom.lower().replace(" ", "_")
-    if sym_norm in severity_map_lower:
-        return severity_map_lower[sym_norm]
-    # 去下划线匹配
-    sym_clean = symptom.lower().replace("_", " ").strip()
-    for k, v in severity_map.items():
-        if k.lower().replace("_", " ").strip() == sym_clean:
-            return v
-    return -1  # 未匹配
+        return SymptomRegistry()
+    return SymptomRegistry.from_severity_csv(DS8_PATH)
+
+
+def match_severity(symptom: str, registry: SymptomRegistry) -> int:
+    """尝试匹配症状的严重度权重 (大小写、空格、下划线不同的写法均可匹配)"""
+    w = registry.weight_of(symptom)
+    return -1 if w is None else w  # -1: 未匹配
 
 
 def main():
@@ -136,8 +115,8 @@ def main():
 
     # Step 2: 加载 DS8 严重度映射
     print("\n[Step 2] 加载症状严重度 (DS8) ...")
-    severity_map, severity_map_lower = load_symptom_severity_map()
-    print(f"  DS8 症状数: {len(severity_map)}")
+    symptom_registry = load_symptom_severity_map()
+    print(f"  DS8 症状数: {len(symptom_registry)}")
 
     # Step 3: 加载 enhanced_drug_table
     print("\n[Step 3] 加载 enhanced_drug_table.csv ...")
@@ -152,6 +131,10 @@ def main():
     print("\n[Step 4] 回填症状 ...")
     updated_count = 0
     symptom_counts = []
+    # 不区分大小写的 condition 索引 (同一写法保留首个)
+    cond_symptom_map_lower = {}
+    for k, v in cond_symptom_map.items():
+        cond_symptom_map_lower.setdefault(k.lower().strip(), v)
 
     for idx in df[others_mask].index:
         original_conds_json = df.at[idx, "original_conditions"]
@@ -167,10 +150,7 @@ def main():
             symptoms = cond_symptom_map.get(cond_clean, [])
             if not symptoms:
                 # 尝试不区分大小写匹配
-                for k, v in cond_symptom_map.items():
-                    if k.lower().strip() == cond_clean.lower():
-                        symptoms = v
-                        break
+                symptoms = cond_symptom_map_lower.get(cond_clean.lower(), [])
             all_symptoms.update(symptoms)
 
         if all_symptoms:
@@ -180,7 +160,7 @@ def main():
             # 计算 symptom_severity
             severity = {}
             for s in symptoms_list:
-                w = match_severity(s, severity_map, severity_map_lower)
+                w = match_severity(s, symptom_registry)
                 if w > 0:
                     severity[s] = w
             if severity:
@@ -6,6 +6,7 @@
 
 使用方式:
     python build_enhanced_drug_table.py
+    python build_enhanced_drug_table.py --verify-matcher   # 校验编译匹配器与参考实现一致
 
 输出:
     match_data_preprocessing/data/enhanced_drug_table.csv
@@ -14,8 +15,10 @@
 import os
 import sys
 import json
+import argparse
 import warnings
 from pathlib import Path
+from collections import Counter
 from difflib import SequenceMatcher
 
 import pandas as pd
@@ -33,6 +36,10 @@ PREPROCESS_DIR = PROJECT_ROOT / "match_data_preprocessing"
 OUTPUT_DIR = PREPROCESS_DIR / "data"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# 症状标准名注册表 (app/dataset_module/symptom_registry.py, 仅依赖标准库)
+sys.path.insert(0, str(DATASET_DIR))
+from symptom_registry import SymptomRegistry  # noqa: E402
+
 # ============================================================
 # 同义词映射表: 原始condition关键词 → disease_key
 # ============================================================
@@ -350,6 +357,200 @@ def normalize_name(name):
     return name.strip().lower().replace(" ", "_").replace("-", "_").replace("__", "_")
 
 
+def _spaced_key(key):
+    """disease_key 的空格形式: 下划线替换为空格并去掉括号（层级 1 与层级 4 使用）"""
+    return key.replace("_", " ").replace("(", "").replace(")", "")
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick 多模式子串匹配自动机
+
+    每个模式带有优先级（数值越小越优先），单遍扫描文本即可得到
+    文本中出现的优先级最高的模式，与按优先级顺序逐个 `in` 检查的结果一致。
+    """
+
+    def __init__(self, patterns):
+        """
+        patterns: 可迭代的 (模式串, 值)，按优先级从高到低排列；
+        同一模式串重复出现时以先出现的为准
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]  # 每个状态（含失败链上的后缀）可匹配的最高优先级
+        self._values = []
+        for priority, (pattern, value) in enumerate(patterns):
+            self._values.append(value)
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = nxt
+            if self._best[state] is None:
+                self._best[state] = priority
+
+        # 按广度优先顺序计算失败指针，并沿失败链合并优先级
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None and (
+                    self._best[nxt] is None or inherited < self._best[nxt]
+                ):
+                    self._best[nxt] = inherited
+                queue.append(nxt)
+
+    def search(self, text):
+        """返回 text 中出现的优先级最高的模式对应的值，没有任何模式出现时返回 None"""
+        goto, fail, best_of = self._goto, self._fail, self._best
+        state = 0
+        best = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            priority = best_of[state]
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == 0:
+                    break
+        return None if best is None else self._values[best]
+
+
+FUZZY_MATCH_THRESHOLD = 0.65
+"""层级 4 模糊匹配的 SequenceMatcher.ratio() 阈值"""
+
+
+class FuzzyKeyIndex:
+    """
+    层级 4 模糊匹配的候选索引
+
+    SequenceMatcher.ratio() = 2M / (len(a) + len(b))，匹配字符数 M 不超过两串的
+    字符多重集交集大小，因此由字符（一元 n-gram）计数倒排索引可得到每个 key 的相似度上界：
+    只有与 condition 有公共字符的 key 会被访问，上界低于阈值的 key 不进入候选，
+    候选按上界从高到低逐个精确打分，下一个候选的上界已不可能超过当前最优时提前结束。
+    结果（含同分时取 disease_keys 中最先出现的 key）与逐个计算 ratio() 完全一致。
+    """
+
+    def __init__(self, disease_keys, threshold=FUZZY_MATCH_THRESHOLD):
+        self.disease_keys = list(disease_keys)
+        self.threshold = threshold
+        self._lengths = []
+        self._matchers = []
+        self._postings = {}  # 字符 → [(key 下标, 该字符在 key 中的次数)]
+        for index, key in enumerate(self.disease_keys):
+            key_words = _spaced_key(key)
+            self._lengths.append(len(key_words))
+            # SequenceMatcher 缓存第二个序列的信息，每个 key 只构建一次
+            self._matchers.append(SequenceMatcher(None, "", key_words))
+            for ch, count in Counter(key_words).items():
+                self._postings.setdefault(ch, []).append((index, count))
+
+    def _candidates(self, condition_words):
+        """上界不低于阈值的候选 (上界, key 下标)，按上界从高到低、下标从小到大排列"""
+        common = {}
+        for ch, query_count in Counter(condition_words).items():
+            for index, count in self._postings.get(ch, ()):
+                common[index] = common.get(index, 0) + min(query_count, count)
+        length = len(condition_words)
+        candidates = []
+        for index, matches in common.items():
+            bound = 2.0 * matches / (length + self._lengths[index])
+            if bound >= self.threshold:
+                candidates.append((-bound, index))
+        candidates.sort()
+        return candidates
+
+    def best_match(self, condition_words):
+        """相似度最高且不低于阈值的 disease_key，不存在时返回 None"""
+        best_index = None
+        best_score = 0
+        for negative_bound, index in self._candidates(condition_words):
+            bound = -negative_bound
+            if bound < best_score or (bound == best_score and index > best_index):
+                break  # 之后的候选上界更低，不可能成为最优
+            matcher = self._matchers[index]
+            matcher.set_seq1(condition_words)
+            score = matcher.ratio()
+            if score > best_score or (score == best_score and index < best_index):
+                best_score = score
+                best_index = index
+        if best_index is None or best_score < self.threshold:
+            return None
+        return self.disease_keys[best_index]
+
+
+class DiseaseKeyMatcher:
+    """
+    由 disease_keys、SYNONYM_MAP 与 DISEASE_KEY_KEYWORDS 一次性编译的 condition 匹配器
+
+    - 层级 1 的精确匹配编译为两个字典（标准化名、空格形式 → 最先出现的 disease_key）
+    - 层级 2、3 的子串匹配编译为同一个 Aho–Corasick 自动机，同义词优先于关键词，
+      各自按表中的顺序排列，保持逐层逐项检查时的优先顺序
+    - 层级 4 的模糊匹配通过 FuzzyKeyIndex 只对可能达到阈值的候选精确打分
+    """
+
+    def __init__(self, disease_keys):
+        self.disease_keys = [key for key in disease_keys if key != "others"]
+        self._exact = {}
+        self._spaced = {}
+        for index, key in enumerate(self.disease_keys):
+            self._exact.setdefault(key, index)
+            self._spaced.setdefault(_spaced_key(key), index)
+        self._automaton = KeywordAutomaton(
+            list(SYNONYM_MAP.items())
+            + [(kw, key) for key, keywords in DISEASE_KEY_KEYWORDS.items() for kw in keywords]
+        )
+        self._fuzzy_index = FuzzyKeyIndex(self.disease_keys)
+
+    def match(self, condition):
+        """将一个原始 condition 匹配到 disease_key，规则同 match_condition_to_disease_keys"""
+        if not isinstance(condition, str) or condition.strip() == "" or condition.strip().lower() == "nan":
+            return None
+
+        condition_clean = condition.strip()
+        condition_lower = condition_clean.lower()
+
+        # 层级 1: 精确匹配（两种比较方式中最先出现的 key）
+        exact = self._exact.get(normalize_name(condition_clean))
+        spaced = self._spaced.get(condition_lower.replace("_", " ").replace("-", " "))
+        if exact is not None or spaced is not None:
+            return self.disease_keys[min(i for i in (exact, spaced) if i is not None)]
+
+        # 层级 2、3: 同义词表与关键词包含匹配
+        matched = self._automaton.search(condition_lower)
+        if matched is not None:
+            return matched
+
+        # 层级 4: 模糊匹配；层级 5: 未匹配 → None
+        return self._fuzzy_index.best_match(
+            condition_lower.replace("_", " ").replace("-", " ")
+        )
+
+
+_MATCHER_CACHE = {}
+
+
+def get_disease_key_matcher(disease_keys):
+    """按 disease_keys 缓存编译好的匹配器"""
+    cache_key = tuple(disease_keys)
+    matcher = _MATCHER_CACHE.get(cache_key)
+    if matcher is None:
+        matcher = _MATCHER_CACHE[cache_key] = DiseaseKeyMatcher(disease_keys)
+    return matcher
+
+
 def match_condition_to_disease_keys(condition, disease_keys):
     """
     将一个原始 condition 匹配到 disease_keys 列表中。
@@ -361,6 +562,24 @@ def match_condition_to_disease_keys(condition, disease_keys):
     4. 模糊字符串匹配（SequenceMatcher ≥ 0.65）
     5. 兜底 → None（不匹配）
 
+    前三层由 DiseaseKeyMatcher 编译为字典查找与一次自动机扫描，
+    第四层只对字符计数上界可能达到阈值的候选精确打分。
+    返回匹配到的 disease_key 或 None
+    """
+    return get_disease_key_matcher(disease_keys).match(condition)
+
+
+def match_condition_to_disease_keys_reference(condition, disease_keys):
+    """
+    逐项循环的参考实现，仅用于 verify_matcher 校验编译匹配器的结果。
+
+    匹配策略（逐层递进）:
+    1. 精确匹配（标准化后）
+    2. 同义词表匹配
+    3. 包含匹配（关键词）
+    4. 模糊字符串匹配（SequenceMatcher ≥ 0.65）
+    5. 兜底 → None（不匹配）
+
     返回匹配到的 disease_key 或 None
     """
     if not isinstance(condition, str) or condition.strip() == "" or condition.strip().lower() == "nan":
@@ -410,6 +629,37 @@ def match_condition_to_disease_keys(condition, disease_keys):
     return None
 
 
+def verify_matcher(conditions, disease_keys):
+    """
+    校验编译匹配器与逐项循环的参考实现对每个 condition 的结果一致
+
+    返回不一致的 (condition, 参考结果, 匹配器结果) 列表
+    """
+    matcher = get_disease_key_matcher(disease_keys)
+    mismatches = []
+    unique_conditions = sorted({c for c in conditions if isinstance(c, str)})
+    for cond in unique_conditions:
+        expected = match_condition_to_disease_keys_reference(cond, disease_keys)
+        actual = matcher.match(cond)
+        if expected != actual:
+            mismatches.append((cond, expected, actual))
+    print(f"[INFO] 匹配器校验: {len(unique_conditions)} 个 condition, 不一致 {len(mismatches)} 个")
+    for cond, expected, actual in mismatches[:20]:
+        print(f"       {cond!r}: 参考={expected}, 匹配器={actual}")
+    return mismatches
+
+
+def verify_matcher_on_datasets():
+    """对 DS1、DS2、DS4 中的全部 condition 校验编译匹配器，存在不一致时返回 False"""
+    disease_keys = load_disease_keys()
+    ds1, ds2, ds4 = load_ds1(), load_ds2(), load_ds4()
+    conditions = []
+    for df, col in [(ds1, "disease"), (ds2, "medical_condition"), (ds4, "condition")]:
+        if col in df.columns:
+            conditions.extend(df[col].dropna().astype(str).str.strip())
+    return not verify_matcher(conditions, disease_keys)
+
+
 def build_drug_conditions_map(ds1, ds2, ds4):
     """
     从 DS1、DS2、DS4 中提取所有 (drug_name, condition) 对，
@@ -608,63 +858,56 @@ def build_disease_description_map(ds6, disease_keys):
     return desc_map
 
 
-def build_disease_symptom_map(ds5, disease_keys):
+def build_disease_symptom_map(ds5, disease_keys, registry):
     """
-    从 DS5 构建 disease_key → [symptoms] 映射。
-    DS5 中的 Disease 名称需要匹配到 disease_keys。
+    从 DS5 构建 disease_key → [symptom_id] 映射。
+    DS5 中的 Disease 名称需要匹配到 disease_keys；症状写法经 registry 解析为整数编号。
     """
-    # 先建立 DS5 中每种疾病的症状集合（去重取并集）
+    # 先建立 DS5 中每种疾病的症状编号集合（去重取并集）
+    symptom_columns = [f"Symptom_{i}" for i in range(1, 18) if f"Symptom_{i}" in ds5.columns]
     ds5_disease_symptoms = {}
-    for _, row in ds5.iterrows():
-        disease = str(row.get("Disease", "")).strip()
+    for disease, *symptoms in ds5[["Disease"] + symptom_columns].itertuples(index=False):
+        disease = str(disease).strip()
         if not disease or disease.lower() == "nan":
             continue
-        symptoms = []
-        for i in range(1, 18):
-            col = f"Symptom_{i}"
-            if col in row.index:
-                s = str(row[col]).strip()
-                if s and s.lower() != "nan":
-                    symptoms.append(s.strip())
-        if disease not in ds5_disease_symptoms:
-            ds5_disease_symptoms[disease] = set()
-        ds5_disease_symptoms[disease].update(symptoms)
+        ids = ds5_disease_symptoms.setdefault(disease, set())
+        for s in symptoms:
+            s = str(s).strip()
+            if s and s.lower() != "nan":
+                ids.add(registry.register(s))
 
     # 将 DS5 疾病名匹配到 disease_keys
     key_symptom_map = {}
-    for ds5_disease, symptoms in ds5_disease_symptoms.items():
+    for ds5_disease, symptom_ids in ds5_disease_symptoms.items():
         matched_key = match_condition_to_disease_keys(ds5_disease, disease_keys)
         if matched_key and matched_key != "others":
-            if matched_key not in key_symptom_map:
-                key_symptom_map[matched_key] = set()
-            key_symptom_map[matched_key].update(symptoms)
+            key_symptom_map.setdefault(matched_key, set()).update(symptom_ids)
 
-    # 转为排序列表
+    # 转为按症状标准名排序的编号元组
     for k in key_symptom_map:
-        key_symptom_map[k] = sorted(key_symptom_map[k])
+        key_symptom_map[k] = tuple(sorted(key_symptom_map[k], key=registry.name))
 
     print(f"[INFO] 疾病→症状映射: {len(key_symptom_map)} 个 disease_key 有症状数据")
     for k in sorted(key_symptom_map.keys())[:5]:
-        print(f"       {k}: {key_symptom_map[k][:5]}...")
+        print(f"       {k}: {[registry.name(i) for i in key_symptom_map[k][:5]]}...")
 
     return key_symptom_map
 
 
 def build_symptom_severity_map(ds8):
     """
-    从 DS8 构建 symptom → weight 映射
+    从 DS8 构建症状注册表 (symptom_id → weight)
     """
-    severity_map = {}
-    for _, row in ds8.iterrows():
-        symptom = str(row.get("Symptom", "")).strip()
-        weight = row.get("weight", 1)
+    registry = SymptomRegistry()
+    for symptom, weight in zip(ds8["Symptom"], ds8.get("weight", pd.Series(1, index=ds8.index))):
+        symptom = str(symptom).strip()
         if symptom and symptom.lower() != "nan":
             try:
-                severity_map[symptom] = int(weight)
+                registry.register(symptom, int(weight))
             except (ValueError, TypeError):
-                severity_map[symptom] = 1
-    print(f"[INFO] 症状严重度映射: {len(severity_map)} 个症状有权重")
-    return severity_map
+                registry.register(symptom, 1)
+    print(f"[INFO] 症状严重度映射: {len(registry)} 个症状有权重")
+    return registry
 
 
 def do_disease_matching(drug_cond_map, disease_keys):
@@ -746,8 +989,8 @@ def main():
 
     # Step 6.5: 构建疾病→症状映射 和 症状严重度映射
     print("\n--- Step 6.5: 构建疾病→症状映射 ---")
-    disease_symptom_map = build_disease_symptom_map(ds5, disease_keys)
-    symptom_severity_map = build_symptom_severity_map(ds8)
+    symptom_registry = build_symptom_severity_map(ds8)
+    disease_symptom_map = build_disease_symptom_map(ds5, disease_keys, symptom_registry)
 
     # Step 7: 合并所有数据
     print("\n--- Step 7: 合并所有数据 ---")
@@ -790,11 +1033,12 @@ def main():
             keys = json.loads(matched_keys_json)
         except Exception:
             return "[]"
-        all_symptoms = set()
+        all_symptom_ids = set()
         for k in keys:
-            symptoms = disease_symptom_map.get(k, [])
-            all_symptoms.update(symptoms)
-        return json.dumps(sorted(all_symptoms), ensure_ascii=False)
+            all_symptom_ids.update(disease_symptom_map.get(k, ()))
+        return json.dumps(
+            sorted(symptom_registry.name(i) for i in all_symptom_ids), ensure_ascii=False
+        )
 
     final["matched_symptoms"] = final["matched_disease_keys"].apply(get_matched_symptoms)
 
@@ -808,10 +1052,8 @@ def main():
             return "{}"
         severity = {}
         for s in symptoms:
-            w = symptom_severity_map.get(s, None)
-            # 尝试去首尾空格后再匹配
-            if w is None:
-                w = symptom_severity_map.get(s.strip(), None)
+            # 任意写法 (大小写、空格、下划线) 均解析到同一症状编号
+            w = symptom_registry.weight_of(s)
             if w is not None:
                 severity[s] = w
         if not severity:
@@ -900,5 +1142,18 @@ def main():
     print(f"   字段列表: {list(final.columns)}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="构建增强药物表 enhanced_drug_table.csv")
+    parser.add_argument(
+        "--verify-matcher",
+        action="store_true",
+        help="只校验编译匹配器在 DS1、DS2、DS4 全部 condition 上与参考实现的结果一致",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.verify_matcher:
+        sys.exit(0 if verify_matcher_on_datasets() else 1)
     main()